@@ -40,6 +40,12 @@ python manage.py makemigrations accounts
 python manage.py makemigrations finance_management
 python manage.py makemigrations
 python manage.py migrate
+# Fill integer minor-unit amounts for rows written before they existed (no-op once converted)
+python manage.py convert_amounts_to_minor_units
+# Move report documents written before ReportLine existed into lines (no-op once migrated)
+python manage.py migrate_report_lines
+# Build monthly ledger rollups for users who have none yet (no-op once built)
+python manage.py rebuild_ledger_rollups --missing
 
 echo "Creating superuser..."
 python manage.py shell -c "
@@ -52,4 +58,7 @@ else:
     print('Superuser already exists')
 "
 
+# Rebuild the reports of months touched by transaction writes in the background
+python manage.py process_dirty_report_months --loop &
+
 python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
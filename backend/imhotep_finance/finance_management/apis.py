@@ -3,17 +3,22 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
+from finance_management.utils.ledger_version import ledger_etag
 from finance_management.services import (
     get_user_networth_service,
     get_user_networth_details_service,
-    get_user_categories_service
+    get_user_categories_service,
+    get_sync_changes_service
 )
 from finance_management.serializers import (
     NetworthResponseSerializer,
     NetworthDetailsResponseSerializer,
     CategoryRequestSerializer,
-    CategoryResponseSerializer
+    CategoryResponseSerializer,
+    SyncQuerySerializer,
+    SyncResponseSerializer
 )
+from django.core.exceptions import ValidationError
 
 
 class GetNetworthApi(APIView):
@@ -25,6 +30,7 @@ class GetNetworthApi(APIView):
         responses={200: NetworthResponseSerializer},
         operation_id='get_networth'
     )
+    @ledger_etag
     def get(self, request):
         """Get current authenticated user total netWorth"""
         user = request.user
@@ -45,6 +51,7 @@ class GetNetworthDetailsApi(APIView):
         responses={200: NetworthDetailsResponseSerializer},
         operation_id='get_networth_details'
     )
+    @ledger_etag
     def get(self, request):
         """Get current authenticated user netWorth details"""
         user = request.user
@@ -66,6 +73,7 @@ class GetCategoryApi(APIView):
         responses={200: CategoryResponseSerializer},
         operation_id='get_categories'
     )
+    @ledger_etag
     def get(self, request):
         """Get current authenticated user's most frequently used categories.
         Optional query param: ?status=Deposit|Withdraw|ANY
@@ -79,3 +87,31 @@ class GetCategoryApi(APIView):
             'id': user.id,
             'category': categories,
         }, status=status.HTTP_200_OK)
+
+
+class SyncApi(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=['Finance Management'],
+        description="Get transactions, wishes and scheduled transactions changed or deleted since a sync token, in pages.",
+        parameters=[SyncQuerySerializer],
+        responses={200: SyncResponseSerializer, 400: 'Invalid sync token'},
+        operation_id='sync'
+    )
+    def get(self, request):
+        """Return the authenticated user's changes since the given sync token"""
+        serializer = SyncQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            changes = get_sync_changes_service(
+                request.user,
+                sync_token=serializer.validated_data.get('sync_token') or None,
+                cursor=serializer.validated_data.get('cursor') or None,
+                limit=serializer.validated_data.get('limit')
+            )
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(changes, status=status.HTTP_200_OK)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast, Round
+from finance_management.utils.minor_units import storage_exponent
+from scheduled_trans_management.models import ScheduledTransaction
+from transaction_management.models import NetWorth, Transactions
+from wishlist_management.models import Wishlist
+
+# (model, float field, minor units field)
+AMOUNT_COLUMNS = (
+    (Transactions, 'amount', 'amount_minor'),
+    (NetWorth, 'total', 'total_minor'),
+    (Wishlist, 'price', 'price_minor'),
+    (ScheduledTransaction, 'amount', 'amount_minor'),
+)
+
+
+class Command(BaseCommand):
+    help = "Fill the integer minor-unit columns from the float amounts of rows written before they existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every row, not only the ones missing minor units",
+        )
+
+    def handle(self, *args, **options):
+        converted = 0
+        with transaction.atomic():
+            for model, amount_field, minor_field in AMOUNT_COLUMNS:
+                queryset = model.objects.all()
+                if not options["all"]:
+                    queryset = queryset.filter(**{f"{minor_field}__isnull": True})
+
+                # One UPDATE per currency, each with its registry exponent
+                currencies = queryset.order_by().values_list('currency', flat=True).distinct()
+                count = 0
+                for currency in list(currencies):
+                    scale = 10 ** storage_exponent(currency)
+                    count += queryset.filter(currency=currency).update(**{
+                        minor_field: Cast(Round(F(amount_field) * scale), BigIntegerField())
+                    })
+
+                converted += count
+                self.stdout.write(f"  {model._meta.verbose_name_plural}: {count}")
+
+        self.stdout.write(self.style.SUCCESS(f"Converted {converted} row(s) to minor units."))
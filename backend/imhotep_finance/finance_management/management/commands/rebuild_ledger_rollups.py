@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from accounts.models import User
+from finance_management.utils.ledger_rollup import rebuild_ledger_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user monthly ledger rollups (count and sum per month, currency, status and category)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild these user ids (repeatable)",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only users with transactions but no rollups yet",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options["user_ids"]:
+            users = users.filter(id__in=options["user_ids"])
+        if options["missing"]:
+            users = users.filter(
+                Q(transactions__isnull=False) | Q(ledger_archive_segments__isnull=False),
+                ledger_rollups__isnull=True,
+            ).distinct()
+
+        rebuilt = 0
+        rows = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            rows += rebuild_ledger_rollups(user_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup row(s) for {rebuilt} user(s)."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+from finance_management.utils.ledger_stats import rebuild_ledger_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user ledger stats (counts, date bounds, month bitmaps) from the ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild these user ids (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options["user_ids"]:
+            users = users.filter(id__in=options["user_ids"])
+
+        rebuilt = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            rebuild_ledger_stats(user_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ledger stats for {rebuilt} user(s)."))
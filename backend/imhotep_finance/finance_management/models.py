@@ -1,6 +1,8 @@
 from django.db import models
 from accounts.models import User
 from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from encrypted_model_fields.fields import EncryptedCharField
 
 # Create your models here.
 #for the old models that have been moved to the respective apps
@@ -16,4 +18,151 @@ class BaseExchangeRate(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Exchange rates for {self.base_currency} (updated: {self.last_updated})"
\ No newline at end of file
+        return f"Exchange rates for {self.base_currency} (updated: {self.last_updated})"
+
+class LedgerVersion(models.Model):
+    """Per-user counter bumped on every write to the user's financial data, used for ETags."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='ledger_version')
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Ledger version {self.version} of {self.user.username}"
+
+    class Meta:
+        db_table = 'finance_management_ledgerversion'
+        verbose_name = "Ledger Version"
+        verbose_name_plural = "Ledger Versions"
+
+
+class IdempotencyKey(models.Model):
+    """Stored response of a mutating request, replayed when a client retries with the same Idempotency-Key."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)  # null while the request is in progress
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Idempotency key {self.key} of {self.user.username}"
+
+    class Meta:
+        db_table = 'finance_management_idempotencykey'
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+
+class LedgerStats(models.Model):
+    """
+    Per-user ledger metadata maintained on write, so list counts, date bounds
+    and report history can be answered without scanning the ledger.
+    Month bitmaps map a year (as a string) to a 12-bit mask, bit 0 being January.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='ledger_stats')
+    deposit_count = models.PositiveIntegerField(default=0)
+    withdraw_count = models.PositiveIntegerField(default=0)
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    transaction_months = models.JSONField(default=dict, blank=True)
+    report_months = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def transaction_count(self):
+        return self.deposit_count + self.withdraw_count
+
+    def __str__(self):
+        return f"Ledger stats of {self.user.username}: {self.transaction_count} transactions"
+
+    class Meta:
+        db_table = 'finance_management_ledgerstats'
+        verbose_name = "Ledger Stats"
+        verbose_name_plural = "Ledger Stats"
+
+
+class LedgerRollup(models.Model):
+    """
+    Count and sum of a user's transactions per month, currency, status and
+    category, maintained in the same database transaction as every ledger
+    write. Archived transactions stay counted. Monthly and yearly aggregates
+    read these rows instead of the ledger.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ledger_rollups')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    currency = models.CharField(max_length=4)
+    trans_status = models.CharField(max_length=8)
+    # Keyed hash of the category, so the encrypted label can be matched on write
+    category_index = models.CharField(max_length=64)
+    category = EncryptedCharField(max_length=100, blank=True, null=True)
+    count = models.IntegerField(default=0)
+    # Sum in integer minor units of the currency
+    total_minor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Rollup of {self.user_id} - {self.month}/{self.year} {self.trans_status} {self.currency}: {self.count}"
+
+    class Meta:
+        db_table = 'finance_management_ledgerrollup'
+        verbose_name = "Ledger Rollup"
+        verbose_name_plural = "Ledger Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'currency', 'trans_status', 'category_index'],
+                name='unique_ledger_rollup_key',
+            ),
+        ]
+
+
+class LedgerArchiveSegment(models.Model):
+    """A closed ledger year of one user, moved out of the transactions table into a compressed, encrypted file."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ledger_archive_segments')
+    year = models.IntegerField()
+    path = models.CharField(max_length=255)  # relative to LEDGER_ARCHIVE_ROOT
+    row_count = models.PositiveIntegerField(default=0)
+    first_date = models.DateField()
+    last_date = models.DateField()
+    checksum = models.CharField(max_length=64)  # sha256 of the stored file
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Archived {self.year} ledger of {self.user.username} ({self.row_count} transactions)"
+
+    class Meta:
+        db_table = 'finance_management_ledgerarchivesegment'
+        verbose_name = "Ledger Archive Segment"
+        verbose_name_plural = "Ledger Archive Segments"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year'], name='unique_archive_segment_per_user_year'),
+        ]
+
+
+class SyncTombstone(models.Model):
+    """Record of a deleted transaction, wish or scheduled transaction, so sync clients can drop their copy."""
+    KIND_CHOICES = (
+        ('transaction', 'Transaction'),
+        ('wishlist', 'Wishlist'),
+        ('scheduled_transaction', 'Scheduled transaction'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sync_tombstones')
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id} of {self.user.username}"
+
+    class Meta:
+        db_table = 'finance_management_synctombstone'
+        verbose_name = "Sync Tombstone"
+        verbose_name_plural = "Sync Tombstones"
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
@@ -28,3 +28,47 @@ class CategoryResponseSerializer(serializers.Serializer):
         child=serializers.CharField(),
         help_text="List of frequently used category names"
     )
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    sync_token = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Token from the previous sync; omit it for a full download"
+    )
+    cursor = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Cursor from the previous page while has_more is true"
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Maximum rows per page; capped at the server's page size"
+    )
+
+
+class SyncChangesSerializer(serializers.Serializer):
+    updated = serializers.ListField(
+        child=serializers.DictField(),
+        help_text="Rows created or changed since the token, oldest change first"
+    )
+    deleted = serializers.ListField(
+        child=serializers.IntegerField(),
+        help_text="IDs deleted since the token"
+    )
+
+
+class SyncResponseSerializer(serializers.Serializer):
+    sync_token = serializers.CharField(
+        allow_null=True,
+        help_text="Token to send with the next sync; only set on the last page"
+    )
+    has_more = serializers.BooleanField(help_text="True when more pages follow; request them with the cursor")
+    cursor = serializers.CharField(allow_null=True, help_text="Cursor of the next page, null on the last page")
+    reset = serializers.BooleanField(
+        help_text="True when this is a full download and local data must be replaced"
+    )
+    transactions = SyncChangesSerializer()
+    wishlist = SyncChangesSerializer()
+    scheduled_transactions = SyncChangesSerializer()
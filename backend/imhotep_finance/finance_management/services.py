@@ -1,5 +1,38 @@
 from finance_management.utils.get_networth import get_networth, get_netWorth_details
 from finance_management.utils.get_category import get_category
+from finance_management.utils.serializer import (
+    TRANSACTION_VALUES,
+    WISHLIST_VALUES,
+    SCHEDULED_TRANS_VALUES,
+    serialize_transaction_row,
+    serialize_wishlist_row,
+    serialize_scheduled_trans_row,
+)
+from finance_management.utils.sync import (
+    InvalidSyncToken,
+    TOKEN_OVERLAP,
+    make_sync_cursor,
+    make_sync_token,
+    read_sync_cursor,
+    read_sync_token,
+    tombstone_horizon,
+)
+from finance_management.models import SyncTombstone
+from transaction_management.models import Transactions
+from wishlist_management.models import Wishlist
+from scheduled_trans_management.models import ScheduledTransaction
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+# (response key, tombstone kind, model, values() fields, row serializer)
+SYNC_KINDS = (
+    ('transactions', 'transaction', Transactions, TRANSACTION_VALUES, serialize_transaction_row),
+    ('wishlist', 'wishlist', Wishlist, WISHLIST_VALUES, serialize_wishlist_row),
+    ('scheduled_transactions', 'scheduled_transaction', ScheduledTransaction,
+     SCHEDULED_TRANS_VALUES, serialize_scheduled_trans_row),
+)
 
 
 def get_user_networth_service(user):
@@ -52,3 +85,83 @@ def get_user_categories_service(user, status='ANY'):
         list: List of category names
     """
     return get_category(user, status)
+
+
+def get_sync_changes_service(user, sync_token=None, cursor=None, limit=None):
+    """
+    Get the transactions, wishes and scheduled transactions changed or deleted since a sync token.
+    
+    Args:
+        user: User object
+        sync_token: Token returned by the previous sync, or None for a full download
+        cursor: Cursor returned by the previous page of this sync; the sync_token is then ignored
+        limit: Maximum number of rows in the page, at most SYNC_PAGE_SIZE
+        
+    Returns:
+        dict: Whether the client must replace its local state (reset), the updated
+              rows and deleted ids of each kind, and either a cursor for the next
+              page (has_more) or, on the last page, the new sync token
+    """
+    limit = min(limit or settings.SYNC_PAGE_SIZE, settings.SYNC_PAGE_SIZE)
+
+    try:
+        if cursor:
+            issued_at, changed_since, reset, start_kind, last_row = read_sync_cursor(user, cursor)
+        else:
+            issued_at = timezone.now()
+            since = read_sync_token(user, sync_token) if sync_token else None
+
+            horizon = tombstone_horizon()
+            SyncTombstone.objects.filter(user=user, deleted_at__lt=horizon).delete()
+
+            # Without a token, or when deletions since it were already pruned, send everything
+            reset = since is None or since < horizon
+            changed_since = None if reset else since - TOKEN_OVERLAP
+            start_kind, last_row = 0, None
+    except InvalidSyncToken as e:
+        raise ValidationError(str(e))
+
+    result = {'reset': reset}
+    next_cursor = None
+    remaining = limit
+    for kind_index, (key, kind, model, values, serialize_row) in enumerate(SYNC_KINDS):
+        result[key] = {'updated': [], 'deleted': []}
+
+        # Deletions are only ids and go out with the first page
+        if changed_since is not None and not cursor:
+            result[key]['deleted'] = list(
+                SyncTombstone.objects.filter(user=user, kind=kind, deleted_at__gte=changed_since)
+                .order_by('object_id').values_list('object_id', flat=True).distinct()
+            )
+
+        if kind_index < start_kind or next_cursor:
+            continue
+
+        queryset = model.objects.filter(user=user, updated_at__lte=issued_at)
+        if changed_since is not None:
+            queryset = queryset.filter(updated_at__gte=changed_since)
+        position = last_row if kind_index == start_kind else None
+        if position:
+            # Keyset pagination: continue after the last row sent
+            queryset = queryset.filter(
+                Q(updated_at__gt=position[0]) | Q(updated_at=position[0], id__gt=position[1])
+            )
+
+        rows = list(queryset.order_by('updated_at', 'id').values(*values, 'updated_at')[:remaining + 1])
+        has_more = len(rows) > remaining
+        rows = rows[:remaining]
+        remaining -= len(rows)
+        if rows:
+            position = (rows[-1]['updated_at'], rows[-1]['id'])
+
+        result[key]['updated'] = [
+            {**serialize_row(row), 'updated_at': row['updated_at'].isoformat()}
+            for row in rows
+        ]
+        if has_more:
+            next_cursor = make_sync_cursor(user, issued_at, changed_since, reset, kind_index, position)
+
+    result['has_more'] = next_cursor is not None
+    result['cursor'] = next_cursor
+    result['sync_token'] = None if next_cursor else make_sync_token(user, issued_at)
+    return result
@@ -0,0 +1,135 @@
+import threading
+from contextlib import contextmanager
+from django.db.models.signals import post_save, post_delete
+from accounts.models import User
+from finance_management.utils.ledger_version import bump_ledger_version
+from finance_management.utils.ledger_stats import apply_ledger_stats_changes, ledger_state, set_report_month
+from finance_management.utils.ledger_archive import delete_segment_file
+from finance_management.utils.ledger_rollup import (
+    apply_rollup_changes,
+    rebuild_ledger_rollups,
+    rollup_entry,
+    transaction_rollup_entry,
+)
+from finance_management.utils.sync import record_tombstones
+from finance_management.models import LedgerArchiveSegment
+from transaction_management.models import Transactions, NetWorth
+from user_reports.models import Reports
+from target_management.models import Target
+from wishlist_management.models import Wishlist
+from scheduled_trans_management.models import ScheduledTransaction
+
+# Models whose writes invalidate the user's cached read responses
+LEDGER_MODELS = (Transactions, NetWorth, Reports, Target, Wishlist, ScheduledTransaction)
+
+_state = threading.local()
+
+
+@contextmanager
+def ledger_signals_suspended():
+    """Skip the per-row ledger handlers below, for bulk jobs that bump the version and rebuild the stats themselves."""
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def _suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def ledger_changed(sender, instance, origin=None, **kwargs):
+    # Nothing to invalidate when the rows go away with their user
+    if isinstance(origin, User) or _suspended():
+        return
+    bump_ledger_version(instance.user_id)
+
+
+for model in LEDGER_MODELS:
+    post_save.connect(ledger_changed, sender=model, dispatch_uid=f'ledger_version_save_{model.__name__}')
+    post_delete.connect(ledger_changed, sender=model, dispatch_uid=f'ledger_version_delete_{model.__name__}')
+
+
+def transaction_saved(sender, instance, created, **kwargs):
+    if _suspended():
+        return
+    new_state = ledger_state(instance.date, instance.trans_status)
+    old_state = None if created else getattr(instance, '_ledger_state', None)
+    if old_state is not None:
+        old_state = ledger_state(*old_state)
+    if old_state != new_state:
+        apply_ledger_stats_changes(
+            instance.user_id,
+            added=[new_state],
+            removed=[old_state] if old_state and old_state[0] else [],
+        )
+    instance._ledger_state = new_state
+
+    new_entry = transaction_rollup_entry(instance)
+    old_rollup_state = None if created else getattr(instance, '_rollup_state', None)
+    if old_rollup_state is not None and old_rollup_state[0] is None:
+        # Loaded without its ledger fields, so its old contribution is unknown
+        rebuild_ledger_rollups(instance.user_id)
+    else:
+        old_entry = rollup_entry(*old_rollup_state) if old_rollup_state else None
+        if old_entry != new_entry:
+            apply_rollup_changes(
+                instance.user_id,
+                added=[new_entry],
+                removed=[old_entry] if old_entry else [],
+            )
+    instance._rollup_state = (
+        instance.date, instance.currency, instance.trans_status, instance.category, instance.amount, instance.amount_minor
+    )
+
+
+def transaction_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User) or _suspended():
+        return
+    apply_ledger_stats_changes(instance.user_id, removed=[(instance.date, instance.trans_status)])
+    apply_rollup_changes(instance.user_id, removed=[transaction_rollup_entry(instance)])
+
+
+def report_saved(sender, instance, created, **kwargs):
+    if created:
+        set_report_month(instance.user_id, instance.year, instance.month)
+
+
+def report_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User):
+        return
+    set_report_month(instance.user_id, instance.year, instance.month, present=False)
+
+
+post_save.connect(transaction_saved, sender=Transactions, dispatch_uid='ledger_stats_transaction_save')
+post_delete.connect(transaction_deleted, sender=Transactions, dispatch_uid='ledger_stats_transaction_delete')
+post_save.connect(report_saved, sender=Reports, dispatch_uid='ledger_stats_report_save')
+post_delete.connect(report_deleted, sender=Reports, dispatch_uid='ledger_stats_report_delete')
+
+
+def archive_segment_deleted(sender, instance, **kwargs):
+    delete_segment_file(instance.path)
+
+
+post_delete.connect(archive_segment_deleted, sender=LedgerArchiveSegment, dispatch_uid='ledger_archive_segment_delete')
+
+
+# Tombstone kind of each synced model
+SYNC_MODELS = {
+    Transactions: 'transaction',
+    Wishlist: 'wishlist',
+    ScheduledTransaction: 'scheduled_transaction',
+}
+
+
+def synced_row_deleted(sender, instance, origin=None, **kwargs):
+    # Bulk jobs suspending the ledger handlers record their tombstones in one insert
+    if isinstance(origin, User) or _suspended():
+        return
+    record_tombstones(instance.user_id, SYNC_MODELS[sender], [instance.pk])
+
+
+for model in SYNC_MODELS:
+    post_delete.connect(synced_row_deleted, sender=model, dispatch_uid=f'sync_tombstone_{model.__name__}')
@@ -1,11 +1,12 @@
 from django.urls import path, include
-from .apis import GetNetworthApi, GetNetworthDetailsApi, GetCategoryApi
+from .apis import GetNetworthApi, GetNetworthDetailsApi, GetCategoryApi, SyncApi
 
 urlpatterns = [
     # Core finance management endpoints - New DDD class-based APIs
     path('get-networth/', GetNetworthApi.as_view(), name='get_networth'),
     path('get-networth-details/', GetNetworthDetailsApi.as_view(), name='get_netWorth_details'),
     path('get-category/', GetCategoryApi.as_view(), name='get_category'),
+    path('sync/', SyncApi.as_view(), name='sync'),
     
     # Sub-app endpoints
     path('transaction/', include('transaction_management.urls')),
@@ -0,0 +1,19 @@
+import hashlib
+import hmac
+from django.conf import settings
+
+
+def normalize_text(value):
+    """Normalize free text before indexing: collapse whitespace and ignore case."""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def blind_index(*parts):
+    """
+    Keyed hash of the given parts.
+    Lets the database match equal plaintexts (exact lookups, IN probes, grouping)
+    without being able to read them, unlike the randomized encrypted columns.
+    """
+    key = str(settings.BLIND_INDEX_KEY).encode()
+    message = '\x1f'.join('' if part is None else str(part) for part in parts).encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
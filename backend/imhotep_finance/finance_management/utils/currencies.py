@@ -4,6 +4,8 @@ import requests
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
+from django.db.models import Sum
+from finance_management.utils.minor_units import from_minor_units
 from decouple import config
 from transaction_management.models import Transactions, NetWorth
 from finance_management.models import BaseExchangeRate
@@ -279,6 +281,85 @@ def convert_to_fav_currency(user, amounts_not_fav_currency):
         favorite_currency = getattr(user, 'favorite_currency', 'USD') if hasattr(user, 'favorite_currency') else 'USD'
         return False, favorite_currency
 
+def get_conversion_factors(user, currencies):
+    """
+    Get per-currency multipliers into the user's favorite currency with a single rates lookup.
+    Conversion for one amount is then: amount * factors[currency]
+    Returns: (factors_dict, favorite_currency) or (False, favorite_currency) on error
+    """
+    favorite_currency = get_fav_currency(user)
+
+    rates = get_or_update_rates(BASE_CURRENCY)
+    if rates is False:
+        print("No exchange rates available")
+        return False, favorite_currency
+
+    # Ensure base currency (USD) has rate of 1.0
+    rates[BASE_CURRENCY] = 1.0
+
+    if favorite_currency not in rates or rates[favorite_currency] is None:
+        print(f"Rate not available for favorite currency {favorite_currency}")
+        return False, favorite_currency
+
+    factors = {}
+    for currency in set(currencies):
+        if currency not in rates or not rates[currency]:
+            print(f"Rate not available for {currency}")
+            continue
+        factors[currency] = rates[favorite_currency] / rates[currency]
+
+    return factors, favorite_currency
+
+def get_base_factors(currencies):
+    """
+    Get per-currency multipliers into the base currency (USD) with a single rates lookup.
+    Currencies without a rate are left out; returns {} when no rates are available.
+    """
+    rates = get_or_update_rates(BASE_CURRENCY)
+    if rates is False:
+        print("No exchange rates available")
+        return {}
+
+    rates[BASE_CURRENCY] = 1.0
+    return {currency: 1.0 / rates[currency] for currency in set(currencies) if rates.get(currency)}
+
+def to_base_amount(amount, currency, factors=None):
+    """Convert one amount into the base currency, or None when its rate is unavailable."""
+    if factors is None:
+        factors = get_base_factors([currency])
+    factor = factors.get(currency)
+    return float(amount) * factor if factor else None
+
+def sum_in_favorite_currency(user, queryset):
+    """
+    Total a transactions queryset in the user's favorite currency.
+    Rows with amount_base are summed in SQL and converted with a single rate;
+    rows written before amount_base existed are summed per currency and converted as before.
+    Returns: (total, favorite_currency) or (False, favorite_currency) on error
+    """
+    favorite_currency = get_fav_currency(user)
+    total_base = queryset.filter(amount_base__isnull=False).aggregate(total=Sum('amount_base'))['total']
+
+    total = 0.0
+    if total_base:
+        factors, favorite_currency = get_conversion_factors(user, [BASE_CURRENCY])
+        if not factors:
+            return False, favorite_currency
+        total += total_base * factors[BASE_CURRENCY]
+
+    legacy_totals = {
+        currency: from_minor_units(total or 0, currency)
+        for currency, total in queryset.filter(amount_base__isnull=True).order_by()
+        .values('currency').annotate(total=Sum('amount_minor')).values_list('currency', 'total')
+    }
+    if legacy_totals:
+        legacy_total, favorite_currency = convert_to_fav_currency(user, legacy_totals)
+        if legacy_total is False:
+            return False, favorite_currency
+        total += legacy_total
+
+    return total, favorite_currency
+
 def select_currencies(user):
     """Get all currencies that the user has transactions in."""
     # get all currencies user has networth in
@@ -0,0 +1,109 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from finance_management.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _request_hash(request):
+    """Hash of what the request asks for, so a reused key with a different payload is caught."""
+    payload = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    fingerprint = f"{request.method}:{request.path}:{payload}"
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _abandoned(record, now):
+    """A reservation whose request never finished, e.g. because the worker died mid-request."""
+    timeout = timedelta(seconds=settings.IDEMPOTENCY_RESERVATION_TIMEOUT_SECONDS)
+    return record.status_code is None and record.created_at <= now - timeout
+
+
+def idempotent(view_method):
+    """
+    Decorator for APIView POST handlers honouring the Idempotency-Key header.
+    The first request with a key reserves it, runs the handler and stores a
+    successful response; retries with the same key and payload get the stored
+    response back from one indexed lookup, without re-running any side effects.
+    Requests without the header behave as before.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user
+        now = timezone.now()
+        request_hash = _request_hash(request)
+
+        record = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if record and (record.expires_at <= now or _abandoned(record, now)):
+            record.delete()
+            record = None
+
+        if record is None:
+            # Drop this user's expired keys while we are here
+            IdempotencyKey.objects.filter(user=user, expires_at__lte=now).delete()
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user=user,
+                        key=key,
+                        request_hash=request_hash,
+                        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+                    )
+            except IntegrityError:
+                # A concurrent request reserved the key first
+                record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            else:
+                try:
+                    response = view_method(self, request, *args, **kwargs)
+                except Exception:
+                    # Release the key so the client's retry runs the request again
+                    record.delete()
+                    raise
+                if status.is_success(response.status_code):
+                    record.status_code = response.status_code
+                    record.response_body = response.data
+                    record.save(update_fields=['status_code', 'response_body'])
+                else:
+                    # Failed requests had no side effects, let the client retry them
+                    record.delete()
+                return response
+
+        if record is None or record.status_code is None:
+            return Response(
+                {'error': 'A request with this Idempotency-Key is still being processed'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        if record.request_hash != request_hash:
+            return Response(
+                {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+
+        return _replay(record)
+
+    return wrapper
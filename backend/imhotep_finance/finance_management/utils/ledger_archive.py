@@ -0,0 +1,183 @@
+"""
+Cold storage for closed ledger years.
+
+Each (user, year) segment is the year's transactions serialized as JSON,
+gzip-compressed and encrypted with the field encryption keys, stored under
+LEDGER_ARCHIVE_ROOT and indexed by a LedgerArchiveSegment row. Archived
+transactions leave the transactions table; exports and report
+recalculation read them back through read_archived_transactions.
+"""
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import Max, Min
+from encrypted_model_fields.fields import get_crypter
+from finance_management.models import LedgerArchiveSegment
+from finance_management.utils.ledger_stats import get_ledger_stats, month_is_set, rebuild_ledger_stats
+from finance_management.utils.ledger_version import bump_ledger_version
+from finance_management.utils.minor_units import sync_minor_units
+from finance_management.utils.sync import record_tombstones
+from transaction_management.models import Transactions
+
+ARCHIVE_FIELDS = (
+    'id', 'date', 'amount', 'amount_base', 'currency', 'trans_status',
+    'category', 'trans_details', 'created_at', 'fingerprint',
+)
+BATCH_SIZE = 1000
+
+
+def _storage():
+    return FileSystemStorage(location=settings.LEDGER_ARCHIVE_ROOT)
+
+
+def encode_segment(rows):
+    payload = json.dumps(
+        [{**row, 'date': row['date'].isoformat(), 'created_at': row['created_at'].isoformat()} for row in rows],
+        separators=(',', ':'),
+    )
+    return get_crypter().encrypt(gzip.compress(payload.encode('utf-8')))
+
+
+def decode_segment(blob):
+    rows = json.loads(gzip.decompress(get_crypter().decrypt(blob)).decode('utf-8'))
+    for row in rows:
+        row['date'] = date.fromisoformat(row['date'])
+        row['created_at'] = datetime.fromisoformat(row['created_at'])
+    return rows
+
+
+def read_segment(segment):
+    with _storage().open(segment.path, 'rb') as segment_file:
+        blob = segment_file.read()
+    if hashlib.sha256(blob).hexdigest() != segment.checksum:
+        raise ValueError(f"Archive segment {segment.path} failed its checksum")
+    return decode_segment(blob)
+
+
+def _write_segment_file(path, blob):
+    storage = _storage()
+    if storage.exists(path):
+        storage.delete(path)
+    storage.save(path, ContentFile(blob))
+
+
+def delete_segment_file(path):
+    """Remove a segment file once the surrounding transaction commits."""
+    transaction.on_commit(lambda: _storage().delete(path))
+
+
+def read_archived_transactions(user, start_date=None, end_date=None):
+    """Return the user's archived transactions within the date range (inclusive), oldest first."""
+    segments = LedgerArchiveSegment.objects.filter(user=user)
+    if start_date:
+        segments = segments.filter(last_date__gte=start_date)
+    if end_date:
+        segments = segments.filter(first_date__lte=end_date)
+
+    rows = []
+    for segment in segments.order_by('year'):
+        rows.extend(
+            row for row in read_segment(segment)
+            if (not start_date or row['date'] >= start_date) and (not end_date or row['date'] <= end_date)
+        )
+    return rows
+
+
+def get_archived_date_bounds(user):
+    """Return (first_date, last_date) of the user's archived transactions, or (None, None)."""
+    bounds = LedgerArchiveSegment.objects.filter(user=user).aggregate(
+        first_date=Min('first_date'), last_date=Max('last_date')
+    )
+    return bounds['first_date'], bounds['last_date']
+
+
+def archive_user_year(user, year):
+    """
+    Move one closed year of a user's transactions into an archive segment.
+    Transactions linked to a wishlist item stay in the table. The year is
+    skipped unless every month with transactions already has its report.
+    Returns (archived_row_count, reason_if_skipped).
+    """
+    # Imported here: report calculation reads archived rows through this module
+    from user_reports.utils.report_queue import refresh_dirty_report_months
+
+    # Queued report rebuilds must land before the year's reports are checked
+    refresh_dirty_report_months(user=user, year=year)
+    stats = get_ledger_stats(user)
+    with transaction.atomic():
+        queryset = Transactions.objects.select_for_update(of=('self',)).filter(
+            user=user, date__year=year, wishlist_transaction__isnull=True
+        )
+        rows = list(queryset.order_by('date', 'id').values(*ARCHIVE_FIELDS))
+        if not rows:
+            return 0, "no transactions to archive"
+
+        months = {row['date'].month for row in rows}
+        missing = sorted(month for month in months if not month_is_set(stats.report_months, year, month))
+        if missing:
+            return 0, f"reports missing for month(s) {missing}; recalculate reports first"
+
+        segment = LedgerArchiveSegment.objects.select_for_update().filter(user=user, year=year).first()
+        if segment:
+            # A late transaction was added to an archived year: merge it into the segment
+            rows = sorted(read_segment(segment) + rows, key=lambda row: (row['date'], row['id']))
+            delete_segment_file(segment.path)
+        else:
+            segment = LedgerArchiveSegment(user=user, year=year)
+
+        blob = encode_segment(rows)
+        segment.row_count = len(rows)
+        segment.first_date = rows[0]['date']
+        segment.last_date = rows[-1]['date']
+        segment.checksum = hashlib.sha256(blob).hexdigest()
+        # A new file per version, so a rolled back archive run never clobbers the committed segment
+        segment.path = f"{user.pk}/{year}-{segment.checksum[:16]}.seg"
+        _write_segment_file(segment.path, blob)
+        segment.save()
+
+        _delete_transactions(user, [row['id'] for row in rows])
+        bump_ledger_version(user)
+
+    rebuild_ledger_stats(user)
+    return segment.row_count, None
+
+
+def restore_user_year(user, year):
+    """Move an archived year back into the transactions table. Returns the number of restored rows."""
+    from finance_management.signals import ledger_signals_suspended
+
+    with transaction.atomic():
+        segment = LedgerArchiveSegment.objects.select_for_update().filter(user=user, year=year).first()
+        if not segment:
+            return 0
+
+        rows = read_segment(segment)
+        restored = [Transactions(user=user, **row) for row in rows]
+        for trans_obj in restored:
+            sync_minor_units(trans_obj, 'amount', 'amount_minor')
+        with ledger_signals_suspended():
+            Transactions.objects.bulk_create(restored, batch_size=BATCH_SIZE)
+        # auto_now_add stamped created_at on insert, put the original values back
+        for trans_obj, row in zip(restored, rows):
+            trans_obj.created_at = row['created_at']
+        Transactions.objects.bulk_update(restored, ['created_at'], batch_size=BATCH_SIZE)
+        segment.delete()
+        bump_ledger_version(user)
+
+    rebuild_ledger_stats(user)
+    return len(rows)
+
+
+def _delete_transactions(user, transaction_ids):
+    from finance_management.signals import ledger_signals_suspended
+
+    with ledger_signals_suspended():
+        for start in range(0, len(transaction_ids), BATCH_SIZE):
+            Transactions.objects.filter(user=user, id__in=transaction_ids[start:start + BATCH_SIZE]).delete()
+    # Archived rows leave the live ledger, so sync clients drop them too
+    record_tombstones(user.pk, 'transaction', transaction_ids)
@@ -0,0 +1,138 @@
+"""
+Monthly rollups of the ledger.
+
+One LedgerRollup row per (user, year, month, currency, status, category)
+holds the count and exact minor-unit sum of the matching transactions.
+Single-row writes update it through the Transactions signals, bulk jobs
+through apply_rollup_changes, both inside the ledger write's transaction,
+so aggregate reads scale with months x currencies x categories, not rows.
+"""
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from finance_management.models import LedgerRollup
+from finance_management.utils.blind_index import blind_index
+from finance_management.utils.ledger_stats import _as_date
+from finance_management.utils.minor_units import to_minor_units
+from transaction_management.models import Transactions
+
+
+def category_index(user_id, category):
+    return blind_index('ledger_category', user_id, category or '')
+
+
+def rollup_entry(trans_date, currency, trans_status, category, amount=None, amount_minor=None):
+    """Normalized (year, month, currency, status, category, minor units) contribution of one transaction."""
+    trans_date = _as_date(trans_date)
+    if amount_minor is None:
+        amount_minor = to_minor_units(amount or 0, currency)
+    return trans_date.year, trans_date.month, currency, (trans_status or '').lower(), category or '', amount_minor
+
+
+def transaction_rollup_entry(trans_obj):
+    return rollup_entry(
+        trans_obj.date, trans_obj.currency, trans_obj.trans_status, trans_obj.category,
+        trans_obj.amount, trans_obj.amount_minor
+    )
+
+
+def apply_rollup_changes(user, added=(), removed=()):
+    """
+    Apply ledger writes that already happened to the user's rollups.
+    ``added`` and ``removed`` are iterables of rollup_entry tuples; an update
+    is the removal of the old entry plus the addition of the new one.
+    """
+    user_id = getattr(user, 'pk', user)
+    # (year, month, currency, status, category) -> [count, minor units]
+    deltas = defaultdict(lambda: [0, 0])
+    for *key, amount_minor in added:
+        deltas[tuple(key)][0] += 1
+        deltas[tuple(key)][1] += amount_minor
+    for *key, amount_minor in removed:
+        deltas[tuple(key)][0] -= 1
+        deltas[tuple(key)][1] -= amount_minor
+    deltas = {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+    if not user_id or not deltas:
+        return
+
+    with transaction.atomic():
+        for (year, month, currency, trans_status, category), (count, total) in deltas.items():
+            index = category_index(user_id, category)
+            rows = LedgerRollup.objects.filter(
+                user_id=user_id, year=year, month=month, currency=currency,
+                trans_status=trans_status, category_index=index
+            )
+            changes = {'count': F('count') + count, 'total_minor': F('total_minor') + total}
+            if rows.update(**changes) or count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    LedgerRollup.objects.create(
+                        user_id=user_id, year=year, month=month, currency=currency,
+                        trans_status=trans_status, category_index=index, category=category,
+                        count=count, total_minor=total
+                    )
+            except IntegrityError:
+                # A concurrent write created the row first
+                rows.update(**changes)
+
+        if any(count < 0 for count, _ in deltas.values()):
+            LedgerRollup.objects.filter(user_id=user_id, count__lte=0).delete()
+
+
+def _build_rollups(user_id):
+    """Scan the user's ledger, archived years included, into unsaved rollup rows."""
+    from finance_management.utils.ledger_archive import read_archived_transactions
+
+    totals = defaultdict(lambda: [0, 0])
+    rows = Transactions.objects.filter(user_id=user_id).values_list(
+        'date', 'currency', 'trans_status', 'category', 'amount', 'amount_minor'
+    )
+    entries = [rollup_entry(*row) for row in rows.iterator(chunk_size=2000)]
+    entries.extend(
+        rollup_entry(row['date'], row['currency'], row['trans_status'], row['category'], row['amount'])
+        for row in read_archived_transactions(user_id)
+    )
+    for *key, amount_minor in entries:
+        totals[tuple(key)][0] += 1
+        totals[tuple(key)][1] += amount_minor
+
+    return [
+        LedgerRollup(
+            user_id=user_id, year=year, month=month, currency=currency, trans_status=trans_status,
+            category_index=category_index(user_id, category), category=category,
+            count=count, total_minor=total
+        )
+        for (year, month, currency, trans_status, category), (count, total) in totals.items()
+    ]
+
+
+def rebuild_ledger_rollups(user):
+    """Recompute a user's rollups from scratch. Returns the number of rollup rows."""
+    user_id = getattr(user, 'pk', user)
+    with transaction.atomic():
+        rollups = _build_rollups(user_id)
+        LedgerRollup.objects.filter(user_id=user_id).delete()
+        LedgerRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def get_monthly_rollup_totals(user, start_date, end_date):
+    """
+    Totals of every month from start_date's month to end_date's month:
+    {(year, month): {(trans_status, currency, category): minor units}}, months without transactions left out.
+    """
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    start_key = start_date.year * 12 + start_date.month
+    end_key = end_date.year * 12 + end_date.month
+
+    totals = defaultdict(dict)
+    rows = LedgerRollup.objects.filter(
+        user=user, year__gte=start_date.year, year__lte=end_date.year
+    ).values_list('year', 'month', 'trans_status', 'currency', 'category', 'total_minor')
+    for year, month, trans_status, currency, category, total_minor in rows:
+        if not start_key <= year * 12 + month <= end_key:
+            continue
+        key = (trans_status, currency, category)
+        totals[(year, month)][key] = totals[(year, month)].get(key, 0) + total_minor
+    return totals
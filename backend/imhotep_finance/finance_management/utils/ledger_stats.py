@@ -0,0 +1,194 @@
+from datetime import date, datetime
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import ExtractMonth, ExtractYear, Lower
+from finance_management.models import LedgerStats
+from transaction_management.models import Transactions
+from user_reports.models import Reports
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def ledger_state(trans_date, trans_status):
+    """Normalized (date, status) pair of a transaction, as tracked by the stats."""
+    return _as_date(trans_date), (trans_status or '').lower()
+
+
+def _set_month(bitmaps, year, month, present):
+    """Set or clear a month bit; returns True if the bitmap changed."""
+    key = str(year)
+    mask = bitmaps.get(key, 0)
+    bit = 1 << (month - 1)
+    new_mask = mask | bit if present else mask & ~bit
+    if new_mask == mask:
+        return False
+    if new_mask:
+        bitmaps[key] = new_mask
+    else:
+        bitmaps.pop(key, None)
+    return True
+
+
+def month_is_set(bitmaps, year, month):
+    return bool(bitmaps.get(str(year), 0) & (1 << (month - 1)))
+
+
+def months_in_bitmap(bitmaps, descending=True):
+    """Return the (year, month) pairs flagged in a month bitmap."""
+    months = [
+        (int(year), month)
+        for year, mask in bitmaps.items()
+        for month in range(1, 13)
+        if mask & (1 << (month - 1))
+    ]
+    return sorted(months, reverse=descending)
+
+
+def _build_stats(user_id):
+    """Scan the user's ledger and reports once to build their stats."""
+    stats = LedgerStats(user_id=user_id)
+    transactions = Transactions.objects.filter(user_id=user_id)
+
+    for row in transactions.values(status=Lower('trans_status')).annotate(total=Count('id')).order_by():
+        if row['status'] == 'deposit':
+            stats.deposit_count = row['total']
+        elif row['status'] == 'withdraw':
+            stats.withdraw_count = row['total']
+
+    bounds = transactions.aggregate(first_date=Min('date'), last_date=Max('date'))
+    stats.first_date = bounds['first_date']
+    stats.last_date = bounds['last_date']
+
+    transaction_months = (
+        transactions.annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values_list('year', 'month').distinct().order_by()
+    )
+    for year, month in transaction_months:
+        _set_month(stats.transaction_months, year, month, True)
+
+    for year, month in Reports.objects.filter(user_id=user_id).values_list('year', 'month').distinct().order_by():
+        _set_month(stats.report_months, year, month, True)
+
+    return stats
+
+
+def rebuild_ledger_stats(user):
+    """Recompute a user's stats from scratch and store them."""
+    user_id = getattr(user, 'pk', user)
+    stats = _build_stats(user_id)
+    with transaction.atomic():
+        LedgerStats.objects.filter(user_id=user_id).delete()
+        stats.save()
+    return stats
+
+
+def get_ledger_stats(user):
+    """Return the user's stats, building them on first use."""
+    user_id = getattr(user, 'pk', user)
+    stats = LedgerStats.objects.filter(user_id=user_id).first()
+    return stats or rebuild_ledger_stats(user_id)
+
+
+def _locked_stats(user_id):
+    """Lock the stats row for an incremental update; None if it had to be built from the current ledger."""
+    stats = LedgerStats.objects.select_for_update().filter(user_id=user_id).first()
+    if stats is None:
+        rebuild_ledger_stats(user_id)
+    return stats
+
+
+def apply_ledger_stats_changes(user, added=(), removed=()):
+    """
+    Apply ledger writes that already happened to the user's stats.
+    ``added`` and ``removed`` are iterables of (date, trans_status) pairs;
+    an update is the removal of the old pair plus the addition of the new one.
+    """
+    user_id = getattr(user, 'pk', user)
+    added = [ledger_state(*pair) for pair in added]
+    removed = [ledger_state(*pair) for pair in removed]
+    if not user_id or not (added or removed):
+        return
+
+    with transaction.atomic():
+        stats = _locked_stats(user_id)
+        if stats is None:
+            # Built from the ledger, which already contains these writes
+            return
+
+        recompute_bounds = False
+        emptied_months = set()
+        for trans_date, trans_status in removed:
+            if trans_status == 'deposit':
+                stats.deposit_count = max(stats.deposit_count - 1, 0)
+            elif trans_status == 'withdraw':
+                stats.withdraw_count = max(stats.withdraw_count - 1, 0)
+            emptied_months.add((trans_date.year, trans_date.month))
+            if trans_date == stats.first_date or trans_date == stats.last_date:
+                recompute_bounds = True
+
+        for trans_date, trans_status in added:
+            if trans_status == 'deposit':
+                stats.deposit_count += 1
+            elif trans_status == 'withdraw':
+                stats.withdraw_count += 1
+            _set_month(stats.transaction_months, trans_date.year, trans_date.month, True)
+            emptied_months.discard((trans_date.year, trans_date.month))
+            if stats.first_date is None or trans_date < stats.first_date:
+                stats.first_date = trans_date
+            if stats.last_date is None or trans_date > stats.last_date:
+                stats.last_date = trans_date
+
+        user_transactions = Transactions.objects.filter(user_id=user_id)
+        for year, month in emptied_months:
+            if not user_transactions.filter(date__year=year, date__month=month).exists():
+                _set_month(stats.transaction_months, year, month, False)
+
+        if recompute_bounds:
+            bounds = user_transactions.aggregate(first_date=Min('date'), last_date=Max('date'))
+            stats.first_date = bounds['first_date']
+            stats.last_date = bounds['last_date']
+
+        stats.save()
+
+
+def set_report_month(user, year, month, present=True):
+    """Flag or unflag a month in the user's report history."""
+    user_id = getattr(user, 'pk', user)
+    with transaction.atomic():
+        stats = _locked_stats(user_id)
+        if stats is not None and _set_month(stats.report_months, year, month, present):
+            stats.save(update_fields=['report_months', 'updated_at'])
+
+
+def count_transactions_from_stats(stats, start_date, end_date, trans_status=None):
+    """
+    Count the transactions in [start_date, end_date] from the stats alone.
+    Returns None when the range only partially covers the ledger and a real
+    COUNT is needed.
+    """
+    if trans_status == 'deposit':
+        total = stats.deposit_count
+    elif trans_status == 'withdraw':
+        total = stats.withdraw_count
+    else:
+        total = stats.transaction_count
+
+    if not total or stats.first_date is None:
+        return 0
+    if start_date <= stats.first_date and end_date >= stats.last_date:
+        return total
+    if end_date < stats.first_date or start_date > stats.last_date:
+        return 0
+
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        if month_is_set(stats.transaction_months, year, month):
+            return None
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return 0
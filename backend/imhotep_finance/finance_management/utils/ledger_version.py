@@ -0,0 +1,91 @@
+import hashlib
+from datetime import date
+from functools import wraps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from finance_management.models import LedgerVersion
+
+
+def bump_ledger_version(user):
+    """Increment the user's ledger version; runs inside the caller's transaction."""
+    user_id = getattr(user, 'pk', user)
+    if not user_id:
+        return
+
+    updated = LedgerVersion.objects.filter(user_id=user_id).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                LedgerVersion.objects.create(user_id=user_id, version=1)
+        except IntegrityError:
+            # Created concurrently, increment the existing row instead
+            LedgerVersion.objects.filter(user_id=user_id).update(
+                version=F('version') + 1, updated_at=timezone.now()
+            )
+
+
+def get_ledger_version(user):
+    """Return the user's current ledger version (0 if nothing was written yet)."""
+    version = LedgerVersion.objects.filter(user_id=user.pk).values_list('version', flat=True).first()
+    return version or 0
+
+
+def ledger_cache_key(user, *parts):
+    """
+    Cache key for a value computed from the user's ledger.
+    Like the ETag it covers the ledger version, the favorite currency and the current day,
+    so a cached value is never served once any of them has moved on.
+    """
+    version = get_ledger_version(user)
+    suffix = ':'.join(str(part) for part in parts)
+    return f"ledger:{user.pk}:{version}:{getattr(user, 'favorite_currency', 'USD')}:{date.today().isoformat()}:{suffix}"
+
+
+def get_ledger_etag(request):
+    """
+    Build a weak ETag for a read endpoint.
+    Besides the ledger version it covers the favorite currency and the current day,
+    since converted values change when either does (exchange rates refresh daily).
+    """
+    user = request.user
+    version = get_ledger_version(user)
+    fingerprint = f"{user.pk}:{getattr(user, 'favorite_currency', 'USD')}:{date.today().isoformat()}:{request.get_full_path()}"
+    digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def _etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or etag[2:] in candidates
+
+
+def ledger_etag(view_method):
+    """
+    Decorator for APIView GET handlers.
+    Answers a matching If-None-Match with 304 before the handler runs any query,
+    otherwise tags the successful response with the current ETag.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        etag = get_ledger_etag(request)
+
+        if _etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
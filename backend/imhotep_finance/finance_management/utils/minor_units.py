@@ -0,0 +1,63 @@
+"""
+Exact integer storage of money amounts.
+
+Every amount column has an integer companion holding the amount in minor
+units of its currency (cents for USD, fils for KWD). The exponent comes from
+the ISO 4217 registry below; amounts are accepted with two decimals in every
+currency, so storage never uses fewer than two. The float column is snapped
+to the stored units on every save, so repeated += / -= cannot drift, and SQL
+aggregates over the integer column are exact.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+DEFAULT_EXPONENT = 2
+# Amounts are validated with two decimal places whatever the currency
+MIN_STORAGE_EXPONENT = 2
+
+# ISO 4217 minor units of the supported currencies that differ from the default
+CURRENCY_EXPONENTS = {
+    'BIF': 0, 'CLP': 0, 'DJF': 0, 'GNF': 0, 'ISK': 0, 'JPY': 0, 'KMF': 0, 'KRW': 0,
+    'PYG': 0, 'RWF': 0, 'UGX': 0, 'VND': 0, 'VUV': 0, 'XAF': 0, 'XOF': 0, 'XPF': 0,
+    'BHD': 3, 'IQD': 3, 'JOD': 3, 'KWD': 3, 'LYD': 3, 'OMR': 3, 'TND': 3,
+}
+
+
+def currency_exponent(currency):
+    """ISO 4217 number of decimals of a currency."""
+    return CURRENCY_EXPONENTS.get(currency, DEFAULT_EXPONENT)
+
+
+def storage_exponent(currency):
+    """Number of decimals stored for a currency."""
+    return max(currency_exponent(currency), MIN_STORAGE_EXPONENT)
+
+
+def to_minor_units(amount, currency):
+    """Convert an amount into integer minor units, rounding half up."""
+    if amount is None:
+        return None
+    scaled = Decimal(str(amount)).scaleb(storage_exponent(currency))
+    return int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(units, currency):
+    """Convert integer minor units back into an amount."""
+    if units is None:
+        return None
+    return float(Decimal(int(units)).scaleb(-storage_exponent(currency)))
+
+
+def sync_minor_units(instance, amount_field, minor_field, save_kwargs=None):
+    """
+    Store the minor units of an instance's amount and snap the float amount to them.
+    When the save kwargs restrict update_fields to the amount, the minor field is added.
+    """
+    units = to_minor_units(getattr(instance, amount_field), instance.currency)
+    setattr(instance, minor_field, units)
+    if units is not None:
+        setattr(instance, amount_field, from_minor_units(units, instance.currency))
+
+    update_fields = (save_kwargs or {}).get('update_fields')
+    if update_fields is not None and minor_field not in update_fields:
+        if amount_field in update_fields or 'currency' in update_fields:
+            save_kwargs['update_fields'] = [*update_fields, minor_field]
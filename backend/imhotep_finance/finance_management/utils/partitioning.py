@@ -0,0 +1,206 @@
+"""
+Yearly range partitioning of the transactions table on PostgreSQL.
+
+The partitioned table keeps the model's columns, indexes and foreign keys;
+its primary key becomes (id, date) because PostgreSQL requires the partition
+key in every unique constraint. ids are still unique since they come from a
+single sequence. Foreign keys pointing at the table (wishlist.transaction)
+cannot be kept for the same reason and are dropped; Django already applies
+their on_delete behaviour in Python.
+"""
+from datetime import date
+from django.db import connection, transaction
+from django.db.models import Min
+from transaction_management.models import Transactions
+
+TABLE = Transactions._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def partition_name(year):
+    return f"{TABLE}_y{year}"
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _check_vendor():
+    if connection.vendor != 'postgresql':
+        raise PartitioningError("Table partitioning is only available on PostgreSQL")
+
+
+def is_partitioned():
+    _check_vendor()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = current_schema()",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def list_partitions():
+    """Return [(partition_name, bounds_expression, approximate_rows)] for the attached partitions."""
+    _check_vendor()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s ORDER BY c.relname",
+            [TABLE],
+        )
+        return cursor.fetchall()
+
+
+def _default_rows_in_year(cursor, year):
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {_quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s)",
+        [date(year, 1, 1), date(year + 1, 1, 1)],
+    )
+    return cursor.fetchone()[0]
+
+
+def create_year_partition(year):
+    """
+    Create the partition for one year. Rows of that year that landed in the
+    default partition are moved into it. Returns False if it already existed.
+    """
+    name = partition_name(year)
+    if any(partition == name for partition, _, _ in list_partitions()):
+        return False
+
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if _default_rows_in_year(cursor, year):
+            # PostgreSQL refuses a new partition whose range still has rows in the default one
+            cursor.execute(f"CREATE TABLE {_quote(name)} (LIKE {_quote(TABLE)} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {_quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s RETURNING *) "
+                f"INSERT INTO {_quote(name)} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {_quote(TABLE)} ATTACH PARTITION {_quote(name)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        else:
+            cursor.execute(
+                f"CREATE TABLE {_quote(name)} PARTITION OF {_quote(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+    return True
+
+
+def ensure_year_partitions(years_ahead=1):
+    """Create any missing partitions from the oldest transaction year up to ``years_ahead`` years from now."""
+    if not is_partitioned():
+        return []
+
+    first_date = Transactions.objects.aggregate(first=Min('date'))['first']
+    current_year = date.today().year
+    first_year = first_date.year if first_date else current_year
+    return [
+        year for year in range(first_year, current_year + years_ahead + 1)
+        if create_year_partition(year)
+    ]
+
+
+def detach_year_partition(year, drop=False):
+    """Detach (and optionally drop) one year; its rows leave the ledger but stay in a standalone table unless dropped."""
+    name = partition_name(year)
+    if not any(partition == name for partition, _, _ in list_partitions()):
+        raise PartitioningError(f"No partition for {year}")
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(name)}")
+        if drop:
+            cursor.execute(f"DROP TABLE {_quote(name)}")
+    return name
+
+
+def convert_to_partitioned(years_ahead=1):
+    """
+    Rebuild the transactions table as a yearly range-partitioned table.
+    Runs in one transaction holding an exclusive lock, copying every row once.
+    Returns the names of the foreign keys that referenced the table and were dropped.
+    """
+    if is_partitioned():
+        raise PartitioningError(f"{TABLE} is already partitioned")
+
+    legacy = f"{TABLE}_unpartitioned"
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Django's foreign keys are deferred; pending checks would make PostgreSQL refuse the ALTERs below
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"LOCK TABLE {_quote(TABLE)} IN ACCESS EXCLUSIVE MODE")
+
+        # Remember the secondary indexes and outgoing foreign keys to recreate them
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema() "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+            [TABLE, TABLE],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+
+        # Foreign keys into the table need a unique id, which a partitioned table cannot offer
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE confrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        incoming = cursor.fetchall()
+        for table, constraint in incoming:
+            cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {_quote(constraint)}")
+
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        legacy_sequence = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {_quote(TABLE)} RENAME TO {_quote(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {_quote(TABLE)} (LIKE {_quote(legacy)} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+            f"PARTITION BY RANGE (date)"
+        )
+        cursor.execute(f"ALTER TABLE {_quote(TABLE)} ADD PRIMARY KEY (id, date)")
+        cursor.execute(f"CREATE TABLE {_quote(DEFAULT_PARTITION)} PARTITION OF {_quote(TABLE)} DEFAULT")
+
+        cursor.execute(f"SELECT MIN(date), MAX(id) FROM {_quote(legacy)}")
+        first_date, max_id = cursor.fetchone()
+        first_year = first_date.year if first_date else date.today().year
+        for year in range(first_year, date.today().year + years_ahead + 1):
+            cursor.execute(
+                f"CREATE TABLE {_quote(partition_name(year))} PARTITION OF {_quote(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+                [date(year, 1, 1), date(year + 1, 1, 1)],
+            )
+
+        cursor.execute(f"INSERT INTO {_quote(TABLE)} SELECT * FROM {_quote(legacy)}")
+
+        # Serial ids keep using the old sequence, identity ids continue from the copied maximum
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        new_sequence = cursor.fetchone()[0]
+        if new_sequence:
+            if max_id:
+                cursor.execute("SELECT setval(%s, %s)", [new_sequence, max_id])
+        elif legacy_sequence:
+            cursor.execute(f"ALTER SEQUENCE {legacy_sequence} OWNED BY {_quote(TABLE)}.id")
+
+        cursor.execute(f"DROP TABLE {_quote(legacy)}")
+
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        for constraint, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(constraint)} {definition}")
+
+    return [constraint for _, constraint in incoming]
@@ -1,51 +1,54 @@
-from django.db.models import Sum, Q
+from django.db.models import Sum
 from transaction_management.models import Transactions, NetWorth
+from finance_management.utils.ledger_archive import read_archived_transactions
+from finance_management.utils.minor_units import from_minor_units, to_minor_units
 
 def recalculate_networth(user):
-    """Recalculate user's networth from all transactions."""
+    """Recalculate user's networth from all transactions, archived years included."""
     try:
         if not user:
             return False, "User must be provided"
 
-        # Get all unique currencies from user's transactions using Python set for true uniqueness
-        currencies_queryset = Transactions.objects.filter(user=user).values_list('currency', flat=True)
-        unique_currencies = list(set(currencies_queryset))  # Convert to set then back to list for true uniqueness
+        # Exact deposit and withdraw sums per currency, in minor units
+        sums = {}
+        rows = Transactions.objects.filter(user=user).values('currency', 'trans_status').annotate(
+            total=Sum('amount_minor')
+        ).order_by()
+        for row in rows:
+            currency_sums = sums.setdefault(row['currency'], {'deposit': 0, 'withdraw': 0})
+            trans_status = row['trans_status'].lower()
+            if trans_status in currency_sums:
+                currency_sums[trans_status] += row['total'] or 0
 
+        # Archived years left the transactions table but still count towards the balance
+        for trans in read_archived_transactions(user):
+            currency_sums = sums.setdefault(trans['currency'], {'deposit': 0, 'withdraw': 0})
+            trans_status = trans['trans_status'].lower()
+            if trans_status in currency_sums:
+                currency_sums[trans_status] += to_minor_units(trans['amount'], trans['currency'])
+
+        unique_currencies = list(sums)
         print(f"Unique currencies: {unique_currencies}")
         
+        # Clear existing networth records for this user
+        NetWorth.objects.filter(user=user).delete()
+        
         if not unique_currencies:
-            # Clear existing networth records if no transactions exist
-            NetWorth.objects.filter(user=user).delete()
             return True, {
                 "currencies_processed": 0,
                 "networth_records_created": 0,
                 "currency_totals": {}
             }
         
-        # Clear existing networth records for this user
-        NetWorth.objects.filter(user=user).delete()
-        
         # Calculate totals for each currency
         currency_totals = {}
         created_count = 0
         
-        for currency in unique_currencies:
-            # Get all deposits for this currency (case insensitive)
-            deposits = Transactions.objects.filter(
-                user=user,
-                currency=currency,
-                trans_status__in=['Deposit', 'deposit']
-            ).aggregate(total=Sum('amount'))['total'] or 0.0
-            
-            # Get all withdrawals for this currency (case insensitive)
-            withdrawals = Transactions.objects.filter(
-                user=user,
-                currency=currency,
-                trans_status__in=['Withdraw', 'withdraw']
-            ).aggregate(total=Sum('amount'))['total'] or 0.0
+        for currency, currency_sums in sums.items():
+            deposits, withdrawals = currency_sums['deposit'], currency_sums['withdraw']
             
             # Calculate net balance (deposits - withdrawals)
-            net_balance = float(deposits) - float(withdrawals)
+            net_balance = from_minor_units(deposits - withdrawals, currency)
             currency_totals[currency] = net_balance
             
             # Create networth record for all currencies (even zero balances for tracking)
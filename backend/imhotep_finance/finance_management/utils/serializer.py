@@ -2,7 +2,7 @@ def serialize_transaction(trans):
 
     return {
         "id": trans.id,
-        "user_id": trans.user.id if trans.user else None,
+        "user_id": trans.user_id,
         "date": trans.date.isoformat() if trans.date else None,
         "amount": trans.amount,
         "currency": trans.currency,
@@ -13,11 +13,12 @@ def serialize_transaction(trans):
     }
 
 def serialize_wishlist(wish):
+    transaction = wish.transaction if wish.transaction_id else None
     return {
         "id": wish.id,
         "user_id": wish.user_id,
-        "transaction_id": wish.transaction.id if wish.transaction else None,
-        "transaction_date":  wish.transaction.date.isoformat() if wish.transaction and wish.transaction.date else None,
+        "transaction_id": wish.transaction_id,
+        "transaction_date":  transaction.date.isoformat() if transaction and transaction.date else None,
         "year": wish.year,
         "price": wish.price,
         "currency": wish.currency,
@@ -31,7 +32,7 @@ def serialize_scheduled_trans(scheduled_trans):
 
     return {
         "id": scheduled_trans.id,
-        "user_id": scheduled_trans.user.id if scheduled_trans.user else None,
+        "user_id": scheduled_trans.user_id,
         "day_of_month": scheduled_trans.date,
         "amount": scheduled_trans.amount,
         "currency": scheduled_trans.currency,
@@ -47,10 +48,97 @@ def serialize_target(target_obj):
 
     return {
         "id": target_obj.id,
-        "user_id": target_obj.user.id if target_obj.user else None,
+        "user_id": target_obj.user_id,
         "target": target_obj.target,
         "month": target_obj.month,
         "year": target_obj.year,
         "score": target_obj.score,
         "created_at": target_obj.created_at.isoformat() if target_obj.created_at else None,
-    }
\ No newline at end of file
+    }
+
+
+# Row-based serializers for list endpoints.
+#
+# List pages call ``queryset.values(*<MODEL>_VALUES)`` and feed the resulting
+# dicts to the ``serialize_*_row`` helpers below, so no model instances are
+# built and foreign keys are read from their ``*_id`` columns (or a join)
+# instead of lazy per-row fetches. Encrypted fields are still decrypted,
+# because ``values()`` applies the field's ``from_db_value`` converter.
+
+TRANSACTION_VALUES = (
+    'id', 'user_id', 'date', 'amount', 'currency',
+    'trans_status', 'trans_details', 'category', 'created_at',
+)
+
+WISHLIST_VALUES = (
+    'id', 'user_id', 'transaction_id', 'transaction__date', 'year', 'price',
+    'currency', 'status', 'link', 'wish_details', 'created_at',
+)
+
+SCHEDULED_TRANS_VALUES = (
+    'id', 'user_id', 'date', 'amount', 'currency', 'scheduled_trans_status',
+    'scheduled_trans_details', 'category', 'status', 'created_at',
+)
+
+TARGET_VALUES = ('id', 'user_id', 'target', 'month', 'year', 'score', 'created_at')
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def serialize_transaction_row(row):
+    return {
+        "id": row['id'],
+        "user_id": row['user_id'],
+        "date": _isoformat(row['date']),
+        "amount": row['amount'],
+        "currency": row['currency'],
+        "trans_status": row['trans_status'],
+        "trans_details": row['trans_details'],
+        "category": row['category'],
+        "created_at": _isoformat(row['created_at']),
+    }
+
+
+def serialize_wishlist_row(row):
+    return {
+        "id": row['id'],
+        "user_id": row['user_id'],
+        "transaction_id": row['transaction_id'],
+        "transaction_date": _isoformat(row['transaction__date']),
+        "year": row['year'],
+        "price": row['price'],
+        "currency": row['currency'],
+        "status": row['status'],
+        "link": row['link'],
+        "wish_details": row['wish_details'],
+        "created_at": _isoformat(row['created_at']),
+    }
+
+
+def serialize_scheduled_trans_row(row):
+    return {
+        "id": row['id'],
+        "user_id": row['user_id'],
+        "day_of_month": row['date'],
+        "amount": row['amount'],
+        "currency": row['currency'],
+        "scheduled_trans_status": row['scheduled_trans_status'],
+        "scheduled_trans_details": row['scheduled_trans_details'],
+        "category": row['category'],
+        "status": row['status'],
+        "created_at": _isoformat(row['created_at']),
+    }
+
+
+def serialize_target_row(row):
+    return {
+        "id": row['id'],
+        "user_id": row['user_id'],
+        "target": row['target'],
+        "month": row['month'],
+        "year": row['year'],
+        "score": row['score'],
+        "created_at": _isoformat(row['created_at']),
+    }
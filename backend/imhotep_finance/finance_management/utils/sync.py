@@ -0,0 +1,86 @@
+"""
+Delta sync of a user's transactions, wishes and scheduled transactions.
+
+A sync token is a signed timestamp. Rows changed since then are found through
+the (user, updated_at) indexes, deleted rows through SyncTombstone. Tokens
+overlap the previous sync by a few seconds so rows committed by a transaction
+that started before the token was issued are not missed; clients apply
+changes as upserts, so seeing a row twice is harmless.
+
+Large downloads are split into pages of at most SYNC_PAGE_SIZE rows, walked
+kind by kind in (updated_at, id) order. Each page but the last carries a
+signed cursor; the sync token is only handed out with the last page and is
+dated at the first one, so rows changed while paging are picked up next time.
+"""
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from finance_management.models import SyncTombstone
+
+TOKEN_SALT = 'finance_management.sync'
+TOKEN_OVERLAP = timedelta(seconds=30)
+CURSOR_SALT = 'finance_management.sync.cursor'
+
+
+class InvalidSyncToken(Exception):
+    pass
+
+
+def make_sync_token(user, issued_at):
+    return signing.dumps({'u': user.pk, 't': issued_at.isoformat()}, salt=TOKEN_SALT, compress=True)
+
+
+def read_sync_token(user, token):
+    """Return the time a token was issued, raising InvalidSyncToken if it was tampered with or belongs to someone else."""
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        issued_at = datetime.fromisoformat(payload['t'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidSyncToken("Invalid sync token")
+    if payload.get('u') != user.pk:
+        raise InvalidSyncToken("Invalid sync token")
+    return issued_at
+
+
+def make_sync_cursor(user, issued_at, changed_since, reset, kind_index, last_row):
+    """Continuation cursor of a paged sync; last_row is (updated_at, id) of the last row sent, or None."""
+    payload = {
+        'u': user.pk,
+        't': issued_at.isoformat(),
+        's': changed_since.isoformat() if changed_since else None,
+        'r': reset,
+        'k': kind_index,
+        'a': last_row[0].isoformat() if last_row else None,
+        'i': last_row[1] if last_row else None,
+    }
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def read_sync_cursor(user, cursor):
+    """Return (issued_at, changed_since, reset, kind_index, last_row) of a cursor, raising InvalidSyncToken if it is not valid."""
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+        issued_at = datetime.fromisoformat(payload['t'])
+        changed_since = datetime.fromisoformat(payload['s']) if payload['s'] else None
+        last_row = (datetime.fromisoformat(payload['a']), int(payload['i'])) if payload['a'] else None
+        state = (issued_at, changed_since, bool(payload['r']), int(payload['k']), last_row)
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidSyncToken("Invalid sync cursor")
+    if payload.get('u') != user.pk:
+        raise InvalidSyncToken("Invalid sync cursor")
+    return state
+
+
+def tombstone_horizon():
+    """Deletions older than this are pruned; tokens issued before it need a full resync."""
+    return timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def record_tombstones(user_id, kind, object_ids):
+    """Remember deleted rows of one kind for sync clients."""
+    deleted_at = timezone.now()
+    SyncTombstone.objects.bulk_create([
+        SyncTombstone(user_id=user_id, kind=kind, object_id=object_id, deleted_at=deleted_at)
+        for object_id in object_ids
+    ])
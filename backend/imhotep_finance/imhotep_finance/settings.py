@@ -88,6 +88,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'imhotep_finance.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -262,6 +266,12 @@ CORS_ALLOWED_ORIGINS = [
     SITE_DOMAIN
 ]
 
+# Let clients send conditional requests, read ETags of ledger read endpoints and retry writes safely
+from corsheaders.defaults import default_headers
+
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match', 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['ETag', 'Idempotent-Replayed']
+
 # Add logging configuration
 LOGGING = {
     'version': 1,
@@ -360,6 +370,23 @@ SPECTACULAR_SETTINGS = {
 
 FIELD_ENCRYPTION_KEY = config('FIELD_ENCRYPTION_KEY')
 
+# Key for blind indexes (keyed hashes that allow lookups over encrypted data)
+BLIND_INDEX_KEY = config('BLIND_INDEX_KEY', default=FIELD_ENCRYPTION_KEY)
+
+# How long stored responses of Idempotency-Key requests are replayed
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+# After this long a reservation whose request never completed is considered abandoned and released
+IDEMPOTENCY_RESERVATION_TIMEOUT_SECONDS = config('IDEMPOTENCY_RESERVATION_TIMEOUT_SECONDS', default=300, cast=int)
+
+# Where archived (cold) ledger years are stored as compressed, encrypted segment files
+LEDGER_ARCHIVE_ROOT = config('LEDGER_ARCHIVE_ROOT', default=str(BASE_DIR / 'ledger_archive'))
+
+# How long deletions are kept for delta sync; clients with older sync tokens start over
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=90, cast=int)
+
+# Maximum number of rows in one page of the sync endpoint
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=1000, cast=int)
+
 UNFOLD = {
     "COMMAND_PALETTE": {
         "items": [], 
@@ -8,6 +8,9 @@ DATABASES = {
     }
 }
 
+# Flags test mode (e.g. default exchange rates) even inside override_settings, which hides SETTINGS_MODULE
+TESTING = True
+
 # Silence only noisy HTTP request error logs during tests
 LOGGING = {
     "version": 1,
@@ -22,7 +22,9 @@ from scheduled_trans_management.serializers import (
     ScheduledTransactionFilterSerializer,
     ScheduledTransactionListResponseSerializer
 )
-from finance_management.utils.serializer import serialize_scheduled_trans
+from finance_management.utils.serializer import SCHEDULED_TRANS_VALUES, serialize_scheduled_trans_row
+from finance_management.utils.ledger_version import ledger_etag
+from finance_management.utils.idempotency import idempotent
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -39,6 +41,7 @@ class ScheduledTransactionCreateApi(APIView):
         },
         operation_id='create_scheduled_transaction'
     )
+    @idempotent
     def post(self, request):
         """Create a scheduled transaction."""
         serializer = ScheduledTransactionInputSerializer(data=request.data)
@@ -178,6 +181,7 @@ class ScheduledTransactionListApi(APIView):
         responses={200: ScheduledTransactionListResponseSerializer},
         operation_id='list_scheduled_transactions'
     )
+    @ledger_etag
     def get(self, request):
         """Get paginated scheduled transactions for the logged-in user."""
         try:
@@ -192,7 +196,7 @@ class ScheduledTransactionListApi(APIView):
             )
             
             # Paginate results
-            paginator = Paginator(scheduled_trans_qs, 20)
+            paginator = Paginator(scheduled_trans_qs.values(*SCHEDULED_TRANS_VALUES), 20)
             page_num = filters.get('page', 1)
             
             try:
@@ -201,7 +205,7 @@ class ScheduledTransactionListApi(APIView):
                 page_obj = paginator.page(1)
             
             # Serialize scheduled transactions
-            scheduled_trans_list = [serialize_scheduled_trans(st) for st in page_obj.object_list]
+            scheduled_trans_list = [serialize_scheduled_trans_row(row) for row in page_obj.object_list]
             
             response_data = {
                 "scheduled_transactions": scheduled_trans_list,
@@ -287,6 +291,7 @@ class ApplyScheduledTransactionsApi(APIView):
         description='Apply scheduled transactions for the user; idempotent once per day.',
         operation_id='apply_scheduled_transactions'
     )
+    @idempotent
     def post(self, request):
         """
         Trigger processing of scheduled transactions for the authenticated user.
@@ -2,6 +2,7 @@ from django.db import models
 from accounts.models import User
 from django.utils import timezone
 from encrypted_model_fields.fields import EncryptedCharField
+from finance_management.utils.minor_units import sync_minor_units
 
 def current_year():
     return timezone.now().year
@@ -25,6 +26,8 @@ class ScheduledTransaction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scheduled_transaction_user')
     date = models.IntegerField(default=current_day)
     amount = models.FloatField()
+    # amount in integer minor units of its currency, kept in sync on save
+    amount_minor = models.BigIntegerField(blank=True, null=True, editable=False)
     currency = models.CharField(max_length=4)
     scheduled_trans_status = models.CharField(max_length=8, choices=TRANSACTIONS_STATUS)
     scheduled_trans_details = EncryptedCharField(max_length=255, blank=True, null=True)
@@ -32,6 +35,11 @@ class ScheduledTransaction(models.Model):
     last_time_added = models.DateTimeField(blank=True, null=True)
     status =  models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        sync_minor_units(self, 'amount', 'amount_minor', kwargs)
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"ScheduledTransaction of {self.user.username} ({self.date}) with amount {self.amount} and status {self.scheduled_trans_status}"
@@ -41,3 +49,6 @@ class ScheduledTransaction(models.Model):
         verbose_name = "ScheduledTransaction"
         verbose_name_plural = "ScheduledTransactions"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='scheduled_user_updated_idx'),
+        ]
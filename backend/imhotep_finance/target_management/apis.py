@@ -16,7 +16,8 @@ from target_management.serializers import (
     TargetHistoryResponseSerializer
 )
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from finance_management.utils.serializer import serialize_target
+from finance_management.utils.serializer import TARGET_VALUES, serialize_target_row
+from finance_management.utils.ledger_version import ledger_etag
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
@@ -68,6 +69,7 @@ class GetTargetApi(APIView):
         description="Get latest target for authenticated user.",
         operation_id='get_target'
     )
+    @ledger_etag
     def get(self, request):
         """Get latest target for authenticated user."""
         try:
@@ -107,6 +109,7 @@ class GetScoreApi(APIView):
         description="Get current month score relative to target.",
         operation_id='get_score'
     )
+    @ledger_etag
     def get(self, request):
         """Get current month score relative to target."""
         try:
@@ -151,13 +154,14 @@ class GetScoreHistoryApi(APIView):
         description="Get paginated target history for authenticated user.",
         operation_id='get_target_history'
     )
+    @ledger_etag
     def get(self, request):
         """Get paginated target history for authenticated user."""
         try:
             targets = get_all_targets_for_user(user=request.user)
             
             # Paginate results
-            paginator = Paginator(targets, 20)
+            paginator = Paginator(targets.values(*TARGET_VALUES), 20)
             page_num = request.GET.get('page', 1)
             
             try:
@@ -165,7 +169,7 @@ class GetScoreHistoryApi(APIView):
             except (PageNotAnInteger, EmptyPage):
                 page_obj = paginator.page(1)
 
-            target_list = [serialize_target(t) for t in page_obj.object_list]
+            target_list = [serialize_target_row(row) for row in page_obj.object_list]
 
             response_data = {
                 "targets": target_list,
@@ -3,7 +3,7 @@ from target_management.models import Target
 from transaction_management.models import Transactions
 from datetime import datetime
 from django.db import transaction as db_transaction
-from finance_management.utils.currencies import convert_to_fav_currency
+from finance_management.utils.currencies import sum_in_favorite_currency
 
 
 def create_target_for_user(*, user, target_value):
@@ -69,33 +69,19 @@ def calculate_score(*, user, target_obj):
     to_date = first_day_next_month.date()
 
     # Transactions for deposits and withdrawals this month
-    score_deposit = Transactions.objects.filter(
+    month_transactions = Transactions.objects.filter(
         user=user,
         date__gte=from_date,
         date__lt=to_date,
-        trans_status__in=['Deposit', 'deposit']
-    ).values_list("amount", "currency")
+    )
 
-    score_withdraw = Transactions.objects.filter(
-        user=user,
-        date__gte=from_date,
-        date__lt=to_date,
-        trans_status__in=['withdraw', 'Withdraw']
-    ).values_list("amount", "currency")
-
-    # Aggregate deposits
-    currency_totals_deposit = {}
-    for amount, currency in score_deposit:
-        amount = float(amount)
-        currency_totals_deposit[currency] = currency_totals_deposit.get(currency, 0) + amount
-    total_favorite_currency_deposit, _ = convert_to_fav_currency(user, currency_totals_deposit)
-
-    # Aggregate withdrawals
-    currency_totals_withdraw = {}
-    for amount, currency in score_withdraw:
-        amount = float(amount)
-        currency_totals_withdraw[currency] = currency_totals_withdraw.get(currency, 0) + amount
-    total_favorite_currency_withdraw, _ = convert_to_fav_currency(user, currency_totals_withdraw)
+    # Summed in SQL on the stored base amounts
+    total_favorite_currency_deposit, _ = sum_in_favorite_currency(
+        user, month_transactions.filter(trans_status__in=['Deposit', 'deposit'])
+    )
+    total_favorite_currency_withdraw, _ = sum_in_favorite_currency(
+        user, month_transactions.filter(trans_status__in=['withdraw', 'Withdraw'])
+    )
 
     # Calculate score (deposits - target - withdrawals)
     score = (total_favorite_currency_deposit - target_obj.target) - total_favorite_currency_withdraw
@@ -107,10 +93,11 @@ def calculate_score(*, user, target_obj):
     else:
         score_txt = "Below target"
 
-    # Save score in the latest target
+    # Save score in the latest target (only when it changed, saving bumps the ledger version)
     try:
-        target_obj.score = int(score)
-        target_obj.save()
+        if target_obj.score != int(score):
+            target_obj.score = int(score)
+            target_obj.save()
     except Exception:
         raise ValidationError('Error saving score')
 
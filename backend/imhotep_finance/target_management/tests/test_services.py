@@ -143,6 +143,46 @@ class CalculateScoreServiceTest(TestCase):
         # Score is (750 deposits - 1000 target) - 0 withdrawals = -250
         self.assertEqual(self.target.score, -250)
     
+    def test_calculate_score_mixes_stored_and_missing_base_amounts(self):
+        """Test rows without a stored base amount are still counted"""
+        for amount in (400, 350):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status='deposit',
+                category='Salary',
+                trans_details='',
+                transaction_date=date.today()
+            )
+        Transactions.objects.filter(user=self.user, amount=350).update(amount_base=None)
+
+        target_obj, score_txt, score = calculate_score(user=self.user, target_obj=self.target)
+
+        self.assertEqual(score, -250)
+
+    def test_calculate_score_converts_base_amounts_across_currencies(self):
+        """Test stored base amounts of several currencies are converted into the favorite currency"""
+        for amount, currency in ((460, 'EUR'), (250, 'USD')):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status='deposit',
+                category='Salary',
+                trans_details='',
+                transaction_date=date.today()
+            )
+        self.assertEqual(
+            sorted(Transactions.objects.filter(user=self.user).values_list('amount_base', flat=True)),
+            [250.0, 500.0]
+        )
+
+        target_obj, score_txt, score = calculate_score(user=self.user, target_obj=self.target)
+
+        # 460 EUR at 0.92 is 500 USD: (750 deposits - 1000 target) - 0 withdrawals = -250
+        self.assertAlmostEqual(score, -250)
+
     def test_calculate_score_no_target(self):
         """Test calculate_score with no target raises error"""
         with self.assertRaises(Exception):  # Changed from ValidationError
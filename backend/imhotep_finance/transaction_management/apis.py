@@ -3,7 +3,10 @@ from transaction_management.services import (
     create_transaction, 
     delete_transaction, 
     update_transaction, 
+    apply_transaction_batch,
+    bulk_delete_transactions,
     bulk_import_transactions,
+    find_duplicate_transactions,
     parse_csv_transactions,
 )
 from rest_framework.views import APIView
@@ -19,17 +22,28 @@ from .serializers import (
     TransactionFilterSerializer,
     TransactionListResponseSerializer,
     TransactionImportResponseSerializer,
-    CSVFileUploadSerializer
+    CSVFileUploadSerializer,
+    TransactionBatchSerializer,
+    TransactionBatchResponseSerializer,
+    TransactionBulkDeleteSerializer,
+    TransactionBulkDeleteResponseSerializer
 )
-from transaction_management.selectors import get_transactions_for_user
-from finance_management.utils.serializer import serialize_transaction
+from transaction_management.selectors import (
+    get_transactions_for_user,
+    get_transaction_count_for_user,
+    get_running_balances,
+    get_archived_transactions_for_user,
+)
+from finance_management.utils.serializer import TRANSACTION_VALUES, serialize_transaction_row
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import HttpResponse, Http404
 import csv
 from finance_management.utils.get_networth import get_networth
 from rest_framework.parsers import MultiPartParser, FormParser
 from finance_management.utils.recalculate_networth import recalculate_networth
-from imhotep_finance.throttles import TransactionImportRateThrottle, CustomUserRateThrottle
+from finance_management.utils.ledger_version import ledger_etag
+from finance_management.utils.idempotency import idempotent
+from imhotep_finance.throttles import TransactionImportRateThrottle, CustomUserRateThrottle, BulkOperationRateThrottle
 
 class TransactionCreateApi(APIView):
     permission_classes = [IsAuthenticated]
@@ -44,6 +58,7 @@ class TransactionCreateApi(APIView):
         },
         operation_id='create_transaction'
     )
+    @idempotent
     def post(self, request):
         serializer = TransactionInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -181,6 +196,101 @@ class TransactionUpdateApi(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class TransactionBatchApi(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [BulkOperationRateThrottle]
+
+    @extend_schema(
+        tags=['Transactions'],
+        request=TransactionBatchSerializer,
+        responses={
+            200: TransactionBatchResponseSerializer,
+            400: 'Bad request - Validation error, nothing was applied',
+            429: 'Rate limit exceeded',
+            500: 'Internal server error',
+        },
+        description="Apply a list of create, update and delete operations atomically.",
+        operation_id='batch_transactions'
+    )
+    @idempotent
+    def post(self, request):
+        serializer = TransactionBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            results = apply_transaction_batch(
+                user=request.user,
+                operations=serializer.validated_data['operations']
+            )
+
+            # Get updated networth
+            try:
+                networth = get_networth(request)
+            except Exception as e:
+                print(f"Error getting networth: {str(e)}")
+                networth = 0.0
+
+            return Response({
+                "success": True,
+                "results": results,
+                "networth": networth
+            }, status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Error applying transaction batch: {str(e)}")
+            return Response(
+                {'error': 'An error occurred while applying the transaction batch'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+class TransactionBulkDeleteApi(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [BulkOperationRateThrottle]
+
+    @extend_schema(
+        tags=['Transactions'],
+        request=TransactionBulkDeleteSerializer,
+        responses={
+            200: TransactionBulkDeleteResponseSerializer,
+            400: 'Bad request - Validation error, nothing was deleted',
+            429: 'Rate limit exceeded',
+            500: 'Internal server error',
+        },
+        description="Delete transactions by id list or by date range and filters, atomically.",
+        operation_id='bulk_delete_transactions'
+    )
+    @idempotent
+    def post(self, request):
+        serializer = TransactionBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            deleted_count = bulk_delete_transactions(user=request.user, **serializer.validated_data)
+
+            # Get updated networth
+            try:
+                networth = get_networth(request)
+            except Exception as e:
+                print(f"Error getting networth: {str(e)}")
+                networth = 0.0
+
+            return Response({
+                "success": True,
+                "deleted_count": deleted_count,
+                "networth": networth
+            }, status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Error deleting transactions: {str(e)}")
+            return Response(
+                {'error': 'An error occurred while deleting the transactions'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class TransactionListApi(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -190,6 +300,7 @@ class TransactionListApi(APIView):
         responses={200: TransactionListResponseSerializer},
         operation_id='list_transactions'
     )
+    @ledger_etag
     def get(self, request):
         """Return paginated transactions for the logged-in user, filtered by date range."""
         try:
@@ -209,7 +320,17 @@ class TransactionListApi(APIView):
             )
             
             # Paginate results
-            paginator = Paginator(transactions_qs, 20)
+            paginator = Paginator(transactions_qs.values(*TRANSACTION_VALUES), 20)
+            if not filters.get('category') and not filters.get('details_search'):
+                # Skip COUNT(*) when the ledger stats already know the total
+                known_count = get_transaction_count_for_user(
+                    user=request.user,
+                    start_date=start_date,
+                    end_date=end_date,
+                    trans_status=filters.get('trans_status')
+                )
+                if known_count is not None:
+                    paginator.count = known_count
             page_num = filters.get('page', 1)
             
             try:
@@ -218,7 +339,13 @@ class TransactionListApi(APIView):
                 page_obj = paginator.page(1)
             
             # Serialize transactions
-            trans_list = [serialize_transaction(t) for t in page_obj.object_list]
+            rows = list(page_obj.object_list)
+            trans_list = [serialize_transaction_row(row) for row in rows]
+            
+            if filters.get('with_running_balance'):
+                balances = get_running_balances(user=request.user, rows=rows)
+                for trans in trans_list:
+                    trans["running_balance"] = balances.get(trans["id"])
             
             response_data = {
                 "transactions": trans_list,
@@ -281,15 +408,22 @@ class TransactionExportCSVApi(APIView):
             writer = csv.writer(response)
             writer.writerow(['date', 'amount', 'currency', 'trans_status', 'category', 'trans_details'])
             
-            for transaction in transactions_qs:
-                writer.writerow([
-                    transaction.date,
-                    transaction.amount,
-                    transaction.currency,
-                    transaction.trans_status,
-                    transaction.category,
-                    transaction.trans_details
-                ])
+            # Archived years are read back from their segments and merged in date order
+            archived_rows = get_archived_transactions_for_user(
+                user=request.user,
+                start_date=start_date,
+                end_date=end_date,
+                category=filters.get('category'),
+                trans_status=filters.get('trans_status'),
+                details_search=filters.get('details_search')
+            )
+            export_fields = ('date', 'amount', 'currency', 'trans_status', 'category', 'trans_details')
+            rows = list(transactions_qs.values('id', *export_fields))
+            if archived_rows:
+                rows = sorted(rows + archived_rows, key=lambda row: (row['date'], row['id']), reverse=True)
+            
+            for row in rows:
+                writer.writerow([row[field] for field in export_fields])
             
             return response
             
@@ -326,11 +460,22 @@ class TransactionImportCSVApi(APIView):
         serializer.is_valid(raise_exception=True)
         
         file = serializer.validated_data['file']
+        on_duplicate = serializer.validated_data.get('on_duplicate', 'skip')
         
         try:
             # Parse CSV and validate rows
             transactions_data, validation_errors = parse_csv_transactions(file)
             
+            # Detect rows already present in the ledger
+            duplicate_indexes = find_duplicate_transactions(
+                user=request.user,
+                transactions_data=transactions_data
+            )
+            duplicate_rows = [transactions_data[i]['row'] for i in duplicate_indexes]
+            if on_duplicate == 'skip' and duplicate_indexes:
+                skipped = set(duplicate_indexes)
+                transactions_data = [t for i, t in enumerate(transactions_data) if i not in skipped]
+            
             # Bulk import transactions using service
             created_count, import_errors = bulk_import_transactions(
                 user=request.user,
@@ -345,8 +490,14 @@ class TransactionImportCSVApi(APIView):
                 'success': created_count > 0,
                 'message': f"Successfully imported {created_count} transaction(s).",
                 'imported_count': created_count,
+                'duplicate_count': len(duplicate_rows),
             }
             
+            if duplicate_rows:
+                response_data['duplicate_rows'] = duplicate_rows[:50]
+                if on_duplicate == 'skip':
+                    response_data['message'] += f" Skipped {len(duplicate_rows)} duplicate row(s)."
+            
             if all_errors:
                 response_data['errors'] = all_errors[:50]  # Limit to first 50 errors
                 if len(all_errors) > 50:
@@ -0,0 +1,90 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import ExtractYear
+from accounts.models import User
+from finance_management.models import LedgerArchiveSegment
+from finance_management.utils.ledger_archive import archive_user_year, restore_user_year
+from transaction_management.models import Transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Move closed ledger years into compressed, encrypted archive segments. "
+        "Exports and report recalculation keep reading them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-years",
+            type=int,
+            default=2,
+            help="Number of most recent years (current year included) that stay in the database",
+        )
+        parser.add_argument("--year", type=int, help="Only archive (or restore) this year")
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only process these user ids (repeatable)",
+        )
+        parser.add_argument("--restore", action="store_true", help="Move archived years back into the database")
+        parser.add_argument("--dry-run", action="store_true", help="List what would be processed without changing anything")
+
+    def handle(self, *args, **options):
+        if options["keep_years"] < 1:
+            raise CommandError("--keep-years must be at least 1")
+
+        if options["restore"]:
+            self._restore(options)
+        else:
+            self._archive(options)
+
+    def _archive(self, options):
+        cutoff_year = date.today().year - options["keep_years"] + 1
+        if options["year"] is not None and options["year"] >= cutoff_year:
+            raise CommandError(f"{options['year']} is not closed yet; only years before {cutoff_year} can be archived")
+
+        candidates = Transactions.objects.filter(date__lt=date(cutoff_year, 1, 1))
+        if options["year"] is not None:
+            candidates = candidates.filter(date__year=options["year"])
+        if options["user_ids"]:
+            candidates = candidates.filter(user_id__in=options["user_ids"])
+        candidates = (
+            candidates.annotate(year=ExtractYear('date'))
+            .values_list('user_id', 'year').distinct().order_by('user_id', 'year')
+        )
+
+        users = User.objects.in_bulk({user_id for user_id, _ in candidates})
+        archived_rows = 0
+        for user_id, year in candidates:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {year} of user {user_id}")
+                continue
+
+            count, skipped = archive_user_year(users[user_id], year)
+            if skipped:
+                self.stdout.write(self.style.WARNING(f"Skipped {year} of user {user_id}: {skipped}"))
+            else:
+                archived_rows += count
+                self.stdout.write(f"Archived {year} of user {user_id} ({count} transactions)")
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived_rows} transaction(s)."))
+
+    def _restore(self, options):
+        segments = LedgerArchiveSegment.objects.select_related('user').order_by('user_id', 'year')
+        if options["year"] is not None:
+            segments = segments.filter(year=options["year"])
+        if options["user_ids"]:
+            segments = segments.filter(user_id__in=options["user_ids"])
+
+        restored_rows = 0
+        for user, year in [(segment.user, segment.year) for segment in segments]:
+            if options["dry_run"]:
+                self.stdout.write(f"Would restore {year} of user {user.pk}")
+                continue
+            count = restore_user_year(user, year)
+            restored_rows += count
+            self.stdout.write(f"Restored {year} of user {user.pk} ({count} transactions)")
+
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored_rows} transaction(s)."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from finance_management.utils.currencies import BASE_CURRENCY, get_base_factors
+from transaction_management.models import Transactions
+
+
+class Command(BaseCommand):
+    help = f"Store the {BASE_CURRENCY} amount of transactions written before amount_base existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every base amount with the current rates",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Transactions.objects.all()
+        if not options["all"]:
+            queryset = queryset.filter(amount_base__isnull=True)
+
+        currencies = list(queryset.order_by().values_list('currency', flat=True).distinct())
+        factors = get_base_factors(currencies)
+        self.stdout.write(self.style.NOTICE(f"Backfilling base amounts in {len(currencies)} currency(ies)..."))
+
+        # One UPDATE per currency, rows never leave the database
+        updated = 0
+        for currency in sorted(currencies):
+            factor = factors.get(currency)
+            if not factor:
+                self.stdout.write(self.style.WARNING(f"  {currency}: no exchange rate, skipped"))
+                continue
+            count = queryset.filter(currency=currency).update(amount_base=F('amount') * factor)
+            updated += count
+            self.stdout.write(f"  {currency}: {count}")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} transaction(s)."))
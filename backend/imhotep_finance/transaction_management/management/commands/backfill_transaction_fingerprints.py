@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from transaction_management.models import Transactions
+
+
+class Command(BaseCommand):
+    help = "Compute content fingerprints for transactions created before duplicate detection existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every fingerprint (needed after changing BLIND_INDEX_KEY)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows written per bulk update",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        queryset = Transactions.objects.order_by('id')
+        if not options["all"]:
+            queryset = queryset.filter(fingerprint__isnull=True)
+
+        total = queryset.count()
+        self.stdout.write(self.style.NOTICE(f"Fingerprinting {total} transaction(s)..."))
+
+        updated = 0
+        batch = []
+        for trans in queryset.iterator(chunk_size=batch_size):
+            trans.fingerprint = trans.compute_fingerprint()
+            batch.append(trans)
+            if len(batch) >= batch_size:
+                Transactions.objects.bulk_update(batch, ['fingerprint'])
+                updated += len(batch)
+                batch = []
+                self.stdout.write(f"  {updated}/{total}")
+
+        if batch:
+            Transactions.objects.bulk_update(batch, ['fingerprint'])
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Fingerprinted {updated} transaction(s)."))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from finance_management.utils.partitioning import (
+    PartitioningError,
+    convert_to_partitioned,
+    create_year_partition,
+    detach_year_partition,
+    ensure_year_partitions,
+    is_partitioned,
+    list_partitions,
+    TABLE,
+)
+
+
+class Command(BaseCommand):
+    help = "Manage yearly range partitions of the transactions table (PostgreSQL only)"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="action", required=True)
+
+        convert = subparsers.add_parser("convert", help="Rebuild the table as a partitioned table (one-off, locks the table)")
+        convert.add_argument("--years-ahead", type=int, default=1, help="Future years to create partitions for")
+
+        ensure = subparsers.add_parser("ensure", help="Create missing yearly partitions; no-op if the table is not partitioned")
+        ensure.add_argument("--years-ahead", type=int, default=1, help="Future years to create partitions for")
+
+        create = subparsers.add_parser("create", help="Create the partition of one year")
+        create.add_argument("year", type=int)
+
+        detach = subparsers.add_parser(
+            "detach",
+            help="Detach the partition of one year; its rows leave the ledger (archive them first)",
+        )
+        detach.add_argument("year", type=int)
+        detach.add_argument("--drop", action="store_true", help="Drop the detached table as well")
+
+        subparsers.add_parser("status", help="List partitions and their approximate row counts")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+        try:
+            if action == "convert":
+                dropped = convert_to_partitioned(years_ahead=options["years_ahead"])
+                for constraint in dropped:
+                    self.stdout.write(self.style.WARNING(f"Dropped foreign key {constraint} referencing {TABLE}"))
+                self.stdout.write(self.style.SUCCESS(f"{TABLE} is now partitioned by year."))
+
+            elif action == "ensure":
+                if connection.vendor != 'postgresql' or not is_partitioned():
+                    self.stdout.write(f"{TABLE} is not partitioned, nothing to do.")
+                    return
+                created = ensure_year_partitions(years_ahead=options["years_ahead"])
+                self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partition(s): {created}"))
+
+            elif action == "create":
+                if not is_partitioned():
+                    raise CommandError(f"{TABLE} is not partitioned; run 'convert' first")
+                if create_year_partition(options["year"]):
+                    self.stdout.write(self.style.SUCCESS(f"Created partition for {options['year']}."))
+                else:
+                    self.stdout.write(f"Partition for {options['year']} already exists.")
+
+            elif action == "detach":
+                name = detach_year_partition(options["year"], drop=options["drop"])
+                verb = "Dropped" if options["drop"] else "Detached"
+                self.stdout.write(self.style.SUCCESS(f"{verb} {name}."))
+
+            elif action == "status":
+                if not is_partitioned():
+                    self.stdout.write(f"{TABLE} is not partitioned.")
+                    return
+                for name, bounds, rows in list_partitions():
+                    self.stdout.write(f"{name:<50} {bounds:<60} ~{max(rows, 0)} rows")
+
+        except PartitioningError as e:
+            raise CommandError(str(e))
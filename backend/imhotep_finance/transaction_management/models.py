@@ -1,7 +1,10 @@
 from django.db import models
 from accounts.models import User
 from django.utils import timezone
+from datetime import datetime
 from encrypted_model_fields.fields import EncryptedCharField
+from finance_management.utils.blind_index import blind_index, normalize_text
+from finance_management.utils.minor_units import sync_minor_units
 
 # Create your models here.
 class Transactions(models.Model):
@@ -14,12 +17,58 @@ class Transactions(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transactions')
     date = models.DateField(default=timezone.now)
     amount = models.FloatField()
+    # amount in integer minor units of its currency, kept in sync on save
+    amount_minor = models.BigIntegerField(blank=True, null=True, editable=False)
     currency = models.CharField(max_length=4)
+    # amount in the base currency (USD) at the rate in force when the transaction was written
+    amount_base = models.FloatField(blank=True, null=True)
     trans_status = models.CharField(max_length=8, choices=TRANSACTIONS_STATUS)
     trans_details = EncryptedCharField(max_length=255, blank=True, null=True)
     category = EncryptedCharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+    # Keyed hash of the transaction content, used to detect re-imported duplicates
+    fingerprint = models.CharField(max_length=64, blank=True, null=True, editable=False)
+
+    @staticmethod
+    def build_fingerprint(user_id, transaction_date, amount, currency, trans_status, trans_details):
+        if isinstance(transaction_date, datetime):
+            transaction_date = transaction_date.date()
+        return blind_index(
+            'transaction',
+            user_id,
+            transaction_date.isoformat() if hasattr(transaction_date, 'isoformat') else str(transaction_date or ''),
+            f"{float(amount):.2f}",
+            currency,
+            (trans_status or '').lower(),
+            normalize_text(trans_details),
+        )
+
+    def compute_fingerprint(self):
+        return self.build_fingerprint(
+            self.user_id, self.date, self.amount, self.currency, self.trans_status, self.trans_details
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored month/status so ledger stats can move an updated row
+        instance._ledger_state = (instance.__dict__.get('date'), instance.__dict__.get('trans_status'))
+        # ... and its rollup contribution, so the monthly rollups can move it too
+        instance._rollup_state = tuple(
+            instance.__dict__.get(field)
+            for field in ('date', 'currency', 'trans_status', 'category', 'amount', 'amount_minor')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        sync_minor_units(self, 'amount', 'amount_minor', kwargs)
+        self.fingerprint = self.compute_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fingerprint' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'fingerprint']
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Transaction of {self.user.username} ({self.date.strftime('%Y-%m-%d')}) with amount {self.amount} and Status of {self.trans_status}"
     
@@ -28,13 +77,24 @@ class Transactions(models.Model):
         verbose_name = "Transaction"
         verbose_name_plural = "Transactions"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'fingerprint'], name='transactions_user_fp_idx'),
+            models.Index(fields=['user', 'date'], name='transactions_user_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='transactions_user_updated_idx'),
+        ]
 
 class NetWorth(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='netWorths')
     total = models.FloatField(default=0.0)
+    # total in integer minor units of its currency, kept in sync on save
+    total_minor = models.BigIntegerField(blank=True, null=True, editable=False)
     currency = models.CharField(max_length=4)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        sync_minor_units(self, 'total', 'total_minor', kwargs)
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"NetWorth of {self.user.username} with currency {self.currency}"
@@ -1,4 +1,8 @@
-from transaction_management.models import Transactions
+from django.db.models import BigIntegerField, Case, F, Q, Sum, When, Window
+from transaction_management.models import Transactions, NetWorth
+from finance_management.utils.ledger_stats import get_ledger_stats, count_transactions_from_stats
+from finance_management.utils.ledger_archive import read_archived_transactions
+from finance_management.utils.minor_units import from_minor_units
 from datetime import date
 import calendar
 
@@ -31,23 +35,22 @@ def get_transactions_for_user(
         user=user,
         date__gte=start_date,
         date__lte=end_date
-    ).order_by('-date')
+    ).order_by('-date', '-id')
     
-    # Apply trans_status filter (non-encrypted field)
+    # Apply trans_status filter (non-encrypted field); case-insensitive, like the ledger stats counts
     if trans_status and trans_status in ["Deposit", "Withdraw", "deposit", "withdraw"]:
-        queryset = queryset.filter(trans_status=trans_status)
+        queryset = queryset.filter(trans_status__iexact=trans_status)
     
     # If we need to filter by encrypted fields (category or details_search),
     # we must filter in memory after decryption
     if category or details_search:
-        # Convert queryset to list to access decrypted values
-        transactions_list = list(queryset)
-        filtered_transactions = []
+        # Only fetch the columns needed for matching; values_list still
+        # decrypts the encrypted fields without building model instances
+        transaction_ids = []
         
-        for trans in transactions_list:
-            # Access encrypted fields (they are automatically decrypted when accessed)
-            trans_category = trans.category or ""
-            trans_details = trans.trans_details or ""
+        for trans_id, trans_category, trans_details in queryset.values_list('id', 'category', 'trans_details'):
+            trans_category = trans_category or ""
+            trans_details = trans_details or ""
             
             # Apply category filter
             if category:
@@ -59,16 +62,124 @@ def get_transactions_for_user(
                 if details_search.lower() not in trans_details.lower():
                     continue
             
-            filtered_transactions.append(trans)
+            transaction_ids.append(trans_id)
         
         # Create a new queryset from filtered transactions
         # We'll use the IDs to create a filtered queryset
-        if filtered_transactions:
-            transaction_ids = [t.id for t in filtered_transactions]
+        if transaction_ids:
             # Create queryset with filtered IDs, maintaining date order
-            queryset = Transactions.objects.filter(id__in=transaction_ids).order_by('-date')
+            queryset = Transactions.objects.filter(id__in=transaction_ids).order_by('-date', '-id')
         else:
             # Return empty queryset if no matches
             queryset = Transactions.objects.none()
     
     return queryset, start_date, end_date
+
+
+def get_transaction_count_for_user(*, user, start_date, end_date, trans_status=None):
+    """Count a user's transactions in a date range from their ledger stats.
+
+    Returns None when the stats cannot answer (the range partially covers
+    months with data), in which case the caller falls back to COUNT(*).
+    """
+    if trans_status and trans_status.lower() in ["deposit", "withdraw"]:
+        trans_status = trans_status.lower()
+    else:
+        trans_status = None
+
+    stats = get_ledger_stats(user)
+    return count_transactions_from_stats(stats, start_date, end_date, trans_status)
+
+
+def _signed_amount():
+    """Deposits count positive, withdrawals negative, in exact minor units."""
+    return Case(
+        When(trans_status__iexact='deposit', then=F('amount_minor')),
+        default=-F('amount_minor'),
+        output_field=BigIntegerField()
+    )
+
+
+def get_running_balances(*, user, rows):
+    """Get the balance of each listed transaction's currency right after it.
+
+    ``rows`` are transaction dicts with id, date and currency, as listed on a
+    page. Balances are anchored at the NetWorth checkpoint (the current total):
+    the sum of everything newer than the page is subtracted with one aggregate,
+    and a window function walks back through the ledger slice spanned by the
+    page, so only that slice is read regardless of how old the page is.
+    Returns a {transaction_id: balance} dict.
+    """
+    if not rows:
+        return {}
+
+    currencies = {row['currency'] for row in rows}
+    oldest = min(rows, key=lambda row: (row['date'], row['id']))
+    newest = max(rows, key=lambda row: (row['date'], row['id']))
+
+    checkpoints = {}
+    for currency, total_minor in NetWorth.objects.filter(
+        user=user, currency__in=currencies
+    ).order_by('id').values_list('currency', 'total_minor'):
+        checkpoints.setdefault(currency, total_minor)
+
+    ledger = Transactions.objects.filter(user=user, currency__in=currencies)
+
+    # Everything after the newest listed row, per currency
+    newer_totals = dict(
+        ledger.filter(Q(date__gt=newest['date']) | Q(date=newest['date'], id__gt=newest['id']))
+        .values('currency')
+        .annotate(total=Sum(_signed_amount()))
+        .order_by()
+        .values_list('currency', 'total')
+    )
+
+    # Cumulative sum from the newest listed row backwards, including the row itself
+    span = (
+        ledger.filter(Q(date__gt=oldest['date']) | Q(date=oldest['date'], id__gte=oldest['id']))
+        .filter(Q(date__lt=newest['date']) | Q(date=newest['date'], id__lte=newest['id']))
+        .annotate(
+            signed_amount=_signed_amount(),
+            newer_in_span=Window(
+                expression=Sum(_signed_amount()),
+                partition_by=[F('currency')],
+                order_by=[F('date').desc(), F('id').desc()],
+            ),
+        )
+        .values_list('id', 'currency', 'signed_amount', 'newer_in_span')
+    )
+
+    listed_ids = {row['id'] for row in rows}
+    balances = {}
+    for trans_id, currency, signed_amount, newer_in_span in span:
+        if trans_id not in listed_ids:
+            continue
+        newer = (newer_totals.get(currency) or 0) + newer_in_span - signed_amount
+        balances[trans_id] = from_minor_units((checkpoints.get(currency) or 0) - newer, currency)
+
+    return balances
+
+
+def get_archived_transactions_for_user(
+    *,
+    user,
+    start_date,
+    end_date,
+    category=None,
+    trans_status=None,
+    details_search=None
+):
+    """Get a user's archived transactions in a date range, with the same filters as get_transactions_for_user.
+
+    Returns row dicts, newest first.
+    """
+    rows = read_archived_transactions(user, start_date, end_date)
+    
+    if trans_status and trans_status in ["Deposit", "Withdraw", "deposit", "withdraw"]:
+        rows = [row for row in rows if row['trans_status'].lower() == trans_status.lower()]
+    if category:
+        rows = [row for row in rows if (row['category'] or "") == category]
+    if details_search:
+        rows = [row for row in rows if details_search.lower() in (row['trans_details'] or "").lower()]
+    
+    return sorted(rows, key=lambda row: (row['date'], row['id']), reverse=True)
@@ -156,6 +156,11 @@ class TransactionFilterSerializer(serializers.Serializer):
         min_value=1,
         help_text="Page number for pagination"
     )
+    with_running_balance = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Include the balance of the transaction's currency right after each transaction"
+    )
 
 
 class TransactionOutputSerializer(serializers.Serializer):
@@ -168,6 +173,10 @@ class TransactionOutputSerializer(serializers.Serializer):
     trans_details = serializers.CharField(allow_null=True)
     category = serializers.CharField(allow_null=True)
     created_at = serializers.DateTimeField()
+    running_balance = serializers.FloatField(
+        required=False,
+        help_text="Only present when with_running_balance is set"
+    )
 
 
 class TransactionListResponseSerializer(serializers.Serializer):
@@ -180,6 +189,12 @@ class CSVFileUploadSerializer(serializers.Serializer):
         required=True,
         help_text="CSV file with columns: date, amount, currency, trans_status, trans_details (optional), category (optional)"
     )
+    on_duplicate = serializers.ChoiceField(
+        choices=[('skip', 'skip'), ('import', 'import')],
+        required=False,
+        default='skip',
+        help_text="What to do with rows already in the ledger: skip them (default) or import them anyway"
+    )
     
     def validate_file(self, file):
         """Validate the uploaded CSV file."""
@@ -240,8 +255,177 @@ class TransactionImportResponseSerializer(serializers.Serializer):
     success = serializers.BooleanField(help_text="Whether any transactions were imported")
     message = serializers.CharField(help_text="Summary message")
     imported_count = serializers.IntegerField(help_text="Number of transactions successfully imported")
+    duplicate_count = serializers.IntegerField(help_text="Number of rows matching existing transactions")
+    duplicate_rows = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="CSV row numbers of the duplicate rows (skipped or imported depending on on_duplicate)"
+    )
     errors = serializers.ListField(
         child=serializers.CharField(),
         required=False,
         help_text="List of errors encountered during import"
     )
+
+
+class TransactionBatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(
+        choices=[('create', 'create'), ('update', 'update'), ('delete', 'delete')],
+        required=True,
+        help_text="Operation type: create, update or delete"
+    )
+    id = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Transaction ID (required for update and delete)"
+    )
+    date = serializers.DateField(
+        required=False,
+        allow_null=True,
+        help_text="Transaction date in YYYY-MM-DD format. Defaults to today for create."
+    )
+    amount = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        required=False,
+        help_text="Transaction amount (must be greater than 0)"
+    )
+    currency = serializers.ChoiceField(
+        choices=[(c, c) for c in get_allowed_currencies()],
+        required=False,
+        help_text="Currency code (e.g., USD, EUR)"
+    )
+    trans_details = serializers.CharField(
+        max_length=500,
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        help_text="Optional transaction details/description"
+    )
+    category = serializers.CharField(
+        max_length=100,
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        help_text="Transaction category (e.g., Food, Transport, Salary)"
+    )
+    trans_status = serializers.ChoiceField(
+        choices=[
+            ('Deposit', 'Deposit'),
+            ('Withdraw', 'Withdraw'),
+            ('deposit', 'deposit'),
+            ('withdraw', 'withdraw'),
+        ],
+        required=False,
+        help_text="Transaction type: Deposit or Withdraw"
+    )
+
+    def validate_amount(self, value):
+        """Ensure amount is positive."""
+        if value <= 0:
+            raise serializers.ValidationError("Amount must be greater than zero")
+        return value
+
+    def validate(self, attrs):
+        """Ensure each operation carries the fields it needs."""
+        op = attrs['op']
+        required = {
+            'create': ['amount', 'currency', 'trans_status'],
+            'update': ['id', 'date', 'amount', 'currency', 'trans_status'],
+            'delete': ['id'],
+        }[op]
+        missing = [field for field in required if attrs.get(field) is None]
+        if missing:
+            raise serializers.ValidationError(
+                f"Missing required fields for {op}: {', '.join(missing)}"
+            )
+        return attrs
+
+
+class TransactionBatchSerializer(serializers.Serializer):
+    operations = TransactionBatchOperationSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=100,
+        help_text="Operations applied in order as a single atomic unit (max 100)"
+    )
+
+
+class TransactionBatchResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField(help_text="Position of the operation in the request")
+    op = serializers.CharField(help_text="Operation type")
+    id = serializers.IntegerField(help_text="ID of the created, updated or deleted transaction")
+    success = serializers.BooleanField()
+
+
+class TransactionBatchResponseSerializer(serializers.Serializer):
+    success = serializers.BooleanField(help_text="Whether the batch was applied")
+    results = TransactionBatchResultSerializer(many=True)
+    networth = serializers.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        help_text="Updated total networth across all currencies"
+    )
+
+
+class TransactionBulkDeleteSerializer(serializers.Serializer):
+    transaction_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=5000,
+        help_text="IDs of the transactions to delete"
+    )
+    start_date = serializers.DateField(
+        required=False,
+        help_text="Delete transactions on or after this date (YYYY-MM-DD), used with end_date"
+    )
+    end_date = serializers.DateField(
+        required=False,
+        help_text="Delete transactions on or before this date (YYYY-MM-DD), used with start_date"
+    )
+    category = serializers.CharField(
+        max_length=100,
+        required=False,
+        allow_blank=True,
+        help_text="Only delete transactions in this category"
+    )
+    trans_status = serializers.ChoiceField(
+        choices=[
+            ('Deposit', 'Deposit'),
+            ('Withdraw', 'Withdraw'),
+            ('deposit', 'deposit'),
+            ('withdraw', 'withdraw'),
+        ],
+        required=False,
+        help_text="Only delete deposits or withdrawals"
+    )
+    details_search = serializers.CharField(
+        max_length=500,
+        required=False,
+        allow_blank=True,
+        help_text="Only delete transactions whose details contain this text"
+    )
+
+    def validate(self, data):
+        if data.get('transaction_ids'):
+            filters = [key for key in ('start_date', 'end_date', 'category', 'trans_status', 'details_search') if data.get(key)]
+            if filters:
+                raise serializers.ValidationError("Provide either transaction_ids or filters, not both")
+            return data
+
+        if not data.get('start_date') or not data.get('end_date'):
+            raise serializers.ValidationError("Provide transaction_ids or both start_date and end_date")
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("start_date must be before end_date")
+        return data
+
+
+class TransactionBulkDeleteResponseSerializer(serializers.Serializer):
+    success = serializers.BooleanField(help_text="Whether the transactions were deleted")
+    deleted_count = serializers.IntegerField(help_text="Number of deleted transactions")
+    networth = serializers.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        help_text="Updated total networth across all currencies"
+    )
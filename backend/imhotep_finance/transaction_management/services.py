@@ -1,13 +1,23 @@
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from finance_management.utils.currencies import get_allowed_currencies
+from finance_management.utils.currencies import (
+    get_allowed_currencies,
+    get_base_factors,
+    to_base_amount,
+)
 from transaction_management.models import Transactions, NetWorth
-from user_reports.utils.save_user_report import save_user_report_with_transaction, save_user_report_with_transaction_update
+from user_reports.utils.report_queue import mark_report_months_dirty
+from collections import Counter, defaultdict
 from datetime import date, datetime
 from typing import List, Dict, Tuple
-from django.db import transaction
+from django.db import transaction, connection
 from wishlist_management.models import Wishlist
+from finance_management.utils.ledger_version import bump_ledger_version
+from finance_management.utils.ledger_stats import apply_ledger_stats_changes
+from finance_management.utils.ledger_rollup import apply_rollup_changes, rollup_entry, transaction_rollup_entry
+from finance_management.utils.minor_units import sync_minor_units
+from finance_management.utils.sync import record_tombstones
 import csv
 from io import TextIOWrapper
 
@@ -53,6 +63,7 @@ def create_transaction(*,user, amount, currency, trans_details, category, trans_
             user=user,
             date=transaction_date,
             amount=amount,
+            amount_base=to_base_amount(amount, currency),
             currency=currency,
             trans_status=trans_status,
             category=category,
@@ -72,7 +83,7 @@ def create_transaction(*,user, amount, currency, trans_details, category, trans_
         
         net_worth_obj.save()
     
-        save_user_report_with_transaction(user, transaction_date, user_transaction)
+        mark_report_months_dirty(user.pk, [(transaction_date.year, transaction_date.month)])
                      
     return user_transaction
 
@@ -108,11 +119,7 @@ def delete_transaction(*, user, transaction_id):
             wish.status = False
             wish.save()
         
-        # Update the report before deleting
-        save_user_report_with_transaction(
-            user, transaction_date, trans_obj, parent_function="delete_transaction"
-        )
-        
+        mark_report_months_dirty(user.pk, [(transaction_date.year, transaction_date.month)])
         
         # Delete the transaction
         trans_obj.delete()
@@ -141,20 +148,7 @@ def update_transaction(*, user, transaction_id, amount, currency, trans_details,
     # Get the transaction
     trans_obj = get_object_or_404(Transactions, id=transaction_id, user=user)
     
-    # Create a snapshot of old transaction data
-    class OldTransactionSnapshot:
-        def __init__(self, original_transaction):
-            self.date = original_transaction.date
-            self.amount = float(original_transaction.amount)
-            self.currency = original_transaction.currency
-            self.trans_status = original_transaction.trans_status
-            self.category = original_transaction.category
-            self.trans_details = original_transaction.trans_details
-            self.user = original_transaction.user
-            self.id = original_transaction.id
-
-    old_transaction = OldTransactionSnapshot(trans_obj)
-    
+    old_date = trans_obj.date
     old_amount = float(trans_obj.amount)
     old_status = trans_obj.trans_status
     old_currency = trans_obj.currency
@@ -200,6 +194,7 @@ def update_transaction(*, user, transaction_id, amount, currency, trans_details,
         trans_obj.date = transaction_date
         trans_obj.trans_details = trans_details
         trans_obj.amount = amount
+        trans_obj.amount_base = to_base_amount(amount, currency)
         trans_obj.category = category
         trans_obj.currency = currency
         trans_obj.trans_status = trans_status
@@ -209,13 +204,342 @@ def update_transaction(*, user, transaction_id, amount, currency, trans_details,
         net_worth_obj.total = new_total
         net_worth_obj.save()
 
-        # Update reports
-        save_user_report_with_transaction_update(
-            user, old_transaction, trans_obj
-        )
+        # Both the old and the new month change
+        new_date = _parse_transaction_date(transaction_date)
+        mark_report_months_dirty(user.pk, [
+            (old_date.year, old_date.month),
+            (new_date.year, new_date.month),
+        ])
     
     return trans_obj
 
+def _parse_transaction_date(value):
+    """Parse a transaction date, defaulting to today."""
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+
+def _validate_transaction_fields(amount, currency, trans_status):
+    """Validate the fields shared by created and updated transactions."""
+    if currency is None or amount is None:
+        raise ValidationError("You have to choose the currency and amount!")
+
+    if amount <= 0:
+        raise ValidationError("Amount must be greater than zero")
+
+    if currency not in get_allowed_currencies():
+        raise ValidationError("Currency code not supported")
+
+    if not trans_status or trans_status.lower() not in ["deposit", "withdraw"]:
+        raise ValidationError("Transaction status must be either Deposit or Withdraw")
+
+    return float(amount)
+
+def _signed_amount(trans_status, amount):
+    """Networth effect of a transaction: deposits add, withdrawals subtract."""
+    return amount if trans_status.lower() == "deposit" else -amount
+
+def _delete_transaction_rows(user, transaction_ids):
+    """Unmark linked wishes, delete the rows and record their tombstones, leaving version and stats updates to the caller."""
+    from finance_management.signals import ledger_signals_suspended
+
+    Wishlist.objects.filter(user=user, transaction_id__in=transaction_ids).update(
+        status=False, transaction=None, updated_at=timezone.now()
+    )
+    with ledger_signals_suspended():
+        Transactions.objects.filter(user=user, id__in=transaction_ids).delete()
+    record_tombstones(user.pk, 'transaction', transaction_ids)
+
+def apply_transaction_batch(*, user, operations: List[Dict]) -> List[Dict]:
+    """
+    Apply create, update and delete operations as one atomic unit.
+    NetWorth changes are aggregated first, so each currency is written once and
+    each report month queued once no matter how many operations touch it.
+    Returns one result per operation, in order.
+    """
+    if not user:
+        raise ValidationError("User must be authenticated!")
+
+    if not operations:
+        raise ValidationError("At least one operation is required")
+
+    target_ids = [op.get('id') for op in operations if op.get('op') in ('update', 'delete')]
+    if len(target_ids) != len(set(target_ids)):
+        raise ValidationError("A transaction can only be targeted once per batch")
+
+    with transaction.atomic():
+        existing = Transactions.objects.select_for_update().filter(user=user).in_bulk(target_ids)
+
+        net_worths = {}
+        for net_worth in NetWorth.objects.select_for_update().filter(user=user).order_by('id'):
+            net_worths.setdefault(net_worth.currency, net_worth)
+        totals = {currency: float(nw.total) for currency, nw in net_worths.items()}
+        touched_currencies = set()
+        base_factors = get_base_factors({op['currency'] for op in operations if op.get('currency')})
+
+        # (year, month) pairs whose reports need a rebuild
+        report_months = set()
+
+        def track_report(trans_date):
+            report_months.add((trans_date.year, trans_date.month))
+
+        results = []
+        to_create = []
+        to_update = []
+        to_delete = []
+        # (date, trans_status) pairs added and removed, for the ledger stats
+        stats_added = []
+        stats_removed = []
+        # Contributions added and removed, for the monthly rollups
+        rollup_added = []
+        rollup_removed = []
+
+        for index, op in enumerate(operations):
+            action = op.get('op')
+            try:
+                if action == 'create':
+                    amount = _validate_transaction_fields(op.get('amount'), op.get('currency'), op.get('trans_status'))
+                    currency = op['currency']
+                    trans_status = op['trans_status']
+                    transaction_date = _parse_transaction_date(op.get('date'))
+
+                    current_balance = totals.get(currency, 0.0)
+                    if trans_status.lower() == "withdraw" and current_balance < amount:
+                        raise ValidationError(f"Insufficient funds. You only have {current_balance} {currency}.")
+
+                    trans_obj = Transactions(
+                        user=user,
+                        date=transaction_date,
+                        amount=amount,
+                        amount_base=to_base_amount(amount, currency, base_factors),
+                        currency=currency,
+                        trans_status=trans_status,
+                        category=op.get('category'),
+                        trans_details=op.get('trans_details')
+                    )
+                    # bulk_create skips save()
+                    sync_minor_units(trans_obj, 'amount', 'amount_minor')
+                    trans_obj.fingerprint = trans_obj.compute_fingerprint()
+                    to_create.append((index, trans_obj))
+
+                    totals[currency] = current_balance + _signed_amount(trans_status, amount)
+                    touched_currencies.add(currency)
+                    track_report(transaction_date)
+                    results.append({"index": index, "op": action, "id": None, "success": True})
+
+                elif action == 'update':
+                    trans_obj = existing.get(op.get('id'))
+                    if not trans_obj:
+                        raise ValidationError("Transaction not found")
+
+                    amount = _validate_transaction_fields(op.get('amount'), op.get('currency'), op.get('trans_status'))
+                    currency = op['currency']
+                    trans_status = op['trans_status']
+                    transaction_date = _parse_transaction_date(op.get('date'))
+
+                    # Reverse the old effect, then apply the new one
+                    old_amount = float(trans_obj.amount)
+                    totals[trans_obj.currency] = totals.get(trans_obj.currency, 0.0) - _signed_amount(trans_obj.trans_status, old_amount)
+                    track_report(trans_obj.date)
+
+                    new_total = totals.get(currency, 0.0) + _signed_amount(trans_status, amount)
+                    if new_total < 0:
+                        raise ValidationError("Insufficient balance for this withdrawal")
+                    totals[currency] = new_total
+                    touched_currencies.update([trans_obj.currency, currency])
+
+                    stats_removed.append((trans_obj.date, trans_obj.trans_status))
+                    stats_added.append((transaction_date, trans_status))
+                    rollup_removed.append(transaction_rollup_entry(trans_obj))
+
+                    trans_obj.date = transaction_date
+                    trans_obj.amount = amount
+                    trans_obj.amount_base = to_base_amount(amount, currency, base_factors)
+                    trans_obj.currency = currency
+                    trans_obj.trans_status = trans_status
+                    trans_obj.category = op.get('category')
+                    trans_obj.trans_details = op.get('trans_details')
+                    sync_minor_units(trans_obj, 'amount', 'amount_minor')
+                    trans_obj.fingerprint = trans_obj.compute_fingerprint()
+                    trans_obj.updated_at = timezone.now()
+                    to_update.append(trans_obj)
+                    rollup_added.append(transaction_rollup_entry(trans_obj))
+
+                    track_report(transaction_date)
+                    results.append({"index": index, "op": action, "id": trans_obj.id, "success": True})
+
+                elif action == 'delete':
+                    trans_obj = existing.get(op.get('id'))
+                    if not trans_obj:
+                        raise ValidationError("Transaction not found")
+
+                    old_amount = float(trans_obj.amount)
+                    new_total = totals.get(trans_obj.currency, 0.0) - _signed_amount(trans_obj.trans_status, old_amount)
+                    if new_total < 0:
+                        raise ValidationError("You can't delete this transaction as it would result in negative balance")
+                    totals[trans_obj.currency] = new_total
+                    touched_currencies.add(trans_obj.currency)
+
+                    to_delete.append(trans_obj.id)
+                    stats_removed.append((trans_obj.date, trans_obj.trans_status))
+                    rollup_removed.append(transaction_rollup_entry(trans_obj))
+                    track_report(trans_obj.date)
+                    results.append({"index": index, "op": action, "id": trans_obj.id, "success": True})
+
+                else:
+                    raise ValidationError("Operation must be create, update or delete")
+
+            except ValidationError as e:
+                raise ValidationError(f"Operation {index}: {' '.join(e.messages)}")
+
+        # Write the ledger rows
+        new_transactions = [trans_obj for _, trans_obj in to_create]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Transactions.objects.bulk_create(new_transactions)
+            stats_added.extend((trans_obj.date, trans_obj.trans_status) for trans_obj in new_transactions)
+            rollup_added.extend(transaction_rollup_entry(trans_obj) for trans_obj in new_transactions)
+        else:
+            for trans_obj in new_transactions:
+                trans_obj.save()
+        for index, trans_obj in to_create:
+            results[index]["id"] = trans_obj.id
+
+        if to_update:
+            Transactions.objects.bulk_update(
+                to_update,
+                ['date', 'amount', 'amount_minor', 'amount_base', 'currency', 'trans_status', 'fingerprint', 'updated_at']
+            )
+            # bulk_update sends a CASE expression, which the encrypted fields would encrypt as text
+            for trans_obj in to_update:
+                Transactions.objects.filter(pk=trans_obj.pk).update(
+                    category=trans_obj.category, trans_details=trans_obj.trans_details
+                )
+
+        if to_delete:
+            _delete_transaction_rows(user, to_delete)
+
+        # One NetWorth write per touched currency
+        changed_net_worths = []
+        for currency in touched_currencies:
+            net_worth_obj = net_worths.get(currency)
+            if net_worth_obj:
+                net_worth_obj.total = totals[currency]
+                sync_minor_units(net_worth_obj, 'total', 'total_minor')
+                changed_net_worths.append(net_worth_obj)
+            else:
+                NetWorth.objects.create(user=user, currency=currency, total=totals[currency])
+        if changed_net_worths:
+            NetWorth.objects.bulk_update(changed_net_worths, ['total', 'total_minor'])
+
+        mark_report_months_dirty(user.pk, report_months)
+
+        # Bulk writes skip model signals
+        apply_ledger_stats_changes(user, added=stats_added, removed=stats_removed)
+        apply_rollup_changes(user, added=rollup_added, removed=rollup_removed)
+        bump_ledger_version(user)
+
+    return results
+
+MAX_BULK_DELETE = 5000
+
+def bulk_delete_transactions(
+    *,
+    user,
+    transaction_ids=None,
+    start_date=None,
+    end_date=None,
+    category=None,
+    trans_status=None,
+    details_search=None
+) -> int:
+    """
+    Delete many transactions at once, selected by id list or by the filters of get_transactions_for_user.
+    Balances are checked per currency before anything is written; NetWorth is then
+    written once per currency and each report month queued once. Returns the number of deleted transactions.
+    """
+    from transaction_management.selectors import get_transactions_for_user
+
+    if not user:
+        raise ValidationError("User must be authenticated!")
+
+    if transaction_ids:
+        queryset = Transactions.objects.filter(user=user, id__in=transaction_ids)
+    elif start_date and end_date:
+        queryset, _, _ = get_transactions_for_user(
+            user=user,
+            start_date=start_date,
+            end_date=end_date,
+            category=category,
+            trans_status=trans_status,
+            details_search=details_search
+        )
+    else:
+        raise ValidationError("Provide transaction ids or a start and end date")
+
+    with transaction.atomic():
+        rows = list(
+            queryset.select_for_update().order_by()
+            .values('id', 'date', 'amount', 'amount_minor', 'currency', 'trans_status', 'category')
+        )
+
+        if transaction_ids:
+            missing = set(transaction_ids) - {row['id'] for row in rows}
+            if missing:
+                raise ValidationError(f"Transactions not found: {sorted(missing)}")
+
+        if not rows:
+            return 0
+
+        if len(rows) > MAX_BULK_DELETE:
+            raise ValidationError(f"Too many transactions selected ({len(rows)}). The limit is {MAX_BULK_DELETE} per request.")
+
+        # Reverse every row's effect per currency
+        currency_deltas = defaultdict(float)
+        for row in rows:
+            currency_deltas[row['currency']] -= _signed_amount(row['trans_status'], float(row['amount']))
+
+        net_worths = {}
+        for net_worth in NetWorth.objects.select_for_update().filter(
+            user=user, currency__in=currency_deltas
+        ).order_by('id'):
+            net_worths.setdefault(net_worth.currency, net_worth)
+
+        for currency, delta in currency_deltas.items():
+            net_worth_obj = net_worths.get(currency)
+            new_total = (float(net_worth_obj.total) if net_worth_obj else 0.0) + delta
+            if new_total < 0:
+                raise ValidationError(
+                    f"You can't delete these transactions as it would result in negative balance in {currency}"
+                )
+            if net_worth_obj:
+                net_worth_obj.total = new_total
+            else:
+                net_worths[currency] = NetWorth(user=user, currency=currency, total=new_total)
+
+        _delete_transaction_rows(user, [row['id'] for row in rows])
+
+        for net_worth_obj in net_worths.values():
+            sync_minor_units(net_worth_obj, 'total', 'total_minor')
+        NetWorth.objects.bulk_update([nw for nw in net_worths.values() if nw.pk], ['total', 'total_minor'])
+        NetWorth.objects.bulk_create([nw for nw in net_worths.values() if not nw.pk])
+
+        mark_report_months_dirty(user.pk, {(row['date'].year, row['date'].month) for row in rows})
+        apply_ledger_stats_changes(user, removed=[(row['date'], row['trans_status']) for row in rows])
+        apply_rollup_changes(user, removed=[
+            rollup_entry(row['date'], row['currency'], row['trans_status'], row['category'], row['amount'], row['amount_minor'])
+            for row in rows
+        ])
+        bump_ledger_version(user)
+
+    return len(rows)
+
 def parse_csv_transactions(file) -> Tuple[List[Dict], List[str]]:
     """Parse CSV file and return transaction data and validation errors."""
     transactions_data = []
@@ -288,6 +612,7 @@ def parse_csv_transactions(file) -> Tuple[List[Dict], List[str]]:
             
             # Add to transactions data
             transactions_data.append({
+                'row': row_num,
                 'date': date_val,
                 'amount': amount,
                 'currency': currency_val,
@@ -302,6 +627,48 @@ def parse_csv_transactions(file) -> Tuple[List[Dict], List[str]]:
     return transactions_data, errors
 
 
+def find_duplicate_transactions(*, user, transactions_data: List[Dict]) -> List[int]:
+    """
+    Find parsed rows that already exist in the user's ledger.
+    Rows are matched by content fingerprint with one indexed IN probe, so no
+    stored row is decrypted. Each existing transaction absorbs at most one
+    incoming row, keeping genuinely repeated entries (e.g. two equal coffees).
+    Returns the indexes of duplicate rows in transactions_data.
+    """
+    fingerprints = {}
+    for index, transaction_data in enumerate(transactions_data):
+        try:
+            transaction_date = _parse_transaction_date(transaction_data.get('date'))
+            amount = float(transaction_data.get('amount'))
+        except (ValidationError, TypeError, ValueError):
+            continue  # Invalid rows are reported by the import itself
+        fingerprints[index] = Transactions.build_fingerprint(
+            user.id,
+            transaction_date,
+            amount,
+            transaction_data.get('currency', ''),
+            transaction_data.get('trans_status', ''),
+            transaction_data.get('trans_details', ''),
+        )
+
+    if not fingerprints:
+        return []
+
+    existing = Counter(
+        Transactions.objects.filter(
+            user=user,
+            fingerprint__in=set(fingerprints.values())
+        ).values_list('fingerprint', flat=True)
+    )
+
+    duplicates = []
+    for index, fingerprint in fingerprints.items():
+        if existing[fingerprint] > 0:
+            existing[fingerprint] -= 1
+            duplicates.append(index)
+    return duplicates
+
+
 def bulk_import_transactions(*, user, transactions_data: List[Dict]) -> Tuple[int, List[str]]:
     """
     Bulk import transactions from a list of transaction data.
@@ -1,14 +1,22 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from transaction_management.services import create_transaction
 from transaction_management.models import Transactions, NetWorth
-from datetime import date
+from wishlist_management.models import Wishlist
+from datetime import date, timedelta
+from django.utils import timezone
 from decimal import Decimal
 from io import BytesIO
 from django.core.files.uploadedfile import SimpleUploadedFile
+from finance_management.utils.ledger_archive import archive_user_year
+import tempfile
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from finance_management.models import IdempotencyKey
+from finance_management.utils.idempotency import idempotent
 
 User = get_user_model()
 
@@ -102,6 +110,83 @@ class TransactionListApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['pagination']['page'], 1)
 
+    def test_list_transactions_rendered_from_rows(self):
+        """Test listed rows carry decrypted fields and render as JSON"""
+        response = self.client.get(self.url, {'details_search': 'details 3'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        body = response.json()
+        self.assertEqual(len(body['transactions']), 1)
+        row = body['transactions'][0]
+        self.assertEqual(row['user_id'], self.user.id)
+        self.assertEqual(row['category'], 'Category3')
+        self.assertEqual(row['trans_details'], 'Details 3')
+        self.assertEqual(row['date'], date.today().isoformat())
+
+    def test_status_filter_matches_the_counted_total(self):
+        """Test the status filter lists every row the ledger stats count, whatever its case"""
+        create_transaction(
+            user=self.user,
+            amount=50,
+            currency='USD',
+            trans_status='Deposit',
+            category='Mixed',
+            trans_details='Capitalised status',
+            transaction_date=date.today()
+        )
+
+        response = self.client.get(self.url, {'trans_status': 'Deposit'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['transactions']), 6)
+        self.assertEqual(response.data['pagination']['total'], 6)
+
+
+class TransactionRunningBalanceApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('get_transaction')
+
+        for amount, currency, trans_status, transaction_date in [
+            (100, 'USD', 'deposit', date(2024, 1, 1)),
+            (30, 'USD', 'withdraw', date(2024, 1, 5)),
+            (50, 'EUR', 'deposit', date(2024, 1, 6)),
+            (20, 'USD', 'deposit', date(2024, 1, 10)),
+            (10, 'USD', 'withdraw', date(2024, 2, 1)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status=trans_status,
+                category='',
+                trans_details='',
+                transaction_date=transaction_date
+            )
+
+    def _balances(self, params):
+        response = self.client.get(self.url, {'with_running_balance': 'true', **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(t['currency'], t['running_balance']) for t in response.data['transactions']]
+
+    def test_running_balance_per_currency(self):
+        """Test each row carries its currency balance right after it"""
+        balances = self._balances({'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+        self.assertEqual(balances, [('USD', 90.0), ('EUR', 50.0), ('USD', 70.0), ('USD', 100.0)])
+
+    def test_running_balance_with_status_filter(self):
+        """Test filtered-out rows still count towards the balance"""
+        balances = self._balances({'start_date': '2024-01-01', 'end_date': '2024-02-29', 'trans_status': 'withdraw'})
+        self.assertEqual(balances, [('USD', 80.0), ('USD', 70.0)])
+
+    def test_running_balance_omitted_by_default(self):
+        """Test the balance is only computed on request"""
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+        self.assertNotIn('running_balance', response.data['transactions'][0])
+
 
 class TransactionUpdateApiTest(TestCase):
     def setUp(self):
@@ -210,6 +295,26 @@ class TransactionExportCSVApiTest(TestCase):
         self.assertEqual(response['Content-Type'], 'text/csv')
         self.assertIn('attachment', response['Content-Disposition'])
 
+    def test_export_csv_includes_archived_years(self):
+        """Test archived transactions are read back into the export"""
+        create_transaction(
+            user=self.user,
+            amount=40,
+            currency='USD',
+            trans_status='deposit',
+            category='Old',
+            trans_details='Archived row',
+            transaction_date=date(2019, 5, 1)
+        )
+        with tempfile.TemporaryDirectory() as archive_root, override_settings(LEDGER_ARCHIVE_ROOT=archive_root):
+            archive_user_year(self.user, 2019)
+            response = self.client.get(self.url, {'start_date': '2019-01-01', 'end_date': str(date.today())})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = response.content.decode().strip().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('Archived row', lines[-1])
+
 
 class TransactionImportCSVApiTest(TestCase):
     def setUp(self):
@@ -267,3 +372,423 @@ class TransactionImportCSVApiTest(TestCase):
         self.assertEqual(response.data['imported_count'], 1)
         self.assertIn('errors', response.data)
         self.assertGreater(len(response.data['errors']), 0)
+
+
+class TransactionBatchApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('batch_transactions')
+        self.transaction = create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date.today()
+        )
+
+    def test_batch_success(self):
+        """Test applying a batch via API"""
+        data = {
+            'operations': [
+                {'op': 'create', 'amount': '40', 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food'},
+                {'op': 'delete', 'id': self.transaction.id},
+            ]
+        }
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('negative balance', response.data['error'])
+
+        data['operations'][0]['trans_status'] = 'deposit'
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIn('networth', response.data)
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 1)
+
+    def test_batch_missing_fields(self):
+        """Test operations without their required fields are rejected"""
+        data = {'operations': [{'op': 'update', 'id': self.transaction.id}]}
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_empty(self):
+        """Test an empty batch is rejected"""
+        response = self.client.post(self.url, {'operations': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_unauthenticated(self):
+        """Test batch requires authentication"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, {'operations': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TransactionBulkDeleteApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('bulk_delete_transactions')
+        self.deposit = create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 3, 1)
+        )
+        self.withdraw = create_transaction(
+            user=self.user,
+            amount=40,
+            currency='USD',
+            trans_status='withdraw',
+            category='Food',
+            trans_details='',
+            transaction_date=date(2024, 3, 2)
+        )
+
+    def test_bulk_delete_by_date_range(self):
+        """Test deleting every transaction in a date range via API"""
+        data = {'start_date': '2024-03-01', 'end_date': '2024-03-31'}
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted_count'], 2)
+        self.assertIn('networth', response.data)
+        self.assertFalse(Transactions.objects.filter(user=self.user).exists())
+
+    def test_bulk_delete_requires_selection(self):
+        """Test a request without ids or a full date range is rejected"""
+        response = self.client.post(self.url, {'start_date': '2024-03-01'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url, {'transaction_ids': [self.withdraw.id], 'category': 'Food'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_negative_balance(self):
+        """Test the API reports a negative balance error"""
+        response = self.client.post(self.url, {'transaction_ids': [self.deposit.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('negative balance', response.data['error'])
+
+    def test_bulk_delete_unauthenticated(self):
+        """Test bulk delete requires authentication"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, {'transaction_ids': [self.deposit.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SyncApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('sync')
+        self.deposit = create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 3, 1)
+        )
+        self.withdraw = create_transaction(
+            user=self.user,
+            amount=40,
+            currency='USD',
+            trans_status='withdraw',
+            category='Food',
+            trans_details='',
+            transaction_date=date(2024, 3, 2)
+        )
+
+    def _sync_token(self):
+        """Full download, with the existing rows moved before the token's overlap window"""
+        Transactions.objects.filter(user=self.user).update(updated_at=timezone.now() - timedelta(hours=1))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['sync_token']
+
+    def test_full_download(self):
+        """Test a sync without token returns every row"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['reset'])
+        self.assertEqual(
+            sorted(row['id'] for row in response.data['transactions']['updated']),
+            [self.deposit.id, self.withdraw.id]
+        )
+        self.assertEqual(response.data['wishlist'], {'updated': [], 'deleted': []})
+
+    def test_changes_since_token(self):
+        """Test only updated and deleted rows are returned after a token"""
+        token = self._sync_token()
+        update_response = self.client.post(
+            reverse('update_transaction', kwargs={'transaction_id': self.withdraw.id}),
+            {'amount': '30.00', 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'date': '2024-03-02'},
+            format='json'
+        )
+        self.assertEqual(update_response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url, {'sync_token': token})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['reset'])
+        self.assertEqual([row['id'] for row in response.data['transactions']['updated']], [self.withdraw.id])
+        self.assertEqual(response.data['transactions']['updated'][0]['amount'], 30)
+        self.assertEqual(response.data['transactions']['deleted'], [])
+
+    def test_bulk_delete_leaves_tombstones(self):
+        """Test deleted transactions are listed by id"""
+        token = self._sync_token()
+        self.client.post(reverse('bulk_delete_transactions'), {'transaction_ids': [self.withdraw.id]}, format='json')
+
+        response = self.client.get(self.url, {'sync_token': token})
+
+        self.assertEqual(response.data['transactions']['deleted'], [self.withdraw.id])
+        self.assertEqual(response.data['transactions']['updated'], [])
+
+    def test_full_download_is_paged(self):
+        """Test a download larger than the limit continues with a cursor until has_more is false"""
+        Wishlist.objects.create(user=self.user, price=50, currency='USD', year=2024, wish_details='Bike')
+
+        pages = []
+        params = {'limit': 2}
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            if not response.data['has_more']:
+                break
+            self.assertIsNone(response.data['sync_token'])
+            params = {'limit': 2, 'cursor': response.data['cursor']}
+
+        self.assertEqual(len(pages), 2)
+        self.assertTrue(all(page['reset'] for page in pages))
+        self.assertEqual(
+            [row['id'] for page in pages for row in page['transactions']['updated']],
+            [self.deposit.id, self.withdraw.id]
+        )
+        self.assertEqual(len(pages[1]['wishlist']['updated']), 1)
+        self.assertIsNotNone(pages[-1]['sync_token'])
+
+        response = self.client.get(self.url, {'sync_token': pages[-1]['sync_token']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['reset'])
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_token(self):
+        """Test a tampered token is rejected"""
+        response = self.client.get(self.url, {'sync_token': 'not-a-token'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_of_other_user_is_rejected(self):
+        """Test a token cannot be replayed by another user"""
+        token = self._sync_token()
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.get(self.url, {'sync_token': token})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LedgerETagApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('get_transaction')
+        create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date.today()
+        )
+
+    def test_etag_returns_304_when_unchanged(self):
+        """Test If-None-Match with the current ETag returns 304"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_write(self):
+        """Test a ledger write invalidates the ETag"""
+        etag = self.client.get(self.url)['ETag']
+
+        create_transaction(
+            user=self.user,
+            amount=10,
+            currency='USD',
+            trans_status='withdraw',
+            category='Food',
+            trans_details='',
+            transaction_date=date.today()
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_user(self):
+        """Test another user's ETag does not match"""
+        etag = self.client.get(self.url)['ETag']
+
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TransactionImportDuplicatesApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('import_transactions_csv')
+        self.csv_content = (
+            b"date,amount,currency,trans_status,trans_details\n"
+            b"2024-01-15,100,USD,deposit,Salary\n"
+            b"2024-01-16,20,USD,withdraw,Lunch\n"
+        )
+
+    def _upload(self, **extra):
+        csv_file = SimpleUploadedFile("test.csv", self.csv_content, content_type="text/csv")
+        return self.client.post(self.url, {'file': csv_file, **extra}, format='multipart')
+
+    def test_reimport_skips_duplicates(self):
+        """Test re-importing the same file creates nothing new"""
+        self._upload()
+        response = self._upload()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported_count'], 0)
+        self.assertEqual(response.data['duplicate_count'], 2)
+        self.assertEqual(response.data['duplicate_rows'], [2, 3])
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 2)
+
+    def test_reimport_can_import_duplicates(self):
+        """Test duplicates are flagged but imported when asked"""
+        self._upload()
+        response = self._upload(on_duplicate='import')
+
+        self.assertEqual(response.data['imported_count'], 2)
+        self.assertEqual(response.data['duplicate_count'], 2)
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 4)
+
+
+class IdempotencyKeyApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('add_transactions')
+        self.data = {'amount': '100', 'currency': 'USD', 'trans_status': 'deposit'}
+
+    def test_retry_replays_original_response(self):
+        """Test a retried create returns the stored response without a second write"""
+        first = self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        second = self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(float(NetWorth.objects.get(user=self.user, currency='USD').total), 100)
+
+    def test_key_reused_with_different_payload(self):
+        """Test reusing a key for another request is rejected"""
+        self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        response = self.client.post(
+            self.url, {**self.data, 'amount': '200'}, format='json', HTTP_IDEMPOTENCY_KEY='key-1'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        """Test a failed request does not consume the key"""
+        withdraw = {'amount': '50', 'currency': 'USD', 'trans_status': 'withdraw'}
+        response = self.client.post(self.url, withdraw, format='json', HTTP_IDEMPOTENCY_KEY='key-2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='',
+            trans_details='',
+            transaction_date=date.today()
+        )
+        response = self.client.post(self.url, withdraw, format='json', HTTP_IDEMPOTENCY_KEY='key-2')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_keys_are_scoped_per_user(self):
+        """Test another user can use the same key"""
+        self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Transactions.objects.filter(user=other_user).count(), 1)
+
+    def test_failing_handler_releases_key(self):
+        """Test a handler that raises does not leave the key reserved"""
+        class RaisingApi(APIView):
+            @idempotent
+            def post(self, request):
+                raise RuntimeError('boom')
+
+        request = APIRequestFactory().post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-3')
+        force_authenticate(request, user=self.user)
+        with self.assertRaises(RuntimeError):
+            RaisingApi.as_view()(request)
+        self.assertFalse(IdempotencyKey.objects.filter(user=self.user, key='key-3').exists())
+
+        response = self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-3')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_abandoned_reservation_is_released(self):
+        """Test a reservation left behind by a dead worker stops blocking retries"""
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key='key-4',
+            request_hash='',
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        response = self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-4')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        IdempotencyKey.objects.filter(key='key-4').update(created_at=timezone.now() - timedelta(hours=1))
+        response = self.client.post(self.url, self.data, format='json', HTTP_IDEMPOTENCY_KEY='key-4')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
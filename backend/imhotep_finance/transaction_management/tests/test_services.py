@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from decimal import Decimal
@@ -7,12 +7,35 @@ from transaction_management.services import (
     create_transaction,
     delete_transaction,
     update_transaction,
+    apply_transaction_batch,
+    bulk_delete_transactions,
+    find_duplicate_transactions,
     bulk_import_transactions,
     parse_csv_transactions
 )
 from transaction_management.models import Transactions, NetWorth
 from wishlist_management.models import Wishlist
-from io import BytesIO
+from user_reports.models import Reports
+from user_reports.utils.report_queue import refresh_dirty_report_months
+from finance_management.models import LedgerStats
+from finance_management.utils.ledger_stats import get_ledger_stats, rebuild_ledger_stats, months_in_bitmap
+from finance_management.models import LedgerArchiveSegment, LedgerRollup
+from finance_management.utils.ledger_rollup import rebuild_ledger_rollups
+from finance_management.utils.minor_units import to_minor_units, from_minor_units
+from finance_management.utils.ledger_archive import archive_user_year, restore_user_year, read_archived_transactions
+from finance_management.utils.recalculate_networth import recalculate_networth
+from user_reports.utils.calculate_user_report import calculate_range_totals, calculate_user_report
+import os
+import tempfile
+import json
+from io import BytesIO, StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
+from finance_management.utils.partitioning import ensure_year_partitions, is_partitioned, partition_name
 
 User = get_user_model()
 
@@ -314,3 +337,720 @@ class BulkImportTransactionsTest(TestCase):
         
         self.assertEqual(created_count, 1)
         self.assertGreater(len(errors), 0)
+
+
+class ApplyTransactionBatchServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.deposit = create_transaction(
+            user=self.user,
+            amount=500,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 10)
+        )
+
+    def test_batch_mixed_operations_success(self):
+        """Test create, update and delete applied together"""
+        extra = create_transaction(
+            user=self.user,
+            amount=50,
+            currency='USD',
+            trans_status='withdraw',
+            category='Food',
+            trans_details='',
+            transaction_date=date(2024, 1, 12)
+        )
+
+        results = apply_transaction_batch(user=self.user, operations=[
+            {'op': 'create', 'amount': 100, 'currency': 'USD', 'trans_status': 'withdraw',
+             'category': 'Rent', 'date': date(2024, 1, 15)},
+            {'op': 'update', 'id': self.deposit.id, 'amount': 600, 'currency': 'USD',
+             'trans_status': 'deposit', 'category': 'Salary', 'date': date(2024, 1, 10)},
+            {'op': 'delete', 'id': extra.id},
+        ])
+
+        self.assertEqual([r['op'] for r in results], ['create', 'update', 'delete'])
+        self.assertIsNotNone(results[0]['id'])
+        self.assertFalse(Transactions.objects.filter(id=extra.id).exists())
+        self.assertEqual(Transactions.objects.get(id=self.deposit.id).amount, 600)
+
+        networth = NetWorth.objects.get(user=self.user, currency='USD')
+        self.assertEqual(float(networth.total), 500)
+
+        refresh_dirty_report_months(user=self.user)
+        report = json.loads(Reports.objects.get(user=self.user, month=1, year=2024).data)
+        self.assertEqual(report['total_deposit'], 600)
+        self.assertEqual(report['total_withdraw'], 100)
+        self.assertEqual(
+            [item['category'] for item in report['user_withdraw_on_range']],
+            ['Rent']
+        )
+
+    def test_batch_update_keeps_encrypted_fields_readable(self):
+        """Test category and details of a batch-updated row read back as written"""
+        apply_transaction_batch(user=self.user, operations=[
+            {'op': 'update', 'id': self.deposit.id, 'amount': 500, 'currency': 'USD',
+             'trans_status': 'deposit', 'category': 'Bonus', 'trans_details': 'Year end',
+             'date': date(2024, 1, 10)},
+        ])
+
+        trans = Transactions.objects.get(id=self.deposit.id)
+        self.assertEqual(trans.category, 'Bonus')
+        self.assertEqual(trans.trans_details, 'Year end')
+
+    def test_batch_is_atomic_on_error(self):
+        """Test a failing operation rolls back the whole batch"""
+        with self.assertRaises(ValidationError) as context:
+            apply_transaction_batch(user=self.user, operations=[
+                {'op': 'create', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit'},
+                {'op': 'create', 'amount': 5000, 'currency': 'USD', 'trans_status': 'withdraw'},
+            ])
+
+        self.assertIn('Operation 1', str(context.exception))
+        self.assertIn('Insufficient funds', str(context.exception))
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 1)
+        networth = NetWorth.objects.get(user=self.user, currency='USD')
+        self.assertEqual(float(networth.total), 500)
+
+    def test_batch_uses_running_balance(self):
+        """Test later operations see balances produced by earlier ones"""
+        apply_transaction_batch(user=self.user, operations=[
+            {'op': 'create', 'amount': 100, 'currency': 'EUR', 'trans_status': 'deposit'},
+            {'op': 'create', 'amount': 80, 'currency': 'EUR', 'trans_status': 'withdraw'},
+        ])
+
+        networth = NetWorth.objects.get(user=self.user, currency='EUR')
+        self.assertEqual(float(networth.total), 20)
+
+    def test_batch_rejects_other_users_transaction(self):
+        """Test operations cannot target another user's transaction"""
+        other_user = User.objects.create_user(username='other', password='testpass123')
+
+        with self.assertRaises(ValidationError) as context:
+            apply_transaction_batch(user=other_user, operations=[
+                {'op': 'delete', 'id': self.deposit.id},
+            ])
+        self.assertIn('not found', str(context.exception))
+
+    def test_batch_rejects_duplicate_targets(self):
+        """Test the same transaction cannot be targeted twice"""
+        with self.assertRaises(ValidationError):
+            apply_transaction_batch(user=self.user, operations=[
+                {'op': 'delete', 'id': self.deposit.id},
+                {'op': 'delete', 'id': self.deposit.id},
+            ])
+
+    def test_batch_delete_resets_wish(self):
+        """Test deleting a wish transaction marks the wish pending"""
+        wish = Wishlist.objects.create(
+            user=self.user, price=50, currency='USD', year=2024,
+            status=True, transaction=self.deposit
+        )
+        create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 11)
+        )
+
+        apply_transaction_batch(user=self.user, operations=[
+            {'op': 'delete', 'id': self.deposit.id},
+        ])
+
+        wish.refresh_from_db()
+        self.assertFalse(wish.status)
+        self.assertIsNone(wish.transaction)
+
+
+class BulkDeleteTransactionsServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.deposit = create_transaction(
+            user=self.user,
+            amount=500,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 10)
+        )
+        self.food = create_transaction(
+            user=self.user,
+            amount=50,
+            currency='USD',
+            trans_status='withdraw',
+            category='Food',
+            trans_details='lunch',
+            transaction_date=date(2024, 1, 12)
+        )
+        self.rent = create_transaction(
+            user=self.user,
+            amount=200,
+            currency='USD',
+            trans_status='withdraw',
+            category='Rent',
+            trans_details='',
+            transaction_date=date(2024, 2, 1)
+        )
+
+    def test_bulk_delete_by_ids(self):
+        """Test deleting an id list updates networth, reports and stats"""
+        deleted = bulk_delete_transactions(user=self.user, transaction_ids=[self.food.id, self.rent.id])
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(list(Transactions.objects.filter(user=self.user).values_list('id', flat=True)), [self.deposit.id])
+        networth = NetWorth.objects.get(user=self.user, currency='USD')
+        self.assertEqual(float(networth.total), 500)
+
+        refresh_dirty_report_months(user=self.user)
+        report = json.loads(Reports.objects.get(user=self.user, month=1, year=2024).data)
+        self.assertEqual(report['total_withdraw'], 0)
+        self.assertEqual(report['total_deposit'], 500)
+
+        stats = get_ledger_stats(self.user)
+        self.assertEqual(stats.withdraw_count, 0)
+        self.assertEqual(stats.last_date, date(2024, 1, 10))
+        self.assertEqual(months_in_bitmap(stats.transaction_months), [(2024, 1)])
+
+    def test_bulk_delete_by_filter(self):
+        """Test deleting by date range and category only touches matching rows"""
+        deleted = bulk_delete_transactions(
+            user=self.user,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            category='Food'
+        )
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Transactions.objects.filter(id=self.food.id).exists())
+        self.assertTrue(Transactions.objects.filter(id=self.rent.id).exists())
+        networth = NetWorth.objects.get(user=self.user, currency='USD')
+        self.assertEqual(float(networth.total), 300)
+
+    def test_bulk_delete_negative_balance_is_rejected(self):
+        """Test nothing is deleted when the result would be a negative balance"""
+        with self.assertRaises(ValidationError) as context:
+            bulk_delete_transactions(user=self.user, transaction_ids=[self.deposit.id])
+
+        self.assertIn('negative balance in USD', str(context.exception))
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 3)
+        networth = NetWorth.objects.get(user=self.user, currency='USD')
+        self.assertEqual(float(networth.total), 250)
+
+    def test_bulk_delete_unknown_ids(self):
+        """Test ids of other users' transactions are rejected"""
+        other_user = User.objects.create_user(username='other', password='testpass123')
+
+        with self.assertRaises(ValidationError) as context:
+            bulk_delete_transactions(user=other_user, transaction_ids=[self.food.id])
+        self.assertIn('not found', str(context.exception))
+        self.assertTrue(Transactions.objects.filter(id=self.food.id).exists())
+
+
+class TransactionBaseAmountTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_create_and_update_store_base_amount(self):
+        """Test amount_base holds the USD amount after create and update"""
+        trans = create_transaction(
+            user=self.user,
+            amount=92,
+            currency='EUR',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 10)
+        )
+        trans.refresh_from_db()
+        self.assertAlmostEqual(trans.amount_base, 100)
+
+        update_transaction(
+            user=self.user,
+            transaction_id=trans.id,
+            amount=50,
+            currency='USD',
+            trans_details='',
+            category='Salary',
+            trans_status='deposit',
+            transaction_date=date(2024, 1, 10)
+        )
+        trans.refresh_from_db()
+        self.assertAlmostEqual(trans.amount_base, 50)
+
+    def test_batch_stores_base_amount(self):
+        """Test batch creates store amount_base"""
+        results = apply_transaction_batch(user=self.user, operations=[
+            {'op': 'create', 'amount': 73, 'currency': 'GBP', 'trans_status': 'deposit'},
+        ])
+
+        trans = Transactions.objects.get(id=results[0]['id'])
+        self.assertAlmostEqual(trans.amount_base, 100)
+
+    def test_backfill_command(self):
+        """Test the backfill command fills missing base amounts per currency"""
+        for amount, currency in ((92, 'EUR'), (10, 'USD')):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status='deposit',
+                category='Salary',
+                trans_details='',
+                transaction_date=date(2024, 1, 10)
+            )
+        Transactions.objects.filter(user=self.user).update(amount_base=None)
+
+        call_command('backfill_transaction_base_amounts', stdout=StringIO())
+
+        base_amounts = dict(Transactions.objects.filter(user=self.user).values_list('currency', 'amount_base'))
+        self.assertAlmostEqual(base_amounts['EUR'], 100)
+        self.assertAlmostEqual(base_amounts['USD'], 10)
+
+
+class MinorUnitsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _deposit(self, amount, currency='USD'):
+        return create_transaction(
+            user=self.user,
+            amount=amount,
+            currency=currency,
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 10)
+        )
+
+    def test_registry_exponents(self):
+        """Test minor units follow the currency registry with at least two decimals"""
+        self.assertEqual(to_minor_units(12.34, 'USD'), 1234)
+        self.assertEqual(to_minor_units(1.235, 'KWD'), 1235)
+        self.assertEqual(to_minor_units(100.5, 'JPY'), 10050)
+        self.assertEqual(from_minor_units(1235, 'KWD'), 1.235)
+
+    def test_networth_does_not_drift(self):
+        """Test repeated deposits keep an exact networth"""
+        for _ in range(10):
+            self._deposit(0.1)
+
+        networth = NetWorth.objects.get(user=self.user, currency='USD')
+        self.assertEqual(networth.total, 1.0)
+        self.assertEqual(networth.total_minor, 100)
+        self.assertEqual(
+            sum(Transactions.objects.filter(user=self.user).values_list('amount_minor', flat=True)),
+            100
+        )
+
+    def test_convert_command_fills_missing_units(self):
+        """Test the conversion command fills minor units of existing rows"""
+        self._deposit(19.99, 'EUR')
+        Transactions.objects.filter(user=self.user).update(amount_minor=None)
+        NetWorth.objects.filter(user=self.user).update(total_minor=None)
+
+        call_command('convert_amounts_to_minor_units', stdout=StringIO())
+
+        self.assertEqual(Transactions.objects.get(user=self.user).amount_minor, 1999)
+        self.assertEqual(NetWorth.objects.get(user=self.user).total_minor, 1999)
+
+
+class FindDuplicateTransactionsServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='ACME  Payroll',
+            transaction_date=date(2024, 1, 15)
+        )
+
+    def test_fingerprint_set_on_create(self):
+        """Test transactions get a fingerprint when saved"""
+        transaction = Transactions.objects.get(user=self.user)
+        self.assertEqual(len(transaction.fingerprint), 64)
+        self.assertEqual(transaction.fingerprint, transaction.compute_fingerprint())
+
+    def test_detects_existing_row_with_normalized_details(self):
+        """Test details are matched ignoring case and extra whitespace"""
+        duplicates = find_duplicate_transactions(user=self.user, transactions_data=[
+            {'date': '2024-01-15', 'amount': 100.0, 'currency': 'USD',
+             'trans_status': 'Deposit', 'trans_details': 'acme payroll'},
+            {'date': '2024-01-16', 'amount': 100.0, 'currency': 'USD',
+             'trans_status': 'deposit', 'trans_details': 'acme payroll'},
+        ])
+        self.assertEqual(duplicates, [0])
+
+    def test_each_existing_row_matches_once(self):
+        """Test repeated identical rows beyond the existing count are new"""
+        row = {'date': '2024-01-15', 'amount': 100, 'currency': 'USD',
+               'trans_status': 'deposit', 'trans_details': 'ACME Payroll'}
+        duplicates = find_duplicate_transactions(user=self.user, transactions_data=[row, dict(row)])
+        self.assertEqual(duplicates, [0])
+
+    def test_other_users_rows_are_not_duplicates(self):
+        """Test fingerprints are scoped to the user"""
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        duplicates = find_duplicate_transactions(user=other_user, transactions_data=[
+            {'date': '2024-01-15', 'amount': 100, 'currency': 'USD',
+             'trans_status': 'deposit', 'trans_details': 'ACME Payroll'},
+        ])
+        self.assertEqual(duplicates, [])
+
+
+class LedgerStatsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _create(self, amount, trans_status, transaction_date):
+        return create_transaction(
+            user=self.user,
+            amount=amount,
+            currency='USD',
+            trans_status=trans_status,
+            category='',
+            trans_details='',
+            transaction_date=transaction_date
+        )
+
+    def _assert_matches_rebuild(self):
+        stats = LedgerStats.objects.get(user=self.user)
+        rebuilt = rebuild_ledger_stats(self.user)
+        self.assertEqual(
+            (stats.deposit_count, stats.withdraw_count, stats.first_date, stats.last_date, stats.transaction_months),
+            (rebuilt.deposit_count, rebuilt.withdraw_count, rebuilt.first_date, rebuilt.last_date, rebuilt.transaction_months)
+        )
+
+    def test_stats_follow_creates(self):
+        """Test counts, bounds and months are updated on create"""
+        self._create(100, 'deposit', date(2024, 1, 15))
+        self._create(50, 'withdraw', date(2024, 3, 2))
+
+        stats = get_ledger_stats(self.user)
+        self.assertEqual(stats.deposit_count, 1)
+        self.assertEqual(stats.withdraw_count, 1)
+        self.assertEqual(stats.first_date, date(2024, 1, 15))
+        self.assertEqual(stats.last_date, date(2024, 3, 2))
+        self.assertEqual(months_in_bitmap(stats.transaction_months), [(2024, 3), (2024, 1)])
+
+    def test_stats_follow_update_and_delete(self):
+        """Test moving and deleting boundary transactions shrinks bounds and months"""
+        self._create(100, 'deposit', date(2024, 1, 15))
+        middle = self._create(30, 'deposit', date(2024, 2, 10))
+        last = self._create(20, 'withdraw', date(2024, 5, 1))
+
+        update_transaction(
+            user=self.user,
+            transaction_id=last.id,
+            amount=20,
+            currency='USD',
+            trans_details='',
+            category='',
+            trans_status='withdraw',
+            transaction_date=date(2024, 2, 20)
+        )
+        delete_transaction(user=self.user, transaction_id=middle.id)
+
+        stats = get_ledger_stats(self.user)
+        self.assertEqual(stats.last_date, date(2024, 2, 20))
+        self.assertEqual(months_in_bitmap(stats.transaction_months), [(2024, 2), (2024, 1)])
+        self._assert_matches_rebuild()
+
+    def test_stats_follow_batch(self):
+        """Test batch creates, updates and deletes keep stats in sync"""
+        first = self._create(100, 'deposit', date(2024, 1, 15))
+        second = self._create(10, 'deposit', date(2024, 4, 1))
+
+        apply_transaction_batch(user=self.user, operations=[
+            {'op': 'create', 'amount': 5, 'currency': 'USD', 'trans_status': 'withdraw', 'date': '2023-12-31'},
+            {'op': 'update', 'id': first.id, 'amount': 100, 'currency': 'USD',
+             'trans_status': 'deposit', 'date': '2024-02-01'},
+            {'op': 'delete', 'id': second.id},
+        ])
+
+        stats = get_ledger_stats(self.user)
+        self.assertEqual(stats.deposit_count, 1)
+        self.assertEqual(stats.withdraw_count, 1)
+        self.assertEqual(stats.first_date, date(2023, 12, 31))
+        self.assertEqual(stats.last_date, date(2024, 2, 1))
+        self._assert_matches_rebuild()
+
+    def test_report_months_follow_reports(self):
+        """Test report rows flag their month in the stats"""
+        Reports.objects.create(user=self.user, month=6, year=2023, data='{}')
+        Reports.objects.create(user=self.user, month=2, year=2024, data='{}')
+
+        stats = get_ledger_stats(self.user)
+        self.assertEqual(months_in_bitmap(stats.report_months), [(2024, 2), (2023, 6)])
+
+
+class LedgerRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.salary = create_transaction(
+            user=self.user, amount=1000, currency='USD', trans_status='deposit',
+            category='Salary', trans_details='', transaction_date=date(2024, 1, 5)
+        )
+        self.food = create_transaction(
+            user=self.user, amount=40, currency='USD', trans_status='withdraw',
+            category='Food', trans_details='', transaction_date=date(2024, 1, 9)
+        )
+
+    def _rollups(self):
+        return sorted(
+            LedgerRollup.objects.filter(user=self.user).values_list(
+                'year', 'month', 'currency', 'trans_status', 'category', 'count', 'total_minor'
+            )
+        )
+
+    def _assert_matches_rebuild(self):
+        maintained = self._rollups()
+        rebuild_ledger_rollups(self.user)
+        self.assertEqual(maintained, self._rollups())
+
+    def test_rollups_follow_single_writes(self):
+        """Test create, update and delete keep one count and sum per month, currency, status and category"""
+        create_transaction(
+            user=self.user, amount=10.5, currency='USD', trans_status='withdraw',
+            category='Food', trans_details='', transaction_date=date(2024, 1, 20)
+        )
+        self.assertIn((2024, 1, 'USD', 'withdraw', 'Food', 2, 5050), self._rollups())
+
+        update_transaction(
+            user=self.user, transaction_id=self.food.id, amount=30, currency='USD',
+            trans_details='', category='Food', trans_status='withdraw', transaction_date=date(2024, 2, 1)
+        )
+        self.assertEqual(self._rollups(), [
+            (2024, 1, 'USD', 'deposit', 'Salary', 1, 100000),
+            (2024, 1, 'USD', 'withdraw', 'Food', 1, 1050),
+            (2024, 2, 'USD', 'withdraw', 'Food', 1, 3000),
+        ])
+        self._assert_matches_rebuild()
+
+    def test_rollups_follow_bulk_writes(self):
+        """Test batch operations and bulk deletes update the rollups like single writes"""
+        apply_transaction_batch(user=self.user, operations=[
+            {'op': 'create', 'amount': 20, 'currency': 'EUR', 'trans_status': 'deposit',
+             'category': 'Gift', 'date': date(2024, 3, 1)},
+            {'op': 'update', 'id': self.food.id, 'amount': 60, 'currency': 'USD',
+             'trans_status': 'withdraw', 'category': 'Rent', 'date': date(2024, 1, 9)},
+        ])
+        self._assert_matches_rebuild()
+
+        bulk_delete_transactions(user=self.user, transaction_ids=[self.food.id])
+        self.assertEqual(self._rollups(), [
+            (2024, 1, 'USD', 'deposit', 'Salary', 1, 100000),
+            (2024, 3, 'EUR', 'deposit', 'Gift', 1, 2000),
+        ])
+        self._assert_matches_rebuild()
+
+    def test_rebuild_command_fills_missing_rollups(self):
+        """Test the rebuild command restores rollups for users who have none"""
+        expected = self._rollups()
+        LedgerRollup.objects.filter(user=self.user).delete()
+
+        call_command('rebuild_ledger_rollups', missing=True, stdout=StringIO())
+
+        self.assertEqual(self._rollups(), expected)
+
+
+class LedgerArchiveTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.archive_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(LEDGER_ARCHIVE_ROOT=self.archive_root.name)
+        self.settings_override.enable()
+        for amount, trans_status, category, transaction_date in [
+            (100, 'deposit', 'Salary', date(2020, 1, 5)),
+            (30, 'withdraw', 'Food', date(2020, 1, 20)),
+            (10, 'deposit', 'Gift', date.today()),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category=category,
+                trans_details='',
+                transaction_date=transaction_date
+            )
+        refresh_dirty_report_months(user=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.archive_root.cleanup()
+
+    def test_archive_moves_year_into_encrypted_segment(self):
+        """Test a closed year leaves the table and is stored compressed and encrypted"""
+        count, skipped = archive_user_year(self.user, 2020)
+
+        self.assertEqual(count, 2)
+        self.assertIsNone(skipped)
+        self.assertFalse(Transactions.objects.filter(user=self.user, date__year=2020).exists())
+        segment = LedgerArchiveSegment.objects.get(user=self.user, year=2020)
+        with open(os.path.join(self.archive_root.name, segment.path), 'rb') as segment_file:
+            self.assertNotIn(b'Salary', segment_file.read())
+        self.assertEqual(get_ledger_stats(self.user).first_date, date.today())
+
+    def test_archived_rows_are_read_back(self):
+        """Test archived transactions feed reads and report calculation"""
+        archive_user_year(self.user, 2020)
+
+        rows = read_archived_transactions(self.user, date(2020, 1, 1), date(2020, 1, 31))
+        self.assertEqual(sorted(row['category'] for row in rows), ['Food', 'Salary'])
+
+        withdraws, deposits, total_withdraw, total_deposit = calculate_user_report(
+            date(2020, 1, 1), date(2020, 1, 31), self.user
+        )
+        self.assertAlmostEqual(total_withdraw, 30.0)
+        self.assertAlmostEqual(total_deposit, 100.0)
+
+        # A partial month is scanned row by row, archive included
+        totals = calculate_range_totals(date(2020, 1, 6), date(2020, 1, 25), self.user)
+        self.assertEqual(dict(totals), {('withdraw', 'USD', 'Food'): 3000})
+
+    def test_recalculate_networth_counts_archived_years(self):
+        """Test recalculating networth after archiving a year keeps the balance"""
+        archive_user_year(self.user, 2020)
+
+        success, result = recalculate_networth(self.user)
+
+        self.assertTrue(success)
+        self.assertEqual(result['currency_totals'], {'USD': 80.0})
+        self.assertEqual(float(NetWorth.objects.get(user=self.user, currency='USD').total), 80)
+
+    def test_archive_requires_reports(self):
+        """Test a year whose reports are missing is not archived"""
+        Reports.objects.filter(user=self.user, year=2020).delete()
+
+        count, skipped = archive_user_year(self.user, 2020)
+
+        self.assertEqual(count, 0)
+        self.assertIn('reports missing', skipped)
+        self.assertEqual(Transactions.objects.filter(user=self.user, date__year=2020).count(), 2)
+
+    def test_restore_brings_rows_back(self):
+        """Test restoring a segment reinserts the original rows"""
+        original_ids = set(Transactions.objects.filter(user=self.user, date__year=2020).values_list('id', flat=True))
+        archive_user_year(self.user, 2020)
+
+        self.assertEqual(restore_user_year(self.user, 2020), 2)
+
+        restored = Transactions.objects.filter(user=self.user, date__year=2020)
+        self.assertEqual(set(restored.values_list('id', flat=True)), original_ids)
+        self.assertEqual(sorted(restored.values_list('category', flat=True)), ['Food', 'Salary'])
+        self.assertFalse(LedgerArchiveSegment.objects.filter(user=self.user).exists())
+        self.assertEqual(get_ledger_stats(self.user).first_date, date(2020, 1, 5))
+
+
+class PartitionTransactionsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        create_transaction(
+            user=self.user,
+            amount=100,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2022, 5, 1)
+        )
+
+    @skipIf(connection.vendor == 'postgresql', "checks the refusal on other databases")
+    def test_refused_outside_postgresql(self):
+        """Test partitioning commands refuse to run on databases other than PostgreSQL"""
+        for action in ('convert', 'status', 'create'):
+            args = [action, '2030'] if action == 'create' else [action]
+            with self.assertRaises(CommandError) as context:
+                call_command('partition_transactions', *args, stdout=StringIO())
+            self.assertIn('only available on PostgreSQL', str(context.exception))
+
+        out = StringIO()
+        call_command('partition_transactions', 'ensure', stdout=out)
+        self.assertIn('nothing to do', out.getvalue())
+
+    def test_ensure_is_noop_when_partitions_exist(self):
+        """Test ensure runs no DDL when every yearly partition is already attached"""
+        existing = [(partition_name(year), '', 0) for year in range(2022, date.today().year + 2)]
+        with patch.object(connection, 'vendor', 'postgresql'), \
+                patch('finance_management.utils.partitioning.is_partitioned', return_value=True), \
+                patch('transaction_management.management.commands.partition_transactions.is_partitioned', return_value=True), \
+                patch('finance_management.utils.partitioning.list_partitions', return_value=existing), \
+                CaptureQueriesContext(connection) as queries:
+            out = StringIO()
+            call_command('partition_transactions', 'ensure', stdout=out)
+
+        self.assertIn('Created 0 partition(s)', out.getvalue())
+        self.assertFalse([query for query in queries if 'CREATE' in query['sql'].upper()])
+
+    @skipUnless(connection.vendor == 'postgresql', "table partitioning needs PostgreSQL")
+    def test_convert_keeps_rows_and_accepts_writes(self):
+        """Test converting the table keeps every row, and later writes and ensure still work"""
+        call_command('partition_transactions', 'convert', stdout=StringIO())
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 1)
+        create_transaction(
+            user=self.user,
+            amount=40,
+            currency='USD',
+            trans_status='withdraw',
+            category='Food',
+            trans_details='',
+            transaction_date=date(2023, 2, 1)
+        )
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(ensure_year_partitions(), [])
+
+    @skipUnless(connection.vendor == 'postgresql', "table partitioning needs PostgreSQL")
+    def test_ensure_moves_rows_out_of_the_default_partition(self):
+        """Test a year written before its partition existed is moved into the new partition"""
+        call_command('partition_transactions', 'convert', '--years-ahead', '0', stdout=StringIO())
+        future = date(date.today().year + 2, 3, 1)
+        create_transaction(
+            user=self.user,
+            amount=10,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=future
+        )
+
+        self.assertEqual(ensure_year_partitions(years_ahead=2), [future.year - 1, future.year])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{partition_name(future.year)}"')
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertEqual(Transactions.objects.filter(user=self.user).count(), 2)
+
+    @skipUnless(connection.vendor == 'postgresql', "table partitioning needs PostgreSQL")
+    def test_detach_removes_the_year_from_the_ledger(self):
+        """Test detaching a year takes its rows out of the table and keeps ids increasing"""
+        first_id = Transactions.objects.get(user=self.user).id
+        call_command('partition_transactions', 'convert', stdout=StringIO())
+        out = StringIO()
+        call_command('partition_transactions', 'detach', '2022', '--drop', stdout=out)
+
+        self.assertIn(f"Dropped {partition_name(2022)}", out.getvalue())
+        self.assertFalse(Transactions.objects.filter(user=self.user).exists())
+        trans = create_transaction(
+            user=self.user,
+            amount=5,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2023, 1, 1)
+        )
+        self.assertGreater(trans.id, first_id)
+
@@ -4,6 +4,8 @@ from .apis import (
     TransactionListApi,
     TransactionUpdateApi,
     TransactionDeleteApi,
+    TransactionBatchApi,
+    TransactionBulkDeleteApi,
     TransactionExportCSVApi,
     TransactionImportCSVApi,
     RecalculateNetworthApi
@@ -14,6 +16,8 @@ urlpatterns = [
     path('transaction/get-transactions/', TransactionListApi.as_view(), name='get_transaction'),
     path('transaction/update-transactions/<int:transaction_id>/', TransactionUpdateApi.as_view(), name='update_transaction'),
     path('transaction/delete-transactions/<int:transaction_id>/', TransactionDeleteApi.as_view(), name='delete_transaction'),
+    path('transaction/batch/', TransactionBatchApi.as_view(), name='batch_transactions'),
+    path('transaction/bulk-delete/', TransactionBulkDeleteApi.as_view(), name='bulk_delete_transactions'),
     path('transaction/export-csv/', TransactionExportCSVApi.as_view(), name='export_transactions_csv'),
     path('transaction/import-csv/', TransactionImportCSVApi.as_view(), name='import_transactions_csv'),
     path('recalculate-networth/', RecalculateNetworthApi.as_view(), name='recalculate_networth'),
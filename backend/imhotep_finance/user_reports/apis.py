@@ -13,7 +13,12 @@ from user_reports.services import (
     get_monthly_report_for_user,
     get_report_history_years_for_user,
     get_yearly_report_for_user,
-    recalculate_all_reports_for_user
+    recalculate_all_reports_for_user,
+    get_cash_flow_for_user,
+    get_spending_heatmap_for_user,
+    get_range_report_for_user,
+    get_category_trends_for_user,
+    get_report_comparison_for_user
 )
 from user_reports.serializers import (
     ReportHistoryMonthsResponseSerializer,
@@ -22,10 +27,21 @@ from user_reports.serializers import (
     YearQuerySerializer,
     ReportHistoryYearsResponseSerializer,
     YearlyReportResponseSerializer,
-    RecalculateReportsResponseSerializer
+    RecalculateReportsResponseSerializer,
+    CashFlowQuerySerializer,
+    CashFlowResponseSerializer,
+    SpendingHeatmapQuerySerializer,
+    SpendingHeatmapResponseSerializer,
+    RangeReportQuerySerializer,
+    RangeReportResponseSerializer,
+    CategoryTrendsQuerySerializer,
+    CategoryTrendsResponseSerializer,
+    ReportComparisonQuerySerializer,
+    ReportComparisonResponseSerializer
 )
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from imhotep_finance.throttles import ReportGenerationRateThrottle
+from finance_management.utils.ledger_version import ledger_etag
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ReportHistoryMonthsApi(APIView):
@@ -41,6 +57,7 @@ class ReportHistoryMonthsApi(APIView):
         description='List available month/year combinations for which reports exist.',
         operation_id='get_report_history_months'
     )
+    @ledger_etag
     def get(self, request):
         """Return available report months/years for the logged-in user."""
         try:
@@ -98,6 +115,7 @@ class MonthlyReportHistoryApi(APIView):
         description='Get a specific month report from history (stored snapshot).',
         operation_id='get_monthly_report_history'
     )
+    @ledger_etag
     def get(self, request):
         """Return specific monthly report for the logged-in user."""
         try:
@@ -147,6 +165,7 @@ class ReportHistoryYearsApi(APIView):
         description='List available years for which reports exist.',
         operation_id='get_report_history_years'
     )
+    @ledger_etag
     def get(self, request):
         """Return available report years for the logged-in user."""
         try:
@@ -198,6 +217,7 @@ class YearlyReportApi(APIView):
         description='Get yearly aggregated report across available monthly reports.',
         operation_id='get_yearly_report'
     )
+    @ledger_etag
     def get(self, request):
         """Return aggregated yearly report for the logged-in user."""
         try:
@@ -255,3 +275,213 @@ class RecalculateReportsApi(APIView):
                 {'error': f'Error in recalculating reports: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class CashFlowApi(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[CashFlowQuerySerializer],
+        responses={
+            200: CashFlowResponseSerializer,
+            400: 'Invalid date range',
+            500: 'Internal server error'
+        },
+        description='Get monthly deposit and withdraw sums per currency for a date range, with totals in the favorite currency.',
+        operation_id='get_cash_flow'
+    )
+    @ledger_etag
+    def get(self, request):
+        """Return the monthly cash flow of the logged-in user."""
+        try:
+            query_serializer = CashFlowQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            filters = query_serializer.validated_data
+            
+            cash_flow = get_cash_flow_for_user(
+                user=request.user,
+                start_date=filters.get('start_date'),
+                end_date=filters.get('end_date')
+            )
+            
+            return Response(cash_flow, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Cash flow error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving cash flow'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class SpendingHeatmapApi(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[SpendingHeatmapQuerySerializer],
+        responses={
+            200: SpendingHeatmapResponseSerializer,
+            400: 'Invalid year',
+            500: 'Internal server error'
+        },
+        description='Get per-day withdraw totals in the favorite currency for a year, for a calendar heatmap.',
+        operation_id='get_spending_heatmap'
+    )
+    @ledger_etag
+    def get(self, request):
+        """Return the daily spending of the logged-in user for one year."""
+        try:
+            query_serializer = SpendingHeatmapQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            
+            heatmap = get_spending_heatmap_for_user(
+                user=request.user,
+                year=query_serializer.validated_data.get('year')
+            )
+            
+            return Response(heatmap, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Spending heatmap error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving spending heatmap'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class RangeReportApi(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[RangeReportQuerySerializer],
+        responses={
+            200: RangeReportResponseSerializer,
+            400: 'Invalid date range',
+            500: 'Internal server error'
+        },
+        description='Get a category report in the favorite currency for an arbitrary date range, e.g. a quarter or the last 90 days.',
+        operation_id='get_range_report'
+    )
+    @ledger_etag
+    def get(self, request):
+        """Return the report of the logged-in user for a custom date range."""
+        try:
+            query_serializer = RangeReportQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            filters = query_serializer.validated_data
+            
+            report = get_range_report_for_user(
+                user=request.user,
+                start_date=filters['start_date'],
+                end_date=filters['end_date']
+            )
+            
+            return Response(report, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Range report error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving range report'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class CategoryTrendsApi(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[CategoryTrendsQuerySerializer],
+        responses={
+            200: CategoryTrendsResponseSerializer,
+            400: 'Invalid date range or status',
+            500: 'Internal server error'
+        },
+        description='Get the monthly totals and shares of every category over a range, as parallel arrays.',
+        operation_id='get_category_trends'
+    )
+    @ledger_etag
+    def get(self, request):
+        """Return the per-category monthly series of the logged-in user."""
+        try:
+            query_serializer = CategoryTrendsQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            filters = query_serializer.validated_data
+            
+            trends = get_category_trends_for_user(
+                user=request.user,
+                start_date=filters.get('start_date'),
+                end_date=filters.get('end_date'),
+                trans_status=filters['trans_status']
+            )
+            
+            return Response(trends, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Category trends error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving category trends'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ReportComparisonApi(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[ReportComparisonQuerySerializer],
+        responses={
+            200: ReportComparisonResponseSerializer,
+            400: 'Invalid comparison or period',
+            500: 'Internal server error'
+        },
+        description='Compare a period with the previous month or year: per-category deltas, percentage changes and top movers.',
+        operation_id='get_report_comparison'
+    )
+    @ledger_etag
+    def get(self, request):
+        """Return the period comparison of the logged-in user."""
+        try:
+            query_serializer = ReportComparisonQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            filters = query_serializer.validated_data
+            
+            comparison = get_report_comparison_for_user(
+                user=request.user,
+                comparison=filters['comparison'],
+                year=filters.get('year'),
+                month=filters.get('month')
+            )
+            
+            return Response(comparison, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Report comparison error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving report comparison'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
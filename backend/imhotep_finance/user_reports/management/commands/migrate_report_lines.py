@@ -0,0 +1,28 @@
+import json
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from user_reports.models import Reports
+
+
+class Command(BaseCommand):
+    help = "Move the category totals of reports stored as encrypted JSON documents into ReportLine rows"
+
+    def handle(self, *args, **options):
+        migrated = 0
+        skipped = 0
+        reports = Reports.objects.filter(legacy_data__isnull=False).select_related('user')
+        for report in reports.iterator(chunk_size=500):
+            try:
+                document = json.loads(report.legacy_data)
+            except (TypeError, json.JSONDecodeError):
+                document = None
+            if not isinstance(document, dict):
+                skipped += 1
+                continue
+
+            with transaction.atomic():
+                report.data = document
+                report.save()
+            migrated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Migrated {migrated} report(s) to report lines, skipped {skipped}."))
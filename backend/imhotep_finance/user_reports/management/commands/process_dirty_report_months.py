@@ -0,0 +1,45 @@
+import time
+from django.core.management.base import BaseCommand
+from user_reports.utils.report_queue import refresh_dirty_report_months
+
+
+class Command(BaseCommand):
+    help = "Rebuild the reports of months marked dirty by transaction writes, each month once"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting once it is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls of an empty queue (with --loop)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Dirty months to claim per round",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = 0
+        while True:
+            try:
+                count = refresh_dirty_report_months(limit=options["batch_size"])
+            except Exception as e:
+                # The failed month stays queued; keep serving the others
+                self.stderr.write(f"Error rebuilding dirty report months: {str(e)}")
+                count = 0
+            rebuilt += count
+            if count:
+                self.stdout.write(f"  rebuilt {count} report month(s)")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} report month(s)."))
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections
+from accounts.models import User
+from user_reports.services import recalculate_all_reports_for_user
+
+
+def _init_worker():
+    # Connections inherited from the parent process must not be shared between workers
+    connections.close_all()
+
+
+def _peak_memory_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _rebuild_user(user_id):
+    """Recalculate one user's reports; returns (user_id, rows scanned, error, worker pid, peak memory in MB)."""
+    try:
+        user = User.objects.get(pk=user_id)
+        result = recalculate_all_reports_for_user(user=user)
+        rows = result['summary']['rows_scanned']
+        error = None
+        if result['summary']['errors_count']:
+            error = '; '.join(item['error'] for item in result['errors'])
+    except Exception as e:
+        rows, error = 0, str(e)
+    return user_id, rows, error, os.getpid(), _peak_memory_mb()
+
+
+class Command(BaseCommand):
+    help = "Regenerate every user's monthly reports from their ledger, sharding users across a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (1 runs in this process)",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild these user ids (repeatable)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="rebuild_reports.checkpoint",
+            help="File recording the ids of users already rebuilt; users listed there are skipped",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore and overwrite an existing checkpoint",
+        )
+
+    def _read_checkpoint(self, path, restart):
+        if restart or not os.path.exists(path):
+            open(path, "w").close()
+            return set()
+        with open(path) as checkpoint:
+            return {int(line) for line in checkpoint if line.strip()}
+
+    def handle(self, *args, **options):
+        done = self._read_checkpoint(options["checkpoint"], options["restart"])
+
+        users = User.objects.order_by('id')
+        if options["user_ids"]:
+            users = users.filter(id__in=options["user_ids"])
+        user_ids = [user_id for user_id in users.values_list('id', flat=True) if user_id not in done]
+        if done:
+            self.stdout.write(f"Resuming: {len(done)} user(s) already rebuilt according to the checkpoint.")
+
+        workers = max(1, options["workers"])
+        started = time.monotonic()
+        rebuilt = failed = rows = 0
+        worker_memory = {}
+
+        if workers == 1 or len(user_ids) <= 1:
+            results = map(_rebuild_user, user_ids)
+            pool = None
+        else:
+            # Close our connections before forking so workers open their own
+            connections.close_all()
+            pool = multiprocessing.Pool(workers, initializer=_init_worker)
+            results = pool.imap_unordered(_rebuild_user, user_ids, chunksize=4)
+
+        try:
+            with open(options["checkpoint"], "a") as checkpoint:
+                for user_id, user_rows, error, pid, memory_mb in results:
+                    worker_memory[pid] = memory_mb
+                    if error:
+                        failed += 1
+                        self.stderr.write(f"  user {user_id}: {error}")
+                        continue
+
+                    checkpoint.write(f"{user_id}\n")
+                    checkpoint.flush()
+                    rebuilt += 1
+                    rows += user_rows
+
+                    if rebuilt % 100 == 0:
+                        self._report_progress(rebuilt, len(user_ids), rows, started, worker_memory)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        self._report_progress(rebuilt, len(user_ids), rows, started, worker_memory)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt reports for {rebuilt} user(s), {failed} failed."
+        ))
+
+    def _report_progress(self, rebuilt, total, rows, started, worker_memory):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        memory = ", ".join(f"{pid}: {mb:.0f} MB" for pid, mb in sorted(worker_memory.items()))
+        self.stdout.write(
+            f"  {rebuilt}/{total} users, {rows} rows, {rows / elapsed:.0f} rows/s; peak memory per worker: {memory or '-'}"
+        )
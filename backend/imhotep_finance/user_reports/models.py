@@ -1,16 +1,124 @@
+import calendar
+import json
 from django.db import models
 from accounts.models import User
-from encrypted_model_fields.fields import EncryptedTextField
+from encrypted_model_fields.fields import EncryptedCharField, EncryptedTextField
+from finance_management.utils.blind_index import blind_index
+from finance_management.utils.currencies import get_conversion_factors
+from finance_management.utils.minor_units import to_minor_units
+from .utils.report_totals import convert_totals
+
+REPORT_STATUSES = ("deposit", "withdraw")
 
 # Create your models here.
 class Reports(models.Model):
+    """
+    A user's monthly report. The category totals live in ReportLine rows in
+    their native currencies; the report document served by the APIs is
+    assembled from them on read, in the user's current favorite currency.
+    """
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports_user')
     month = models.IntegerField()
     year = models.IntegerField()
-    data = EncryptedTextField()
+    # Encrypted JSON document of reports written before ReportLine existed, see migrate_report_lines
+    legacy_data = EncryptedTextField(db_column='data', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+
+    @staticmethod
+    def build_category_index(user_id, category):
+        return blind_index('report_category', user_id, category)
+
+    def build_document(self, lines, factors, favorite_currency):
+        """Assemble the report document from its lines, converting each currency with factors."""
+        totals = {(line.trans_status, line.currency, line.category): line.total_minor for line in lines}
+        withdraws, deposits, total_withdraw, total_deposit = convert_totals(totals, factors)
+        return {
+            "current_month": f"{calendar.month_name[self.month]} {self.year}",
+            "total_deposit": total_deposit,
+            "total_withdraw": total_withdraw,
+            "user_deposit_on_range": deposits,
+            "user_withdraw_on_range": withdraws,
+            "favorite_currency": favorite_currency,
+        }
+
+    def as_document(self, factors=None, favorite_currency=None):
+        """
+        The report document as a dict; empty for a report without lines.
+        Callers reading many reports pass the factors of get_conversion_factors to share one rates lookup.
+        """
+        pending = getattr(self, '_pending_document', None)
+        if pending is not None:
+            return pending
+        lines = list(self.lines.all()) if self.pk else []
+        if lines:
+            if factors is None:
+                factors, favorite_currency = get_conversion_factors(self.user, {line.currency for line in lines})
+            return self.build_document(lines, factors or {}, favorite_currency)
+        if self.legacy_data:
+            try:
+                return json.loads(self.legacy_data)
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    @property
+    def data(self):
+        """The report document as a JSON string, kept for callers of the former encrypted JSON field."""
+        return json.dumps(self.as_document())
+
+    @data.setter
+    def data(self, value):
+        """Replace the report's lines with the categories of a report document (dict or JSON string) on save."""
+        document = json.loads(value) if isinstance(value, str) else value
+        self._pending_document = document or {}
+
+    def set_totals(self, totals):
+        """Replace the report's lines with native totals {(trans_status, currency, category): minor units} on save."""
+        self._pending_totals = totals
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        document = getattr(self, '_pending_document', None)
+        totals = getattr(self, '_pending_totals', None)
+        if document is not None:
+            totals = self.document_totals(document)
+        if totals is not None:
+            self.replace_lines(totals)
+            self._pending_document = self._pending_totals = None
+
+    def document_totals(self, document):
+        """Native totals of a report document, whose amounts are in its favorite currency."""
+        currency = document.get("favorite_currency") or self.user.favorite_currency or 'USD'
+        totals = {}
+        for status in REPORT_STATUSES:
+            for item in document.get(f"user_{status}_on_range") or []:
+                key = (status, currency, item.get("category") or "Uncategorized")
+                totals[key] = totals.get(key, 0) + to_minor_units(item.get("converted_amount") or 0, currency)
+        return totals
+
+    def build_lines(self, totals):
+        """Unsaved ReportLine rows holding native totals {(trans_status, currency, category): minor units}."""
+        return [
+            ReportLine(
+                report=self,
+                trans_status=trans_status,
+                currency=currency,
+                category_index=self.build_category_index(self.user_id, category),
+                category=category,
+                total_minor=total_minor,
+            )
+            for (trans_status, currency, category), total_minor in totals.items()
+            if trans_status in REPORT_STATUSES and total_minor > 0
+        ]
+
+    def replace_lines(self, totals):
+        self.lines.all().delete()
+        ReportLine.objects.bulk_create(self.build_lines(totals))
+        self.legacy_data = None
+        if self.pk:
+            Reports.objects.filter(pk=self.pk).update(legacy_data=None)
+
     def __str__(self):
         return f"Report of {self.user.username} - {self.month}/{self.year} ({self.created_at.strftime('%Y-%m-%d')})"
 
@@ -18,4 +126,50 @@ class Reports(models.Model):
         db_table = 'finance_management_reports'
         verbose_name = "Report"
         verbose_name_plural = "Reports"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+
+class ReportLine(models.Model):
+    """Total of one category, status and currency within a monthly report, in that currency's minor units."""
+
+    report = models.ForeignKey(Reports, on_delete=models.CASCADE, related_name='lines')
+    trans_status = models.CharField(max_length=8)
+    currency = models.CharField(max_length=4)
+    # Keyed hash of the category, so the encrypted label can be looked up and grouped
+    category_index = models.CharField(max_length=64)
+    category = EncryptedCharField(max_length=100)
+    total_minor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.trans_status} line of report {self.report_id}: {self.total_minor} {self.currency}"
+
+    class Meta:
+        db_table = 'finance_management_reportline'
+        verbose_name = "Report Line"
+        verbose_name_plural = "Report Lines"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['report', 'trans_status', 'category_index', 'currency'],
+                name='unique_report_line_per_category',
+            ),
+        ]
+
+
+class DirtyReportMonth(models.Model):
+    """A month whose report is stale because transactions in it changed; rebuilt once by the report queue."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='dirty_report_months')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Dirty report of {self.user_id} - {self.month}/{self.year}"
+
+    class Meta:
+        db_table = 'finance_management_dirtyreportmonth'
+        verbose_name = "Dirty Report Month"
+        verbose_name_plural = "Dirty Report Months"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year', 'month'], name='unique_dirty_report_month'),
+        ]
@@ -1,4 +1,7 @@
+from django.db.models import Sum
+from django.db.models.functions import Lower, TruncMonth
 from user_reports.models import Reports
+from transaction_management.models import Transactions
 
 
 def get_reports_for_user(*, user):
@@ -9,3 +12,33 @@ def get_reports_for_user(*, user):
 def check_report_exists(*, user, month, year):
     """Check if a report exists for a specific month and year."""
     return Reports.objects.filter(user=user, month=month, year=year).exists()
+
+
+def get_monthly_cash_flow_rows(*, user, start_date, end_date):
+    """
+    Sum a user's transactions per month, currency and status in one GROUP BY.
+    Sums are exact integer minor units, e.g.
+    {'month': date(2024, 1, 1), 'currency': 'USD', 'status': 'deposit', 'total_minor': 15000}.
+    """
+    return (
+        Transactions.objects
+        .filter(user=user, date__gte=start_date, date__lte=end_date)
+        .annotate(month=TruncMonth('date'), status=Lower('trans_status'))
+        .values('month', 'currency', 'status')
+        .annotate(total_minor=Sum('amount_minor'))
+        .order_by('month', 'currency', 'status')
+    )
+
+
+def get_daily_withdraw_rows(*, user, start_date, end_date):
+    """
+    Sum a user's withdrawals per day and currency in one GROUP BY over the (user, date) index.
+    Sums are exact integer minor units, e.g. {'date': date(2024, 1, 5), 'currency': 'USD', 'total_minor': 1250}.
+    """
+    return (
+        Transactions.objects
+        .filter(user=user, date__gte=start_date, date__lte=end_date, trans_status__iexact='withdraw')
+        .values('date', 'currency')
+        .annotate(total_minor=Sum('amount_minor'))
+        .order_by('date', 'currency')
+    )
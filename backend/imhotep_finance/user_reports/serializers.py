@@ -93,6 +93,7 @@ class RecalculateSummarySerializer(serializers.Serializer):
     months_created = serializers.IntegerField()
     months_updated = serializers.IntegerField()
     errors_count = serializers.IntegerField()
+    rows_scanned = serializers.IntegerField()
     date_range = serializers.DictField()
 
 
@@ -105,3 +106,170 @@ class RecalculateReportsResponseSerializer(serializers.Serializer):
         required=False,
         allow_null=True
     )
+
+
+class CashFlowQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField(
+        required=False,
+        allow_null=True,
+        help_text="Start date (YYYY-MM-DD). Defaults to the first day of the month 11 months ago."
+    )
+    end_date = serializers.DateField(
+        required=False,
+        allow_null=True,
+        help_text="End date (YYYY-MM-DD). Defaults to the last day of the current month."
+    )
+
+    def validate(self, data):
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("Start date must be before end date")
+        return data
+
+
+class CashFlowCurrencySerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    deposit = serializers.FloatField()
+    withdraw = serializers.FloatField()
+
+
+class CashFlowMonthSerializer(serializers.Serializer):
+    year = serializers.IntegerField()
+    month = serializers.IntegerField()
+    currencies = CashFlowCurrencySerializer(many=True)
+    total_deposit = serializers.FloatField(help_text="Deposits converted to the favorite currency")
+    total_withdraw = serializers.FloatField(help_text="Withdrawals converted to the favorite currency")
+    net = serializers.FloatField()
+
+
+class CashFlowResponseSerializer(serializers.Serializer):
+    cash_flow = CashFlowMonthSerializer(many=True)
+    total_deposit = serializers.FloatField()
+    total_withdraw = serializers.FloatField()
+    favorite_currency = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+class SpendingHeatmapQuerySerializer(serializers.Serializer):
+    year = serializers.IntegerField(
+        required=False,
+        min_value=1900,
+        max_value=2100,
+        help_text="Year of the heatmap. Defaults to the current year."
+    )
+
+
+class SpendingHeatmapDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    total = serializers.FloatField(help_text="Withdrawals of the day in the favorite currency")
+
+
+class SpendingHeatmapResponseSerializer(serializers.Serializer):
+    year = serializers.IntegerField()
+    days = SpendingHeatmapDaySerializer(many=True, help_text="Days with spending, in date order")
+    total_withdraw = serializers.FloatField()
+    max_daily_withdraw = serializers.FloatField(help_text="Largest daily total, for scaling the heatmap colors")
+    favorite_currency = serializers.CharField()
+
+
+class RangeReportQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField(help_text="First day of the range (YYYY-MM-DD)")
+    end_date = serializers.DateField(help_text="Last day of the range (YYYY-MM-DD), inclusive")
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("Start date must be before end date")
+        return data
+
+
+class RangeReportResponseSerializer(serializers.Serializer):
+    user_withdraw_on_range = CategoryBreakdownSerializer(many=True)
+    user_deposit_on_range = CategoryBreakdownSerializer(many=True)
+    total_withdraw = serializers.DecimalField(max_digits=15, decimal_places=2)
+    total_deposit = serializers.DecimalField(max_digits=15, decimal_places=2)
+    favorite_currency = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+class CategoryTrendsQuerySerializer(CashFlowQuerySerializer):
+    trans_status = serializers.ChoiceField(
+        choices=['deposit', 'withdraw'],
+        default='withdraw',
+        help_text="Status of the transactions to chart. Defaults to withdraw."
+    )
+
+
+class CategoryTrendsResponseSerializer(serializers.Serializer):
+    trans_status = serializers.CharField()
+    months = serializers.ListField(child=serializers.CharField(), help_text="Months of the range (YYYY-MM)")
+    categories = serializers.ListField(child=serializers.CharField(), help_text="Categories, largest total first")
+    totals = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField()),
+        help_text="totals[i][j] is the amount of categories[i] in months[j], in the favorite currency"
+    )
+    shares = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField()),
+        help_text="shares[i][j] is the percentage of months[j]'s total taken by categories[i]"
+    )
+    month_totals = serializers.ListField(child=serializers.FloatField())
+    favorite_currency = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+class ReportComparisonQuerySerializer(serializers.Serializer):
+    comparison = serializers.ChoiceField(
+        choices=['mom', 'yoy'],
+        default='mom',
+        help_text="mom compares a month with the month before; yoy compares with the same period a year earlier."
+    )
+    year = serializers.IntegerField(
+        required=False,
+        min_value=1900,
+        max_value=2100,
+        help_text="Year of the current period. Defaults to the current year."
+    )
+    month = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=12,
+        help_text="Month of the current period. Defaults to the current month for mom; omit it for a whole-year yoy."
+    )
+
+
+class ComparisonPeriodSerializer(serializers.Serializer):
+    label = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+class CategoryComparisonSerializer(serializers.Serializer):
+    category = serializers.CharField()
+    current = serializers.FloatField()
+    previous = serializers.FloatField()
+    delta = serializers.FloatField()
+    percent_change = serializers.FloatField(allow_null=True, help_text="Null when the previous amount is zero")
+
+
+class StatusComparisonSerializer(serializers.Serializer):
+    total_current = serializers.FloatField()
+    total_previous = serializers.FloatField()
+    delta = serializers.FloatField()
+    percent_change = serializers.FloatField(allow_null=True)
+    categories = CategoryComparisonSerializer(many=True)
+    top_movers = serializers.ListField(
+        child=serializers.CharField(),
+        help_text="Categories with the largest absolute change, largest first"
+    )
+
+
+class ReportComparisonResponseSerializer(serializers.Serializer):
+    comparison = serializers.CharField()
+    current_period = ComparisonPeriodSerializer()
+    previous_period = ComparisonPeriodSerializer()
+    favorite_currency = serializers.CharField()
+    withdraw = StatusComparisonSerializer()
+    deposit = StatusComparisonSerializer()
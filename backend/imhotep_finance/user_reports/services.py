@@ -1,11 +1,18 @@
 from django.core.exceptions import ValidationError
-from user_reports.models import Reports
+from django.core.cache import cache
+from django.db import transaction
+from user_reports.models import Reports, ReportLine
 from datetime import date
 import calendar
-import json
-from transaction_management.models import Transactions
-from .utils.calculate_user_report import calculate_user_report
-from .utils.save_user_report import save_user_report
+from .utils.calculate_user_report import calculate_ledger_monthly_totals, calculate_monthly_totals, calculate_user_report
+from .utils.report_totals import convert_totals
+from .utils.report_queue import discard_dirty_report_months, rebuild_report_month, refresh_dirty_report_months
+from finance_management.utils.ledger_version import bump_ledger_version, ledger_cache_key
+from finance_management.utils.ledger_stats import get_ledger_stats, months_in_bitmap, rebuild_ledger_stats
+from finance_management.utils.currencies import get_conversion_factors, get_fav_currency
+from finance_management.utils.minor_units import from_minor_units, to_minor_units
+from finance_management.utils.ledger_archive import get_archived_date_bounds, read_archived_transactions
+from .selectors import get_monthly_cash_flow_rows, get_daily_withdraw_rows
 
 def get_report_history_months_for_user(*, user):
     """Get available report months/years for a user."""
@@ -13,12 +20,11 @@ def get_report_history_months_for_user(*, user):
     if not user:
         raise ValidationError("User must be authenticated!")
     
-    # Use distinct on specific fields for better performance
-    report_history = Reports.objects.filter(
-        user=user
-    ).values('month', 'year').distinct().order_by('-year', '-month')
+    # Answered from the report month bitmap in the user's ledger stats; queued months may add reports
+    refresh_dirty_report_months(user=user)
+    stats = get_ledger_stats(user)
     
-    return list(report_history)
+    return [{'month': month, 'year': year} for year, month in months_in_bitmap(stats.report_months)]
 
 
 def get_monthly_report_for_user(*, user, month, year):
@@ -39,52 +45,24 @@ def get_monthly_report_for_user(*, user, month, year):
     if month < 1 or month > 12:
         raise ValidationError("Month must be between 1 and 12")
     
-    # Get report from database
+    # Get report from database, rebuilding it first if writes left it stale
+    refresh_dirty_report_months(user=user, year=year, month=month)
     user_report = Reports.objects.filter(user=user, month=month, year=year).first()
     
     if not user_report:
         raise ValidationError("No report found for the specified month and year")
     
-    # Calculate and save report data if it doesn't exist or is empty
-    if not user_report.data or user_report.data.strip() in ['{}', '']:
+    # Rebuild the report from the ledger if it has no data
+    report_data = user_report.as_document()
+    if not report_data:
         try:
-            # Create date objects for the first and last day of the month
-            start_date = date(year, month, 1)
-            last_day = calendar.monthrange(year, month)[1]
-            end_date = date(year, month, last_day)
-            
-            # Calculate report data
-            user_withdraw_on_range, user_deposit_on_range, total_withdraw, total_deposit = calculate_user_report(start_date, end_date, user)
-            
-            # Format the response data
-            month_name = calendar.month_name[month]
-            response_data = {
-                "user_withdraw_on_range": user_withdraw_on_range,
-                "user_deposit_on_range": user_deposit_on_range,
-                "total_withdraw": float(total_withdraw) if total_withdraw is not None else 0.0,
-                "total_deposit": float(total_deposit) if total_deposit is not None else 0.0,
-                "current_month": f"{month_name} {year}",
-                "favorite_currency": user.favorite_currency or 'USD'
-            }
-            
-            # Save the report
-            success, result = save_user_report(user, start_date, response_data)
-            if not success:
-                raise ValidationError(f"Error saving report: {result}")
-            
-            # Refresh the report from database
-            user_report.refresh_from_db()
+            user_report = rebuild_report_month(user, year, month) or user_report
+            report_data = user_report.as_document() or user_report.build_document(
+                [], {}, user.favorite_currency or 'USD'
+            )
         except Exception as e:
             raise ValidationError(f"Error calculating report: {str(e)}")
     
-    # Parse encrypted data if it's a string (EncryptedTextField returns decrypted string)
-    report_data = user_report.data
-    if isinstance(report_data, str):
-        try:
-            report_data = json.loads(report_data)
-        except json.JSONDecodeError:
-            raise ValidationError("Error parsing report data")
-    
     # Sort the data by percentage in descending order
     if isinstance(report_data, dict):
         if 'user_deposit_on_range' in report_data and isinstance(report_data['user_deposit_on_range'], list):
@@ -114,12 +92,11 @@ def get_report_history_years_for_user(*, user):
     if not user:
         raise ValidationError("User must be authenticated!")
     
-    # Get distinct years from user reports
-    report_history = Reports.objects.filter(
-        user=user
-    ).values('year').distinct().order_by('-year')
+    # Answered from the report month bitmap in the user's ledger stats; queued months may add reports
+    refresh_dirty_report_months(user=user)
+    stats = get_ledger_stats(user)
     
-    return [item['year'] for item in report_history]
+    return sorted((int(year) for year, mask in stats.report_months.items() if mask), reverse=True)
 
 
 def get_yearly_report_for_user(*, user, year=None):
@@ -140,7 +117,8 @@ def get_yearly_report_for_user(*, user, year=None):
         year = now.year
     
     # Get all monthly reports for the specified year
-    monthly_reports = Reports.objects.filter(user=user, year=year).order_by('month')
+    refresh_dirty_report_months(user=user, year=year)
+    monthly_reports = Reports.objects.filter(user=user, year=year).order_by('month').prefetch_related('lines')
     
     if not monthly_reports.exists():
         raise ValidationError(f"No reports found for year {year}")
@@ -151,15 +129,14 @@ def get_yearly_report_for_user(*, user, year=None):
     withdraw_categories = {}
     deposit_categories = {}
     
+    # One rates lookup projects every month's native totals into the favorite currency
+    factors, _ = get_conversion_factors(
+        user, {line.currency for monthly_report in monthly_reports for line in monthly_report.lines.all()}
+    )
+    factors = factors or {}
+
     for monthly_report in monthly_reports:
-        data = monthly_report.data
-        
-        # Parse encrypted data if it's a string (EncryptedTextField returns decrypted string)
-        if isinstance(data, str):
-            try:
-                data = json.loads(data)
-            except json.JSONDecodeError:
-                continue  # Skip this report if data can't be parsed
+        data = monthly_report.as_document(factors=factors, favorite_currency=user.favorite_currency or 'USD')
         
         # Add to yearly totals
         total_withdraw += data.get('total_withdraw', 0)
@@ -213,117 +190,112 @@ def get_yearly_report_for_user(*, user, year=None):
 
 
 def recalculate_all_reports_for_user(*, user):
-    """Recalculate all monthly reports for a user from first to last transaction."""
+    """
+    Recalculate all monthly reports for a user from first to last transaction.
+    The ledger itself (not the rollups) is read once and every report is written in bulk at the end.
+    """
     
     if not user:
         raise ValidationError("User must be authenticated!")
     
-    # Get the date range of all user transactions
-    transaction_dates = Transactions.objects.filter(user=user).values_list('date', flat=True).order_by('date')
+    # Get the date range of all user transactions, archived years included
+    stats = get_ledger_stats(user)
+    archived_first, archived_last = get_archived_date_bounds(user)
+    first_dates = [d for d in (stats.first_date, archived_first) if d]
+    last_dates = [d for d in (stats.last_date, archived_last) if d]
     
-    if not transaction_dates:
+    if not first_dates:
         return {
             'message': 'No transactions found for this user',
             'summary': {
                 'total_months_processed': 0,
                 'months_created': 0,
                 'months_updated': 0,
-                'errors_count': 0
+                'errors_count': 0,
+                'rows_scanned': 0
             }
         }
     
-    first_date = transaction_dates.first()
-    last_date = transaction_dates.last()
-    
-    # Generate all months between first and last transaction
-    current_date = date(first_date.year, first_date.month, 1)
-    end_date = date(last_date.year, last_date.month, 1)
-    
+    first_date = min(first_dates)
+    last_date = max(last_dates)
+    
+    # One pass over the ledger accumulates every month; reports are then written in bulk.
+    # Every month is rebuilt, so nothing queued needs refreshing afterwards.
+    discard_dirty_report_months(user)
+    scanned = {}
+    monthly_totals = calculate_ledger_monthly_totals(first_date, last_date, user, counter=scanned)
+    factors, _ = get_conversion_factors(
+        user, {currency for totals in monthly_totals.values() for _, currency, _ in totals}
+    )
+    factors = factors or {}
+
+    existing_reports = {}
+    for report in Reports.objects.filter(user=user, year__gte=first_date.year, year__lte=last_date.year).order_by('created_at'):
+        existing_reports.setdefault((report.year, report.month), report)
+
     processed_months = []
-    total_created = 0
-    total_updated = 0
+    reports_to_create = []
+    reports_to_update = []
+    report_totals = []
     errors = []
-    
+
+    current_date = date(first_date.year, first_date.month, 1)
+    end_date = date(last_date.year, last_date.month, 1)
     while current_date <= end_date:
-        try:
-            # Calculate first and last day of current month
-            first_day = current_date
-            last_day_of_month = calendar.monthrange(current_date.year, current_date.month)[1]
-            last_day = date(current_date.year, current_date.month, last_day_of_month)
-            
-            # Calculate report data for this month - FIXED: only 3 arguments
-            (
-                user_withdraw_on_range,
-                user_deposit_on_range,
-                total_withdraw,
-                total_deposit,
-            ) = calculate_user_report(first_day, last_day, user)  # Removed None argument
-            
-            # Prepare response data structure
-            month_name = calendar.month_name[current_date.month]
-            response_data = {
-                "user_withdraw_on_range": [
-                    {
-                        "category": item['category'],
-                        "converted_amount": float(item['converted_amount']),
-                        "percentage": float(item.get('percentage', 0))
-                    }
-                    for item in user_withdraw_on_range
-                ],
-                "user_deposit_on_range": [
-                    {
-                        "category": item['category'],
-                        "converted_amount": float(item['converted_amount']),
-                        "percentage": float(item.get('percentage', 0))
-                    }
-                    for item in user_deposit_on_range
-                ],
-                "total_withdraw": float(total_withdraw) if total_withdraw is not None else 0.0,
-                "total_deposit": float(total_deposit) if total_deposit is not None else 0.0,
-                "current_month": f"{month_name} {current_date.year}",
-                "favorite_currency": user.favorite_currency or 'USD',
-                "start_date": first_day.isoformat(),
-                "end_date": last_day.isoformat()
-            }
-            
-            # Save the report for this month
-            success, result = save_user_report(user, first_day, response_data)
-            
-            if success:
-                if result == "created":
-                    total_created += 1
-                    status_text = 'created'
-                else:
-                    total_updated += 1
-                    status_text = 'updated'
-                
-                processed_months.append({
-                    'month': current_date.month,
-                    'year': current_date.year,
-                    'month_name': f"{month_name} {current_date.year}",
-                    'total_transactions': len(user_withdraw_on_range) + len(user_deposit_on_range),
-                    'total_withdraw': float(total_withdraw) if total_withdraw else 0.0,
-                    'total_deposit': float(total_deposit) if total_deposit else 0.0,
-                    'status': status_text
-                })
-            else:
-                errors.append({
-                    'month': f"{month_name} {current_date.year}",
-                    'error': result
-                })
-            
-        except Exception as month_error:
-            print(f"Error processing {calendar.month_name[current_date.month]} {current_date.year}: {str(month_error)}")
-            errors.append({
-                'month': f"{calendar.month_name[current_date.month]} {current_date.year}",
-                'error': str(month_error)
-            })
-        
+        period = (current_date.year, current_date.month)
+        totals = monthly_totals.get(period, {})
+        user_withdraw_on_range, user_deposit_on_range, total_withdraw, total_deposit = convert_totals(totals, factors)
+        month_name = calendar.month_name[current_date.month]
+
+        report = existing_reports.get(period)
+        if report:
+            report.legacy_data = None
+            reports_to_update.append(report)
+            status_text = 'updated'
+        else:
+            report = Reports(user=user, month=current_date.month, year=current_date.year)
+            reports_to_create.append(report)
+            status_text = 'created'
+        report_totals.append((report, totals))
+
+        processed_months.append({
+            'month': current_date.month,
+            'year': current_date.year,
+            'month_name': f"{month_name} {current_date.year}",
+            'total_transactions': len(user_withdraw_on_range) + len(user_deposit_on_range),
+            'total_withdraw': float(total_withdraw) if total_withdraw else 0.0,
+            'total_deposit': float(total_deposit) if total_deposit else 0.0,
+            'status': status_text
+        })
+
         # Move to next month
         if current_date.month == 12:
             current_date = date(current_date.year + 1, 1, 1)
         else:
             current_date = date(current_date.year, current_date.month + 1, 1)
+
+    try:
+        with transaction.atomic():
+            Reports.objects.bulk_create(reports_to_create, batch_size=500)
+            # Not bulk_update: its CASE expression would be encrypted as text by the encrypted field
+            Reports.objects.filter(pk__in=[report.pk for report in reports_to_update]).update(legacy_data=None)
+            ReportLine.objects.filter(report__in=reports_to_update).delete()
+            ReportLine.objects.bulk_create(
+                [line for report, totals in report_totals for line in report.build_lines(totals)],
+                batch_size=1000
+            )
+            # The bulk writes skip the report signals: flag the new months and invalidate cached reads here
+            rebuild_ledger_stats(user)
+            bump_ledger_version(user)
+    except Exception as e:
+        print(f"Error saving recalculated reports: {str(e)}")
+        errors.append({'month': 'all', 'error': str(e)})
+        processed_months = []
+        reports_to_create = []
+        reports_to_update = []
+
+    total_created = len(reports_to_create)
+    total_updated = len(reports_to_update)
     
     return {
         'message': 'Report recalculation completed',
@@ -332,6 +304,7 @@ def recalculate_all_reports_for_user(*, user):
             'months_created': total_created,
             'months_updated': total_updated,
             'errors_count': len(errors),
+            'rows_scanned': scanned.get('rows', 0),
             'date_range': {
                 'from': f"{calendar.month_name[first_date.month]} {first_date.year}",
                 'to': f"{calendar.month_name[last_date.month]} {last_date.year}"
@@ -340,3 +313,346 @@ def recalculate_all_reports_for_user(*, user):
         'processed_months': processed_months,
         'errors': errors if errors else None
     }
+
+
+def get_cash_flow_for_user(*, user, start_date=None, end_date=None):
+    """
+    Get monthly deposit and withdraw sums per currency for a date range,
+    plus their totals converted to the user's favorite currency.
+    Defaults to the last 12 months, current month included.
+    """
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    today = date.today()
+    if not end_date:
+        end_date = date(today.year, today.month, calendar.monthrange(today.year, today.month)[1])
+    if not start_date:
+        year, month = (end_date.year, end_date.month - 11) if end_date.month > 11 else (end_date.year - 1, end_date.month + 1)
+        start_date = date(year, month, 1)
+    
+    if start_date > end_date:
+        raise ValidationError("Start date must be before end date")
+    
+    # One GROUP BY over the (user, date) index
+    rows = list(get_monthly_cash_flow_rows(user=user, start_date=start_date, end_date=end_date))
+    
+    # Closed years may live in the ledger archive
+    rows.extend(
+        {
+            'month': trans['date'].replace(day=1),
+            'currency': trans['currency'],
+            'status': trans['trans_status'].lower(),
+            'total_minor': to_minor_units(trans['amount'], trans['currency']),
+        }
+        for trans in read_archived_transactions(user, start_date, end_date)
+    )
+    
+    # Convert every currency with a single rates lookup
+    factors, favorite_currency = get_conversion_factors(user, {row['currency'] for row in rows})
+    if factors is False:
+        raise ValidationError("Currency conversion failed. Exchange rates are unavailable.")
+    
+    # Start with every month of the range so charts get a continuous series
+    months = {}
+    current = date(start_date.year, start_date.month, 1)
+    while current <= end_date:
+        months[(current.year, current.month)] = {
+            "year": current.year,
+            "month": current.month,
+            "currencies": {},
+            "total_deposit": 0.0,
+            "total_withdraw": 0.0,
+        }
+        current = date(current.year + 1, 1, 1) if current.month == 12 else date(current.year, current.month + 1, 1)
+    
+    for row in rows:
+        if row['status'] not in ("deposit", "withdraw"):
+            continue
+        month_data = months[(row['month'].year, row['month'].month)]
+        currency_data = month_data["currencies"].setdefault(
+            row['currency'], {"currency": row['currency'], "deposit": 0.0, "withdraw": 0.0}
+        )
+        total = from_minor_units(row['total_minor'], row['currency'])
+        currency_data[row['status']] += total
+        if row['currency'] in factors:
+            month_data[f"total_{row['status']}"] += total * factors[row['currency']]
+    
+    cash_flow = []
+    total_deposit = 0.0
+    total_withdraw = 0.0
+    for month_data in months.values():
+        total_deposit += month_data["total_deposit"]
+        total_withdraw += month_data["total_withdraw"]
+        month_data["currencies"] = [
+            {**item, "deposit": round(item["deposit"], 2), "withdraw": round(item["withdraw"], 2)}
+            for item in month_data["currencies"].values()
+        ]
+        month_data["net"] = round(month_data["total_deposit"] - month_data["total_withdraw"], 2)
+        month_data["total_deposit"] = round(month_data["total_deposit"], 2)
+        month_data["total_withdraw"] = round(month_data["total_withdraw"], 2)
+        cash_flow.append(month_data)
+    
+    return {
+        "cash_flow": cash_flow,
+        "total_deposit": round(total_deposit, 2),
+        "total_withdraw": round(total_withdraw, 2),
+        "favorite_currency": get_fav_currency(user),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+
+
+def get_range_report_for_user(*, user, start_date, end_date):
+    """
+    Get a report for an arbitrary date range, e.g. a quarter, a fiscal year or the last 90 days.
+    Whole months come from the ledger rollups and only the partial months at the edges are scanned;
+    currencies without an exchange rate count as zero, as in the monthly reports.
+    """
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    if not start_date or not end_date:
+        raise ValidationError("Start date and end date are required")
+    
+    if start_date > end_date:
+        raise ValidationError("Start date must be before end date")
+    
+    withdraws, deposits, total_withdraw, total_deposit = calculate_user_report(start_date, end_date, user)
+    
+    return {
+        "user_withdraw_on_range": withdraws,
+        "user_deposit_on_range": deposits,
+        "total_withdraw": total_withdraw,
+        "total_deposit": total_deposit,
+        "favorite_currency": get_fav_currency(user),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+
+
+def get_category_trends_for_user(*, user, start_date=None, end_date=None, trans_status="withdraw"):
+    """
+    Get the monthly series of every category of one status, in the favorite currency.
+    The series are parallel arrays: totals[i][j] and shares[i][j] belong to categories[i]
+    in months[j]. Computed from one scan of the ledger rollups; defaults to the last 12 months.
+    """
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    if trans_status not in ("deposit", "withdraw"):
+        raise ValidationError("Status must be deposit or withdraw")
+    
+    today = date.today()
+    if not end_date:
+        end_date = date(today.year, today.month, calendar.monthrange(today.year, today.month)[1])
+    if not start_date:
+        year, month = (end_date.year, end_date.month - 11) if end_date.month > 11 else (end_date.year - 1, end_date.month + 1)
+        start_date = date(year, month, 1)
+    
+    if start_date > end_date:
+        raise ValidationError("Start date must be before end date")
+    
+    monthly_totals = calculate_monthly_totals(start_date, end_date, user)
+    
+    # Convert every currency with a single rates lookup
+    factors, favorite_currency = get_conversion_factors(
+        user, {currency for totals in monthly_totals.values() for _, currency, _ in totals}
+    )
+    if factors is False:
+        raise ValidationError("Currency conversion failed. Exchange rates are unavailable.")
+    factors = factors or {}
+    
+    # Every month of the range, so the series stay aligned
+    months = []
+    current = date(start_date.year, start_date.month, 1)
+    while current <= end_date:
+        months.append((current.year, current.month))
+        current = date(current.year + 1, 1, 1) if current.month == 12 else date(current.year, current.month + 1, 1)
+    
+    series = {}
+    month_totals = [0.0] * len(months)
+    for index, period in enumerate(months):
+        for (status, currency, category), total_minor in monthly_totals.get(period, {}).items():
+            if status != trans_status:
+                continue
+            amount = from_minor_units(total_minor, currency) * factors.get(currency, 0.0)
+            series.setdefault(category, [0.0] * len(months))[index] += amount
+            month_totals[index] += amount
+    
+    # Largest categories over the whole range first
+    categories = sorted(series, key=lambda category: sum(series[category]), reverse=True)
+    
+    return {
+        "trans_status": trans_status,
+        "months": [f"{year}-{month:02d}" for year, month in months],
+        "categories": categories,
+        "totals": [[round(amount, 2) for amount in series[category]] for category in categories],
+        "shares": [
+            [round((amount / month_total) * 100, 1) if month_total > 0 else 0 for amount, month_total in zip(series[category], month_totals)]
+            for category in categories
+        ],
+        "month_totals": [round(total, 2) for total in month_totals],
+        "favorite_currency": get_fav_currency(user),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+
+
+COMPARISON_CACHE_SECONDS = 60 * 60 * 24
+TOP_MOVERS = 5
+
+
+def _comparison_periods(comparison, year, month):
+    """(label, start_date, end_date) of the current and the previous period of a comparison."""
+    def month_period(year, month):
+        return f"{calendar.month_name[month]} {year}", date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    
+    if comparison == "mom":
+        previous = (year - 1, 12) if month == 1 else (year, month - 1)
+        return month_period(year, month), month_period(*previous)
+    if month:
+        return month_period(year, month), month_period(year - 1, month)
+    return (
+        (f"Year {year}", date(year, 1, 1), date(year, 12, 31)),
+        (f"Year {year - 1}", date(year - 1, 1, 1), date(year - 1, 12, 31)),
+    )
+
+
+def _percent_change(current, previous):
+    return round(((current - previous) / previous) * 100, 1) if previous > 0 else None
+
+
+def get_report_comparison_for_user(*, user, comparison="mom", year=None, month=None):
+    """
+    Compare two periods category by category: month over month ("mom") or year over year ("yoy").
+    "mom" compares a month (default: the current one) with the month before; "yoy" compares a month
+    with the same month a year earlier, or a whole year with the previous one when no month is given.
+    Both periods come from one scan of the ledger rollups; the result is cached against the ledger version.
+    """
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    if comparison not in ("mom", "yoy"):
+        raise ValidationError("Comparison must be mom or yoy")
+    
+    today = date.today()
+    year = year or today.year
+    if comparison == "mom":
+        month = month or today.month
+    if month and not 1 <= month <= 12:
+        raise ValidationError("Month must be between 1 and 12")
+    
+    key = ledger_cache_key(user, "report_comparison", comparison, year, month or "")
+    result = cache.get(key)
+    if result is not None:
+        return result
+    
+    current, previous = _comparison_periods(comparison, year, month)
+    
+    # One rollup scan spans both periods; each month is then routed to its period
+    periods = {}
+    for (period_year, period_month), totals in calculate_monthly_totals(previous[1], current[2], user).items():
+        for label, start_date, end_date in (current, previous):
+            if start_date <= date(period_year, period_month, 1) <= end_date:
+                period_totals = periods.setdefault(label, {})
+                for total_key, total_minor in totals.items():
+                    period_totals[total_key] = period_totals.get(total_key, 0) + total_minor
+    
+    # Convert every currency with a single rates lookup
+    factors, favorite_currency = get_conversion_factors(
+        user, {currency for totals in periods.values() for _, currency, _ in totals}
+    )
+    if factors is False:
+        raise ValidationError("Currency conversion failed. Exchange rates are unavailable.")
+    factors = factors or {}
+    
+    # status -> category -> [current, previous] in the favorite currency
+    amounts = {"withdraw": {}, "deposit": {}}
+    for index, (label, _, _) in enumerate((current, previous)):
+        for (trans_status, currency, category), total_minor in periods.get(label, {}).items():
+            if trans_status not in amounts:
+                continue
+            pair = amounts[trans_status].setdefault(category, [0.0, 0.0])
+            pair[index] += from_minor_units(total_minor, currency) * factors.get(currency, 0.0)
+    
+    result = {
+        "comparison": comparison,
+        "current_period": {"label": current[0], "start_date": current[1].isoformat(), "end_date": current[2].isoformat()},
+        "previous_period": {"label": previous[0], "start_date": previous[1].isoformat(), "end_date": previous[2].isoformat()},
+        "favorite_currency": favorite_currency,
+    }
+    for trans_status, categories in amounts.items():
+        items = [
+            {
+                "category": category,
+                "current": round(current_amount, 2),
+                "previous": round(previous_amount, 2),
+                "delta": round(current_amount - previous_amount, 2),
+                "percent_change": _percent_change(current_amount, previous_amount),
+            }
+            for category, (current_amount, previous_amount) in categories.items()
+        ]
+        items.sort(key=lambda item: item["current"], reverse=True)
+        total_current = sum(current_amount for current_amount, _ in categories.values())
+        total_previous = sum(previous_amount for _, previous_amount in categories.values())
+        movers = sorted((item for item in items if item["delta"]), key=lambda item: abs(item["delta"]), reverse=True)
+        result[trans_status] = {
+            "total_current": round(total_current, 2),
+            "total_previous": round(total_previous, 2),
+            "delta": round(total_current - total_previous, 2),
+            "percent_change": _percent_change(total_current, total_previous),
+            "categories": items,
+            "top_movers": [item["category"] for item in movers[:TOP_MOVERS]],
+        }
+    
+    cache.set(key, result, COMPARISON_CACHE_SECONDS)
+    return result
+
+
+def get_spending_heatmap_for_user(*, user, year=None):
+    """
+    Get per-day withdraw totals in the user's favorite currency for one year.
+    Only days with spending are listed. Defaults to the current year.
+    """
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    year = year or date.today().year
+    start_date, end_date = date(year, 1, 1), date(year, 12, 31)
+    
+    # (date, currency) -> native amount
+    daily_totals = {}
+    for row in get_daily_withdraw_rows(user=user, start_date=start_date, end_date=end_date):
+        daily_totals[(row['date'], row['currency'])] = from_minor_units(row['total_minor'], row['currency'])
+    
+    # Closed years may live in the ledger archive
+    for trans in read_archived_transactions(user, start_date, end_date):
+        if trans['trans_status'].lower() == 'withdraw':
+            key = (trans['date'], trans['currency'])
+            daily_totals[key] = daily_totals.get(key, 0.0) + float(trans['amount'])
+    
+    # Convert every currency with a single rates lookup
+    factors, favorite_currency = get_conversion_factors(user, {currency for _, currency in daily_totals})
+    if factors is False:
+        raise ValidationError("Currency conversion failed. Exchange rates are unavailable.")
+    
+    days = {}
+    for (day, currency), amount in daily_totals.items():
+        if currency in factors:
+            days[day] = days.get(day, 0.0) + amount * factors[currency]
+    
+    heatmap = [{"date": day.isoformat(), "total": round(total, 2)} for day, total in sorted(days.items())]
+    
+    return {
+        "year": year,
+        "days": heatmap,
+        "total_withdraw": round(sum(days.values()), 2),
+        "max_daily_withdraw": max((day["total"] for day in heatmap), default=0.0),
+        "favorite_currency": favorite_currency,
+    }
@@ -1,5 +1,6 @@
 from django.test import TestCase
 from django.urls import reverse
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -170,3 +171,200 @@ class RecalculateReportsApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('summary', response.data)
         self.assertGreaterEqual(response.data['summary']['total_months_processed'], 1)
+
+    def test_history_lists_recalculated_months(self):
+        """Test months written by a recalculation show up in the history and invalidate its ETag"""
+        for transaction_date in (date(2024, 1, 15), date(2024, 3, 2)):
+            create_transaction(
+                user=self.user,
+                amount=1000,
+                currency='USD',
+                trans_status='deposit',
+                category='Salary',
+                trans_details='',
+                transaction_date=transaction_date
+            )
+        history_url = reverse('report_history_months')
+        # The first read rebuilds the queued months; the second one carries a settled ETag
+        self.client.get(history_url)
+        etag = self.client.get(history_url)['ETag']
+        self.assertEqual(self.client.get(history_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(self.url)
+        response = self.client.get(history_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['report_history_months'],
+            [{'month': 3, 'year': 2024}, {'month': 2, 'year': 2024}, {'month': 1, 'year': 2024}]
+        )
+
+
+class CashFlowApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('cash_flow')
+
+        create_transaction(
+            user=self.user,
+            amount=500,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='Test',
+            transaction_date=date(2024, 2, 10)
+        )
+
+    def test_get_cash_flow(self):
+        """Test getting the monthly cash flow via API"""
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-02-29'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['cash_flow']), 2)
+        self.assertEqual(response.data['cash_flow'][1]['total_deposit'], 500.0)
+        self.assertEqual(response.data['cash_flow'][1]['net'], 500.0)
+
+    def test_get_cash_flow_invalid_range(self):
+        """Test an inverted date range returns 400"""
+        response = self.client.get(self.url, {'start_date': '2024-03-01', 'end_date': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SpendingHeatmapApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('spending_heatmap')
+
+        for trans_status, amount in (('deposit', 500), ('withdraw', 45)):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category='Food',
+                trans_details='Test',
+                transaction_date=date(2024, 2, 10)
+            )
+
+    def test_get_spending_heatmap(self):
+        """Test getting the daily spending heatmap via API"""
+        response = self.client.get(self.url, {'year': 2024})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days'], [{'date': '2024-02-10', 'total': 45.0}])
+
+    def test_get_spending_heatmap_invalid_year(self):
+        """Test an invalid year returns 400"""
+        response = self.client.get(self.url, {'year': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RangeReportApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('range_report')
+
+        for trans_status, amount, transaction_date in (
+            ('deposit', 500, date(2024, 1, 10)),
+            ('withdraw', 45, date(2024, 2, 10)),
+            ('withdraw', 20, date(2024, 3, 20)),
+        ):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category='Food',
+                trans_details='Test',
+                transaction_date=transaction_date
+            )
+
+    def test_get_range_report(self):
+        """Test getting a custom range report via API"""
+        response = self.client.get(self.url, {'start_date': '2024-01-15', 'end_date': '2024-03-15'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_withdraw'], 45.0)
+        self.assertEqual(response.data['total_deposit'], 0.0)
+
+    def test_get_range_report_missing_dates(self):
+        """Test a missing end date returns 400"""
+        response = self.client.get(self.url, {'start_date': '2024-01-15'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CategoryTrendsApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('category_trends')
+
+        for trans_status, amount, transaction_date in (
+            ('deposit', 500, date(2024, 1, 10)),
+            ('withdraw', 45, date(2024, 2, 10)),
+        ):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category='Food',
+                trans_details='Test',
+                transaction_date=transaction_date
+            )
+
+    def test_get_category_trends(self):
+        """Test getting the category series via API"""
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-02-29'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['months'], ['2024-01', '2024-02'])
+        self.assertEqual(response.data['totals'], [[0.0, 45.0]])
+
+    def test_get_category_trends_invalid_status(self):
+        """Test an unknown status returns 400"""
+        response = self.client.get(self.url, {'trans_status': 'transfer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReportComparisonApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('report_comparison')
+
+        for trans_status, amount, transaction_date in (
+            ('deposit', 500, date(2024, 1, 10)),
+            ('withdraw', 45, date(2024, 2, 10)),
+        ):
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category='Food',
+                trans_details='Test',
+                transaction_date=transaction_date
+            )
+
+    def test_get_report_comparison(self):
+        """Test comparing a month with the previous one via API"""
+        response = self.client.get(self.url, {'comparison': 'mom', 'year': 2024, 'month': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['withdraw']['delta'], 45.0)
+        self.assertEqual(response.data['deposit']['delta'], -500.0)
+
+    def test_get_report_comparison_invalid(self):
+        """Test an unknown comparison returns 400"""
+        response = self.client.get(self.url, {'comparison': 'wow'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,5 +1,6 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from datetime import date
 import json
@@ -8,11 +9,26 @@ from user_reports.services import (
     get_monthly_report_for_user,
     get_report_history_years_for_user,
     get_yearly_report_for_user,
-    recalculate_all_reports_for_user
+    recalculate_all_reports_for_user,
+    get_cash_flow_for_user,
+    get_spending_heatmap_for_user,
+    get_range_report_for_user,
+    get_category_trends_for_user,
+    get_report_comparison_for_user
 )
-from user_reports.models import Reports
-from transaction_management.services import create_transaction
+from user_reports.models import Reports, ReportLine, DirtyReportMonth
+from user_reports.utils.report_queue import refresh_dirty_report_months
+from transaction_management.services import create_transaction, delete_transaction
 from transaction_management.models import NetWorth
+from user_reports.utils.calculate_user_report import calculate_user_report
+from finance_management.utils import currencies
+from finance_management.utils.ledger_archive import archive_user_year
+from finance_management.models import LedgerRollup
+from unittest.mock import patch
+from django.core.management import call_command
+from io import StringIO
+import os
+import tempfile
 
 User = get_user_model()
 
@@ -157,3 +173,547 @@ class RecalculateAllReportsTest(TestCase):
         
         self.assertTrue(result['summary']['total_months_processed'] >= 1)
         self.assertIn('processed_months', result)
+
+    def test_recalculate_rebuilds_every_month_in_one_pass(self):
+        """Test stale reports are rewritten, gaps are filled and rates are read once"""
+        for amount, trans_status, category, transaction_date in [
+            (1000, 'deposit', 'Salary', date(2024, 1, 15)),
+            (40, 'withdraw', 'Food', date(2024, 1, 20)),
+            (25, 'withdraw', 'Food', date(2024, 3, 2)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category=category,
+                trans_details='',
+                transaction_date=transaction_date
+            )
+        refresh_dirty_report_months(user=self.user)
+        ReportLine.objects.filter(report__month=1, trans_status='withdraw').update(total_minor=99900)
+
+        with patch.object(currencies, 'get_or_update_rates', wraps=currencies.get_or_update_rates) as get_rates:
+            result = recalculate_all_reports_for_user(user=self.user)
+
+        self.assertEqual(get_rates.call_count, 1)
+        self.assertEqual(result['summary']['months_created'], 1)
+        self.assertEqual(result['summary']['months_updated'], 2)
+        january = json.loads(Reports.objects.get(user=self.user, month=1, year=2024).data)
+        self.assertEqual(january['total_withdraw'], 40)
+        self.assertEqual(json.loads(Reports.objects.get(user=self.user, month=2, year=2024).data), {})
+        march = Reports.objects.get(user=self.user, month=3, year=2024)
+        self.assertEqual(march.as_document()['user_withdraw_on_range'][0]['converted_amount'], 25)
+
+
+    def test_recalculate_clears_legacy_documents(self):
+        """Test a report stored as a legacy document reads back from its new lines"""
+        create_transaction(
+            user=self.user,
+            amount=1000,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 15)
+        )
+        refresh_dirty_report_months(user=self.user)
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        report.lines.all().delete()
+        Reports.objects.filter(pk=report.pk).update(legacy_data=json.dumps({'total_deposit': 5}))
+
+        recalculate_all_reports_for_user(user=self.user)
+
+        report = Reports.objects.get(pk=report.pk)
+        self.assertIsNone(report.legacy_data)
+        self.assertEqual(json.loads(report.data)['total_deposit'], 1000)
+        self.assertEqual(json.loads(report.data)['user_deposit_on_range'][0]['category'], 'Salary')
+
+    def test_recalculate_reads_the_ledger_not_the_rollups(self):
+        """Test a recalculation repairs reports even when the monthly rollups have drifted"""
+        create_transaction(
+            user=self.user,
+            amount=1000,
+            currency='USD',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 15)
+        )
+        LedgerRollup.objects.filter(user=self.user).update(total_minor=1)
+
+        recalculate_all_reports_for_user(user=self.user)
+
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        self.assertEqual(json.loads(report.data)['total_deposit'], 1000)
+
+
+class RebuildReportsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, trans_status in [(100, 'deposit'), (50, 'withdraw')]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category='Food',
+                trans_details='',
+                transaction_date=date(2024, 1, 15)
+            )
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'rebuild.checkpoint')
+
+    def test_rebuild_and_resume_from_checkpoint(self):
+        """Test reports are rebuilt and users in the checkpoint are skipped on the next run"""
+        refresh_dirty_report_months(user=self.user)
+        ReportLine.objects.filter(report__user=self.user, trans_status='withdraw').update(total_minor=100)
+
+        call_command('rebuild_reports', workers=1, checkpoint=self.checkpoint, stdout=StringIO())
+
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        self.assertEqual(report.as_document()['total_withdraw'], 50)
+        with open(self.checkpoint) as checkpoint:
+            self.assertEqual(checkpoint.read().split(), [str(self.user.id)])
+
+        ReportLine.objects.filter(report__user=self.user, trans_status='withdraw').update(total_minor=100)
+        call_command('rebuild_reports', workers=1, checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertEqual(report.as_document()['total_withdraw'], 1)
+
+    def test_reports_the_ledger_rows_read(self):
+        """Test the rows figure counts the transactions the rebuild read, archived years included"""
+        create_transaction(
+            user=self.user,
+            amount=10,
+            currency='USD',
+            trans_status='deposit',
+            category='Gift',
+            trans_details='',
+            transaction_date=date(2020, 6, 1)
+        )
+        with tempfile.TemporaryDirectory() as archive_root, override_settings(LEDGER_ARCHIVE_ROOT=archive_root):
+            archive_user_year(self.user, 2020)
+            out = StringIO()
+            call_command('rebuild_reports', workers=1, checkpoint=self.checkpoint, stdout=out)
+
+        self.assertIn('1/1 users, 3 rows', out.getvalue())
+
+
+class GetCashFlowTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, currency, trans_status, transaction_date in [
+            (1000, 'USD', 'deposit', date(2024, 1, 5)),
+            (200, 'USD', 'withdraw', date(2024, 1, 20)),
+            (50, 'EUR', 'deposit', date(2024, 1, 21)),
+            (300, 'USD', 'withdraw', date(2024, 3, 1)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status=trans_status,
+                category='',
+                trans_details='',
+                transaction_date=transaction_date
+            )
+
+    def test_cash_flow_groups_by_month_and_currency(self):
+        """Test sums are grouped per month and currency with empty months filled"""
+        result = get_cash_flow_for_user(user=self.user, start_date=date(2024, 1, 1), end_date=date(2024, 3, 31))
+
+        self.assertEqual([(m['year'], m['month']) for m in result['cash_flow']], [(2024, 1), (2024, 2), (2024, 3)])
+        january = result['cash_flow'][0]
+        self.assertEqual(
+            {c['currency']: (c['deposit'], c['withdraw']) for c in january['currencies']},
+            {'USD': (1000.0, 200.0), 'EUR': (50.0, 0.0)}
+        )
+        self.assertGreater(january['total_deposit'], 1000.0)
+        self.assertEqual(result['cash_flow'][1]['currencies'], [])
+        self.assertEqual(result['cash_flow'][2]['total_withdraw'], 300.0)
+        self.assertEqual(result['total_withdraw'], 500.0)
+
+    def test_cash_flow_includes_archived_years(self):
+        """Test archived months keep their sums in the cash flow"""
+        with tempfile.TemporaryDirectory() as archive_root, override_settings(LEDGER_ARCHIVE_ROOT=archive_root):
+            refresh_dirty_report_months(user=self.user)
+            count, skipped = archive_user_year(self.user, 2024)
+            result = get_cash_flow_for_user(user=self.user, start_date=date(2024, 1, 1), end_date=date(2024, 3, 31))
+
+        self.assertEqual(count, 4)
+        january = result['cash_flow'][0]
+        self.assertEqual(
+            {c['currency']: (c['deposit'], c['withdraw']) for c in january['currencies']},
+            {'USD': (1000.0, 200.0), 'EUR': (50.0, 0.0)}
+        )
+        self.assertEqual(result['total_withdraw'], 500.0)
+
+    def test_cash_flow_invalid_range(self):
+        """Test start date after end date is rejected"""
+        with self.assertRaises(ValidationError):
+            get_cash_flow_for_user(user=self.user, start_date=date(2024, 3, 1), end_date=date(2024, 1, 1))
+
+
+class GetSpendingHeatmapTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, currency, trans_status, transaction_date in [
+            (1000, 'USD', 'deposit', date(2024, 1, 5)),
+            (500, 'EUR', 'deposit', date(2024, 1, 5)),
+            (20, 'USD', 'withdraw', date(2024, 1, 6)),
+            (92, 'EUR', 'withdraw', date(2024, 1, 6)),
+            (15, 'USD', 'withdraw', date(2024, 2, 1)),
+            (5, 'USD', 'withdraw', date(2025, 1, 1)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status=trans_status,
+                category='',
+                trans_details='',
+                transaction_date=transaction_date
+            )
+
+    def test_heatmap_sums_withdrawals_per_day(self):
+        """Test withdrawals are summed per day across currencies for the requested year"""
+        result = get_spending_heatmap_for_user(user=self.user, year=2024)
+
+        self.assertEqual(result['year'], 2024)
+        self.assertEqual(result['days'], [
+            {'date': '2024-01-06', 'total': 120.0},
+            {'date': '2024-02-01', 'total': 15.0},
+        ])
+        self.assertEqual(result['total_withdraw'], 135.0)
+        self.assertEqual(result['max_daily_withdraw'], 120.0)
+
+    def test_heatmap_empty_year(self):
+        """Test a year without spending returns no days"""
+        result = get_spending_heatmap_for_user(user=self.user, year=2023)
+
+        self.assertEqual(result['days'], [])
+        self.assertEqual(result['max_daily_withdraw'], 0.0)
+
+
+class GetRangeReportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, trans_status, category, transaction_date in [
+            (1000, 'deposit', 'Salary', date(2024, 1, 5)),
+            (100, 'withdraw', 'Food', date(2024, 1, 20)),
+            (50, 'withdraw', 'Food', date(2024, 2, 10)),
+            (30, 'withdraw', 'Rent', date(2024, 3, 15)),
+            (10, 'withdraw', 'Food', date(2024, 4, 2)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category=category,
+                trans_details='',
+                transaction_date=transaction_date
+            )
+
+    def test_range_combines_whole_and_partial_months(self):
+        """Test a range with partial edge months sums only the days inside it"""
+        result = get_range_report_for_user(user=self.user, start_date=date(2024, 1, 15), end_date=date(2024, 4, 1))
+
+        self.assertEqual(
+            {item['category']: item['converted_amount'] for item in result['user_withdraw_on_range']},
+            {'Food': 150.0, 'Rent': 30.0}
+        )
+        self.assertEqual(result['user_deposit_on_range'], [])
+        self.assertEqual(result['total_withdraw'], 180.0)
+        self.assertEqual(result['start_date'], '2024-01-15')
+
+    def test_range_within_one_month(self):
+        """Test a range inside a single month is scanned directly"""
+        result = get_range_report_for_user(user=self.user, start_date=date(2024, 1, 1), end_date=date(2024, 1, 10))
+
+        self.assertEqual(result['total_deposit'], 1000.0)
+        self.assertEqual(result['total_withdraw'], 0.0)
+
+    def test_range_invalid(self):
+        """Test start date after end date is rejected"""
+        with self.assertRaises(ValidationError):
+            get_range_report_for_user(user=self.user, start_date=date(2024, 3, 1), end_date=date(2024, 1, 1))
+
+
+class GetCategoryTrendsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, currency, trans_status, category, transaction_date in [
+            (500, 'EUR', 'deposit', 'Salary', date(2023, 12, 5)),
+            (1000, 'USD', 'deposit', 'Salary', date(2024, 1, 5)),
+            (60, 'USD', 'withdraw', 'Food', date(2024, 1, 10)),
+            (40, 'USD', 'withdraw', 'Rent', date(2024, 1, 11)),
+            (92, 'EUR', 'withdraw', 'Food', date(2024, 3, 3)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status=trans_status,
+                category=category,
+                trans_details='',
+                transaction_date=transaction_date
+            )
+
+    def test_series_are_parallel_arrays(self):
+        """Test each category gets one total and share per month of the range"""
+        result = get_category_trends_for_user(user=self.user, start_date=date(2024, 1, 1), end_date=date(2024, 3, 31))
+
+        self.assertEqual(result['months'], ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(result['categories'], ['Food', 'Rent'])
+        self.assertEqual(result['totals'], [[60.0, 0.0, 100.0], [40.0, 0.0, 0.0]])
+        self.assertEqual(result['shares'], [[60.0, 0, 100.0], [40.0, 0, 0]])
+        self.assertEqual(result['month_totals'], [100.0, 0.0, 100.0])
+
+    def test_deposit_series(self):
+        """Test the status selects which transactions are charted"""
+        result = get_category_trends_for_user(
+            user=self.user, start_date=date(2024, 1, 1), end_date=date(2024, 1, 31), trans_status='deposit'
+        )
+
+        self.assertEqual(result['categories'], ['Salary'])
+        self.assertEqual(result['totals'], [[1000.0]])
+
+    def test_invalid_status(self):
+        """Test an unknown status is rejected"""
+        with self.assertRaises(ValidationError):
+            get_category_trends_for_user(user=self.user, trans_status='transfer')
+
+
+class GetReportComparisonTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, trans_status, category, transaction_date in [
+            (1000, 'deposit', 'Salary', date(2023, 3, 1)),
+            (40, 'withdraw', 'Food', date(2023, 3, 10)),
+            (100, 'withdraw', 'Food', date(2024, 2, 10)),
+            (20, 'withdraw', 'Rent', date(2024, 2, 11)),
+            (150, 'withdraw', 'Food', date(2024, 3, 10)),
+            (10, 'withdraw', 'Fun', date(2024, 3, 11)),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category=category,
+                trans_details='',
+                transaction_date=transaction_date
+            )
+
+    def test_month_over_month(self):
+        """Test per-category deltas, percentage changes and top movers against the previous month"""
+        result = get_report_comparison_for_user(user=self.user, comparison='mom', year=2024, month=3)
+
+        self.assertEqual(result['previous_period']['label'], 'February 2024')
+        withdraw = result['withdraw']
+        self.assertEqual(
+            {item['category']: (item['delta'], item['percent_change']) for item in withdraw['categories']},
+            {'Food': (50.0, 50.0), 'Rent': (-20.0, -100.0), 'Fun': (10.0, None)}
+        )
+        self.assertEqual(withdraw['top_movers'], ['Food', 'Rent', 'Fun'])
+        self.assertEqual(withdraw['delta'], 40.0)
+
+    def test_year_over_year(self):
+        """Test whole years are compared when no month is given"""
+        result = get_report_comparison_for_user(user=self.user, comparison='yoy', year=2024)
+
+        self.assertEqual(result['withdraw']['total_current'], 280.0)
+        self.assertEqual(result['withdraw']['total_previous'], 40.0)
+        self.assertEqual(result['deposit']['delta'], -1000.0)
+
+    def test_cached_until_ledger_changes(self):
+        """Test the cached comparison is replaced once the ledger version moves"""
+        get_report_comparison_for_user(user=self.user, comparison='mom', year=2024, month=3)
+        create_transaction(
+            user=self.user,
+            amount=5,
+            currency='USD',
+            trans_status='withdraw',
+            category='Fun',
+            trans_details='',
+            transaction_date=date(2024, 3, 12)
+        )
+        result = get_report_comparison_for_user(user=self.user, comparison='mom', year=2024, month=3)
+
+        self.assertEqual(result['withdraw']['total_current'], 165.0)
+
+
+class CalculateUserReportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, currency, trans_status, category in [
+            (1000, 'USD', 'deposit', 'Salary'),
+            (920, 'EUR', 'deposit', 'Salary'),
+            (30, 'USD', 'withdraw', 'Food'),
+            (46, 'EUR', 'withdraw', 'Food'),
+            (20, 'USD', 'withdraw', 'Transport'),
+            (70, 'USD', 'withdraw', ''),
+        ]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency=currency,
+                trans_status=trans_status,
+                category=category,
+                trans_details='',
+                transaction_date=date(2024, 1, 10)
+            )
+
+    def test_groups_by_category_across_currencies(self):
+        """Test categories are merged across currencies with percentages of the converted total"""
+        withdraws, deposits, total_withdraw, total_deposit = calculate_user_report(
+            date(2024, 1, 1), date(2024, 1, 31), self.user
+        )
+
+        self.assertAlmostEqual(total_deposit, 2000)
+        self.assertAlmostEqual(total_withdraw, 170)
+        self.assertEqual([item['category'] for item in deposits], ['Salary'])
+        self.assertEqual(deposits[0]['percentage'], 100.0)
+        self.assertEqual(
+            [(item['category'], item['percentage']) for item in withdraws],
+            [('Food', 47.1), ('Uncategorized', 41.2), ('Transport', 11.8)]
+        )
+
+    def test_partial_month_is_grouped_from_the_ledger(self):
+        """Test a range cutting through a month only counts the rows inside it"""
+        withdraws, deposits, total_withdraw, total_deposit = calculate_user_report(
+            date(2024, 1, 10), date(2024, 1, 20), self.user
+        )
+
+        self.assertAlmostEqual(total_deposit, 2000)
+        self.assertAlmostEqual(total_withdraw, 170)
+        self.assertEqual(
+            calculate_user_report(date(2024, 1, 11), date(2024, 1, 20), self.user),
+            ([], [], 0.0, 0.0)
+        )
+
+    def test_reads_rates_once(self):
+        """Test exchange rates are looked up once per report, not per transaction"""
+        with patch.object(currencies, 'get_or_update_rates', wraps=currencies.get_or_update_rates) as get_rates:
+            calculate_user_report(date(2024, 1, 1), date(2024, 1, 31), self.user)
+
+        self.assertEqual(get_rates.call_count, 1)
+
+
+class ReportLineTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _create(self, amount, trans_status, category):
+        return create_transaction(
+            user=self.user,
+            amount=amount,
+            currency='USD',
+            trans_status=trans_status,
+            category=category,
+            trans_details='',
+            transaction_date=date(2024, 1, 10)
+        )
+
+    def test_one_line_per_category(self):
+        """Test a month keeps one line per category and percentages are computed on read"""
+        self._create(1000, 'deposit', 'Salary')
+        self._create(30, 'withdraw', 'Food')
+        self._create(10, 'withdraw', 'Food')
+        self._create(60, 'withdraw', 'Rent')
+        refresh_dirty_report_months(user=self.user)
+
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        self.assertEqual(ReportLine.objects.filter(report=report).count(), 3)
+        document = json.loads(report.data)
+        self.assertEqual(document['total_withdraw'], 100)
+        self.assertEqual(
+            [(item['category'], item['converted_amount'], item['percentage']) for item in document['user_withdraw_on_range']],
+            [('Rent', 60, 60.0), ('Food', 40, 40.0)]
+        )
+
+    def test_lines_keep_native_currency(self):
+        """Test lines are stored per currency and projected into a new favorite currency on read"""
+        self._create(1000, 'deposit', 'Salary')
+        create_transaction(
+            user=self.user,
+            amount=100,
+            currency='EUR',
+            trans_status='deposit',
+            category='Salary',
+            trans_details='',
+            transaction_date=date(2024, 1, 10)
+        )
+        refresh_dirty_report_months(user=self.user)
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        self.assertEqual(
+            sorted(report.lines.values_list('currency', 'total_minor')),
+            [('EUR', 10000), ('USD', 100000)]
+        )
+
+        self.user.favorite_currency = 'EUR'
+        self.user.save()
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        document = report.as_document()
+        self.assertEqual(document['favorite_currency'], 'EUR')
+        self.assertAlmostEqual(document['total_deposit'], 1020)
+
+    def test_delete_removes_emptied_line(self):
+        """Test a category line is removed once its total reaches zero"""
+        self._create(1000, 'deposit', 'Salary')
+        food = self._create(30, 'withdraw', 'Food')
+
+        refresh_dirty_report_months(user=self.user)
+        delete_transaction(user=self.user, transaction_id=food.id)
+        refresh_dirty_report_months(user=self.user)
+
+        report = Reports.objects.get(user=self.user, month=1, year=2024)
+        self.assertEqual(list(report.lines.values_list('trans_status', flat=True)), ['deposit'])
+        self.assertEqual(report.as_document()['user_withdraw_on_range'], [])
+
+
+class DirtyReportMonthTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for amount, trans_status in [(1000, 'deposit'), (10, 'withdraw'), (15, 'withdraw')]:
+            create_transaction(
+                user=self.user,
+                amount=amount,
+                currency='USD',
+                trans_status=trans_status,
+                category='Food',
+                trans_details='',
+                transaction_date=date(2024, 1, 10)
+            )
+
+    def test_writes_coalesce_into_one_dirty_month(self):
+        """Test many writes to a month leave one queued rebuild and no report yet"""
+        self.assertEqual(DirtyReportMonth.objects.filter(user=self.user).count(), 1)
+        self.assertFalse(Reports.objects.filter(user=self.user).exists())
+
+    def test_read_refreshes_dirty_month(self):
+        """Test reading a dirty month rebuilds its report and clears the marker"""
+        result = get_monthly_report_for_user(user=self.user, month=1, year=2024)
+
+        self.assertEqual(result['report_data']['total_withdraw'], 25)
+        self.assertFalse(DirtyReportMonth.objects.filter(user=self.user).exists())
+
+    def test_worker_command_drains_queue(self):
+        """Test the worker rebuilds every queued month once"""
+        out = StringIO()
+        call_command('process_dirty_report_months', stdout=out)
+
+        self.assertIn('Rebuilt 1 report month(s)', out.getvalue())
+        self.assertEqual(Reports.objects.get(user=self.user, month=1, year=2024).as_document()['total_deposit'], 1000)
+
+    def test_failed_rebuild_keeps_the_month_queued(self):
+        """Test a rebuild that dies after claiming its marker rolls the claim back"""
+        marker = DirtyReportMonth.objects.get(user=self.user)
+
+        with patch('user_reports.utils.report_queue.rebuild_report_month', side_effect=RuntimeError('worker died')):
+            with self.assertRaises(RuntimeError):
+                refresh_dirty_report_months(user=self.user)
+
+        self.assertTrue(DirtyReportMonth.objects.filter(pk=marker.pk).exists())
+        self.assertFalse(Reports.objects.filter(user=self.user).exists())
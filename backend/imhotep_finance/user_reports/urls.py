@@ -4,7 +4,12 @@ from .apis import (
     MonthlyReportHistoryApi,
     ReportHistoryYearsApi,
     YearlyReportApi,
-    RecalculateReportsApi
+    RecalculateReportsApi,
+    CashFlowApi,
+    SpendingHeatmapApi,
+    RangeReportApi,
+    CategoryTrendsApi,
+    ReportComparisonApi
 )
 
 urlpatterns = [
@@ -13,4 +18,9 @@ urlpatterns = [
     path('get-report-history-years/', ReportHistoryYearsApi.as_view(), name='report_history_years'),
     path('get-yearly-report/', YearlyReportApi.as_view(), name='yearly_report'),
     path('recalculate-reports/', RecalculateReportsApi.as_view(), name='recalculate_reports'),
+    path('cash-flow/', CashFlowApi.as_view(), name='cash_flow'),
+    path('spending-heatmap/', SpendingHeatmapApi.as_view(), name='spending_heatmap'),
+    path('range-report/', RangeReportApi.as_view(), name='range_report'),
+    path('category-trends/', CategoryTrendsApi.as_view(), name='category_trends'),
+    path('compare/', ReportComparisonApi.as_view(), name='report_comparison'),
 ]
\ No newline at end of file
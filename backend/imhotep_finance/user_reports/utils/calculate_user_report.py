@@ -1,103 +1,133 @@
-from django.db.models import Sum, Count, Case, When, Value, TextField  # Added TextField import
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
 from transaction_management.models import Transactions
-from finance_management.utils.currencies import convert_to_fav_currency
+from finance_management.utils.currencies import get_conversion_factors
+from finance_management.utils.ledger_archive import read_archived_transactions
+from finance_management.utils.ledger_rollup import get_monthly_rollup_totals
+from finance_management.utils.minor_units import to_minor_units
+from .report_totals import convert_totals
+
+def _convert_monthly_totals(user, monthly_totals):
+    """
+    Turn {period: native totals} into {period: (withdraws, deposits, total_withdraw, total_deposit)}
+    with one rates lookup for every currency; currencies without a rate count as zero.
+    """
+    currencies = {currency for totals in monthly_totals.values() for _, currency, _ in totals}
+    factors, _ = get_conversion_factors(user, currencies)
+    factors = factors or {}
+    return {period: convert_totals(totals, factors) for period, totals in monthly_totals.items()}
+
+def _group_transactions(user, start_date, end_date, period_of, counter=None):
+    """
+    One pass over the user's transactions (archived years included) between the
+    dates, summing exact minor units into {period_of(date): {(status, currency, category): total}}.
+    Categories are encrypted, so the grouping happens here rather than in SQL.
+    ``counter``, a dict, receives the number of rows read under 'rows'.
+    """
+    groups = defaultdict(lambda: defaultdict(int))
+    rows_read = 0
+
+    rows = Transactions.objects.filter(
+        user=user,
+        date__range=(start_date, end_date)
+    ).order_by('date').values_list('date', 'trans_status', 'currency', 'category', 'amount', 'amount_minor')
+    for trans_date, trans_status, currency, category, amount, amount_minor in rows.iterator(chunk_size=2000):
+        if amount_minor is None:
+            amount_minor = to_minor_units(amount, currency)
+        groups[period_of(trans_date)][(trans_status.lower(), currency, category or "Uncategorized")] += amount_minor
+        rows_read += 1
+
+    for trans in read_archived_transactions(user, start_date, end_date):
+        key = (trans['trans_status'].lower(), trans['currency'], trans['category'] or "Uncategorized")
+        groups[period_of(trans['date'])][key] += to_minor_units(trans['amount'], trans['currency'])
+        rows_read += 1
+
+    if counter is not None:
+        counter['rows'] = counter.get('rows', 0) + rows_read
+    return groups
 
 def calculate_user_report(start_date, end_date, user):
-    """Calculate user spending report with category breakdowns, percentages, and totals."""
+    """
+    Calculate user spending report with category breakdowns, percentages, and totals.
+    The range is grouped by (status, currency, category) first (see calculate_range_totals);
+    each currency is then converted once, so the cost of everything after the grouping
+    depends on the number of groups, not transactions.
+    """
     if not user:
         return [], [], 0.0, 0.0  # Return empty lists and zero totals if invalid
-    
-    try:
-        # Get withdrawal transactions
-        user_withdraw_on_range = list(
-            Transactions.objects.filter(
-                user=user,
-                trans_status__iexact='withdraw',
-                date__range=(start_date, end_date)
-            ).values('amount', 'currency', 'category')
-        )
-        
-        # Get deposit transactions
-        user_deposit_on_range = list(
-            Transactions.objects.filter(
-                user=user,
-                trans_status__iexact='deposit',
-                date__range=(start_date, end_date)
-            ).values('amount', 'currency', 'category')
-        )
-
-        total_withdraw = 0.0
-        # Convert withdrawals to favorite currency
-        for trans in user_withdraw_on_range:
-            withdraw_totals = {}
-            currency = trans["currency"]
-            amount = float(trans["amount"])
-            withdraw_totals[currency] = withdraw_totals.get(currency, 0) + amount
-            total_withdraw_trans, _ = convert_to_fav_currency(user, withdraw_totals) if withdraw_totals else (0.0, user.favorite_currency or 'USD')
-    
-            if withdraw_totals.get(currency, 0) > 0:
-                ratio = amount / withdraw_totals[currency]
-                trans["converted_amount"] = ratio * total_withdraw_trans
-            else:
-                trans["converted_amount"] = 0
-            total_withdraw += trans["converted_amount"]
-
-        # Concatenate Withdraw transactions on the categories
-        withdraw_categories = {}
-        for trans in user_withdraw_on_range:
-            category = trans["category"] or "Uncategorized"
-            if category not in withdraw_categories:
-                withdraw_categories[category] = trans["converted_amount"]
-            else:
-                withdraw_categories[category] += trans["converted_amount"]
-        user_withdraw_on_range = [
-            {"category": category, "converted_amount": amount, "percentage": 0}
-            for category, amount in withdraw_categories.items()
-        ]
-
-        total_deposit = 0.0
-        # Convert deposits to favorite currency
-        for trans in user_deposit_on_range:
-            deposit_totals = {}
-            currency = trans["currency"]
-            amount = float(trans["amount"])
-            deposit_totals[currency] = deposit_totals.get(currency, 0) + amount
-            total_deposit_trans, _ = convert_to_fav_currency(user, deposit_totals) if deposit_totals else (0.0, user.favorite_currency or 'USD')
-
-            if deposit_totals.get(currency, 0) > 0:
-                ratio = amount / deposit_totals[currency]
-                trans["converted_amount"] = ratio * total_deposit_trans
-            else:
-                trans["converted_amount"] = 0
-            total_deposit += trans["converted_amount"]
-
-        # Concatenate Deposit transactions on the categories
-        deposit_categories = {}
-        for trans in user_deposit_on_range:
-            category = trans["category"] or "Uncategorized"
-            if category not in deposit_categories:
-                deposit_categories[category] = trans["converted_amount"]
-            else:
-                deposit_categories[category] += trans["converted_amount"]
-        user_deposit_on_range = [
-            {"category": category, "converted_amount": amount, "percentage": 0}
-            for category, amount in deposit_categories.items()
-        ]
-        
-        #calculate percentages
-        if user_withdraw_on_range and total_withdraw > 0:
-            for trans in user_withdraw_on_range:
-                trans["percentage"] = round((trans["converted_amount"] / total_withdraw) * 100, 1)
 
-        if user_deposit_on_range and total_deposit > 0:
-            for trans in user_deposit_on_range:
-                trans["percentage"] = round((trans["converted_amount"] / total_deposit) * 100, 1)
-
-        user_withdraw_on_range = sorted(user_withdraw_on_range, key=lambda x: x['percentage'], reverse=True)
-        user_deposit_on_range = sorted(user_deposit_on_range, key=lambda x: x['percentage'], reverse=True)
+    try:
+        totals = calculate_range_totals(start_date, end_date, user)
+        return _convert_monthly_totals(user, {None: totals}).get(None, ([], [], 0.0, 0.0))
 
-        return user_withdraw_on_range, user_deposit_on_range, total_withdraw or 0.0, total_deposit or 0.0
-        
     except Exception as e:
         print(f"Error in calculate_user_report: {str(e)}")
         return [], [], 0.0, 0.0  # Return empty lists and zero totals on error
+
+def calculate_ledger_monthly_totals(start_date, end_date, user, counter=None):
+    """
+    Native-currency totals of every month between the dates, read from the ledger itself in one
+    date-ordered pass instead of the rollups, so drifted rollups cannot leak into the result:
+    {(year, month): {(trans_status, currency, category): minor units}} for months with transactions.
+    ``counter`` is passed on to _group_transactions.
+    """
+    if not user:
+        return {}
+
+    return _group_transactions(
+        user, start_date, end_date, lambda trans_date: (trans_date.year, trans_date.month), counter=counter
+    )
+
+def calculate_monthly_totals(start_date, end_date, user):
+    """
+    Native-currency totals of every month from start_date's month to end_date's month, read
+    from the ledger rollups: {(year, month): {(trans_status, currency, category): minor units}}
+    for months with transactions.
+    """
+    if not user:
+        return {}
+
+    monthly_totals = {}
+    for period, totals in get_monthly_rollup_totals(user, start_date, end_date).items():
+        merged = defaultdict(int)
+        for (trans_status, currency, category), total_minor in totals.items():
+            merged[(trans_status, currency, category or "Uncategorized")] += total_minor
+        monthly_totals[period] = merged
+    return monthly_totals
+
+def calculate_range_totals(start_date, end_date, user):
+    """
+    Native-currency totals between two arbitrary dates: {(trans_status, currency, category): minor units}.
+    Whole calendar months are summed from the ledger rollups; only the partial months at the
+    edges of the range are scanned row by row, so the cost barely grows with the range.
+    """
+    if not user:
+        return {}
+
+    # First day of the first whole month and last day of the last whole month in the range
+    first_whole = start_date if start_date.day == 1 else (
+        date(start_date.year + 1, 1, 1) if start_date.month == 12 else date(start_date.year, start_date.month + 1, 1)
+    )
+    last_whole = end_date if end_date.day == calendar.monthrange(end_date.year, end_date.month)[1] else (
+        date(end_date.year, end_date.month, 1) - timedelta(days=1)
+    )
+
+    totals = defaultdict(int)
+    if first_whole > last_whole:
+        # No whole month in between: the range is scanned directly
+        edges = [(start_date, end_date)]
+    else:
+        for month_totals in calculate_monthly_totals(first_whole, last_whole, user).values():
+            for key, total_minor in month_totals.items():
+                totals[key] += total_minor
+        edges = [
+            (edge_start, edge_end)
+            for edge_start, edge_end in ((start_date, first_whole - timedelta(days=1)), (last_whole + timedelta(days=1), end_date))
+            if edge_start <= edge_end
+        ]
+
+    for edge_start, edge_end in edges:
+        for key, total_minor in _group_transactions(user, edge_start, edge_end, lambda trans_date: None)[None].items():
+            totals[key] += total_minor
+    return totals
@@ -0,0 +1,72 @@
+"""
+Write-behind maintenance of monthly reports.
+
+Transaction writes only mark the months they touch as dirty, so a request that
+touches one month a thousand times leaves a single marker. The
+process_dirty_report_months worker rebuilds each dirty month once from the
+ledger, and read endpoints refresh a dirty month synchronously before serving it.
+"""
+import calendar
+from datetime import date
+from django.db import transaction
+from ..models import DirtyReportMonth, Reports
+from .calculate_user_report import calculate_monthly_totals
+
+
+def mark_report_months_dirty(user_id, months):
+    """Queue the (year, month) pairs of a user for a report rebuild."""
+    DirtyReportMonth.objects.bulk_create(
+        [DirtyReportMonth(user_id=user_id, year=year, month=month) for year, month in set(months)],
+        ignore_conflicts=True
+    )
+
+
+def rebuild_report_month(user, year, month):
+    """
+    Rewrite one month's report lines from the ledger and return the report;
+    a month without transactions gets no new report.
+    """
+    start_date = date(year, month, 1)
+    end_date = date(year, month, calendar.monthrange(year, month)[1])
+    totals = calculate_monthly_totals(start_date, end_date, user).get((year, month), {})
+
+    report = Reports.objects.filter(user=user, month=month, year=year).first()
+    if not report:
+        if not totals:
+            return None
+        report = Reports(user=user, month=month, year=year)
+    report.set_totals(totals)
+    report.save()
+    return report
+
+
+def _refresh(marker):
+    # Claim the marker in the rebuild's transaction: if the rebuild fails or the worker dies,
+    # the rollback leaves the month queued. A write landing meanwhile marks the month again.
+    with transaction.atomic():
+        claimed = DirtyReportMonth.objects.select_for_update(skip_locked=True).filter(pk=marker.pk).first()
+        if claimed is None:
+            return False  # Another worker holds or already rebuilt it
+        DirtyReportMonth.objects.filter(pk=marker.pk).delete()
+        rebuild_report_month(marker.user, marker.year, marker.month)
+    return True
+
+
+def refresh_dirty_report_months(*, user=None, year=None, month=None, limit=None):
+    """Rebuild the dirty months matching the filters, oldest first. Returns the number rebuilt."""
+    markers = DirtyReportMonth.objects.select_related('user').order_by('marked_at', 'id')
+    if user is not None:
+        markers = markers.filter(user=user)
+    if year is not None:
+        markers = markers.filter(year=year)
+    if month is not None:
+        markers = markers.filter(month=month)
+    if limit:
+        markers = markers[:limit]
+
+    return sum(1 for marker in list(markers) if _refresh(marker))
+
+
+def discard_dirty_report_months(user):
+    """Forget a user's dirty months, for callers about to rebuild all of their reports."""
+    DirtyReportMonth.objects.filter(user=user).delete()
@@ -0,0 +1,42 @@
+"""
+Report figures from native-currency totals.
+
+Reports keep their sums per currency, as {(trans_status, currency, category):
+minor units}, and are converted into the favorite currency only when read, so
+a change of favorite currency never needs a ledger rescan.
+"""
+from collections import defaultdict
+from finance_management.utils.minor_units import from_minor_units
+
+def category_breakdown(category_totals, total):
+    """Turn {category: converted_amount} into report items with percentages, largest first."""
+    items = [
+        {
+            "category": category,
+            "converted_amount": amount,
+            "percentage": round((amount / total) * 100, 1) if total > 0 else 0,
+        }
+        for category, amount in category_totals.items()
+    ]
+    return sorted(items, key=lambda x: x['percentage'], reverse=True)
+
+def convert_totals(totals, factors):
+    """
+    Project native totals through per-currency factors into
+    (withdraws, deposits, total_withdraw, total_deposit); currencies without a factor count as zero.
+    """
+    category_totals = {"withdraw": defaultdict(float), "deposit": defaultdict(float)}
+    for (trans_status, currency, category), amount_minor in totals.items():
+        if trans_status not in category_totals:
+            continue
+        amount = from_minor_units(amount_minor, currency)
+        category_totals[trans_status][category] += amount * factors.get(currency, 0.0)
+
+    total_withdraw = sum(category_totals["withdraw"].values())
+    total_deposit = sum(category_totals["deposit"].values())
+    return (
+        category_breakdown(category_totals["withdraw"], total_withdraw),
+        category_breakdown(category_totals["deposit"], total_deposit),
+        total_withdraw or 0.0,
+        total_deposit or 0.0,
+    )
@@ -16,7 +16,9 @@ from .serializers import (
     GetWishlistInputSerializer
 )
 from .selectors import get_wishlist_for_user
-from finance_management.utils.serializer import serialize_wishlist
+from finance_management.utils.serializer import WISHLIST_VALUES, serialize_wishlist_row
+from finance_management.utils.ledger_version import ledger_etag
+from finance_management.utils.idempotency import idempotent
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import HttpResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
@@ -36,6 +38,7 @@ class WishCreateApi(APIView):
         },
         operation_id='create_wish'
     )
+    @idempotent
     def post(self, request):
         serializer = WishlistInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -169,6 +172,7 @@ class GetWishlistApi(APIView):
         responses={200: GetWishlistResponseSerializer},
         operation_id='get_wishlist'
     )
+    @ledger_etag
     def get(self, request):
         """Return paginated transactions for the logged-in user, filtered by date range."""
 
@@ -182,7 +186,7 @@ class GetWishlistApi(APIView):
             wishlist_qs = get_wishlist_for_user(user=request.user, year=year)
             
             # Paginate results
-            paginator = Paginator(wishlist_qs, 20)
+            paginator = Paginator(wishlist_qs.values(*WISHLIST_VALUES), 20)
             page_num = filters.get('page', 1)
             
             try:
@@ -191,7 +195,7 @@ class GetWishlistApi(APIView):
                 page_obj = paginator.page(1)
             
             # Serialize wishlist
-            wishlist_list = [serialize_wishlist(w) for w in page_obj.object_list]
+            wishlist_list = [serialize_wishlist_row(row) for row in page_obj.object_list]
             
             response_data = {
                 "wishlist": wishlist_list,
@@ -226,6 +230,7 @@ class UpdateWishlistStatusApi(APIView):
         },
         operation_id='update_wish_status'
     )
+    @idempotent
     def post(self, request, wish_id):
         """Update the status of a wish."""
         try:
@@ -2,6 +2,7 @@ from django.db import models
 from accounts.models import User
 from django.utils import timezone
 from encrypted_model_fields.fields import EncryptedCharField
+from finance_management.utils.minor_units import sync_minor_units
 
 def current_year():
     return timezone.now().year
@@ -28,11 +29,18 @@ class Wishlist(models.Model):
     )
     year = models.IntegerField(default=current_year)
     price = models.FloatField()
+    # price in integer minor units of its currency, kept in sync on save
+    price_minor = models.BigIntegerField(blank=True, null=True, editable=False)
     currency = models.CharField(max_length=4)
     status = models.BooleanField(choices=STATUS_CHOICES, default=False)
     link = EncryptedCharField(max_length=255, blank=True, null=True)
     wish_details = EncryptedCharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        sync_minor_units(self, 'price', 'price_minor', kwargs)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Wishlist of {self.user.username} ({self.year}) with amount {self.price} and status {self.status} and currency {self.currency}"
@@ -42,3 +50,6 @@ class Wishlist(models.Model):
         verbose_name = "Wishlist"
         verbose_name_plural = "Wishlists"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='wishlist_user_updated_idx'),
+        ]